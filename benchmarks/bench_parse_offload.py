@@ -0,0 +1,113 @@
+"""
+Event-loop latency of cheap requests while many record pages are being parsed.
+
+The script runs a ticker coroutine that sleeps 1 ms in a loop and records how late
+each wake-up is, while N parses of a large record page run through the thread pool
+(as /get_athlete_records does). It compares parsing inline in the worker threads
+(CPU_WORKERS=0) with parsing in the process pool.
+
+Usage:
+    python -m benchmarks.bench_parse_offload
+    python -m benchmarks.bench_parse_offload --parses 32 --rows 2000 --workers 4
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from starlette.concurrency import run_in_threadpool
+
+from mypacer_api.core import scrapper, workers
+
+_ROW = """
+    <tr class="clickable">
+        <td>800m</td><td>2'23''17</td><td>30 Mai 2019</td><td>SE</td>
+        <td>A Six Fours</td><td>PCA / 083</td><td>Aubagne</td><td></td>
+    </tr>
+    <tr class="detail-row hide"><td colspan="4"></td></tr>
+"""
+
+
+def _build_page(rows: int) -> bytes:
+    """
+    Build a record page with the given number of performance rows.
+    """
+    body = _ROW * rows
+    return (
+        '<html><body><section data-content="section_5">'
+        f'<table class="base-table">{body}</table></section></body></html>'
+    ).encode()
+
+
+async def _ticker(stop: asyncio.Event, lags: list):
+    """
+    Measure how late a 1 ms sleep wakes up, until stopped.
+    """
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lags.append((time.perf_counter() - start - 0.001) * 1000)
+
+
+async def _scenario(html: bytes, parses: int) -> tuple:
+    """
+    Run the parses concurrently with the ticker, return (total seconds, lags).
+    """
+    stop = asyncio.Event()
+    lags: list = []
+    ticker = asyncio.create_task(_ticker(stop, lags))
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            run_in_threadpool(workers.run, scrapper.parse_records_html, html)
+            for _ in range(parses)
+        )
+    )
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await ticker
+    return elapsed, lags
+
+
+def _report(label: str, elapsed: float, lags: list):
+    """
+    Print the loop lag percentiles of one scenario.
+    """
+    lags = sorted(lags)
+    p99 = lags[int(len(lags) * 0.99) - 1] if lags else 0.0
+    print(
+        f"{label:<16} total {elapsed:6.2f}s  ticks {len(lags):>6}  "
+        f"lag p50 {statistics.median(lags):7.2f}ms  p99 {p99:7.2f}ms  "
+        f"max {lags[-1]:7.2f}ms"
+    )
+
+
+def main():
+    """
+    Entry point: compare inline parsing with the process pool.
+    """
+    parser = argparse.ArgumentParser(description="Parse offload benchmark.")
+    parser.add_argument("--parses", type=int, default=16)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    html = _build_page(args.rows)
+    print(f"{args.parses} parses of a {len(html) / 1024:.0f} KiB page")
+
+    workers.CPU_WORKERS = 0
+    _report("inline (threads)", *asyncio.run(_scenario(html, args.parses)))
+
+    workers.CPU_WORKERS = args.workers
+    workers.CPU_MAX_PENDING = args.workers * 4
+    # Start the processes before measuring
+    workers.run(scrapper.parse_records_html, _build_page(1))
+    _report(f"pool ({args.workers} procs)", *asyncio.run(_scenario(html, args.parses)))
+    workers.shutdown()
+
+
+if __name__ == "__main__":
+    main()
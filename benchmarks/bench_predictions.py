@@ -0,0 +1,62 @@
+"""
+Throughput of batched race time predictions.
+
+Generates random record sets (a few records per athlete, around a common level)
+and times core.predictor.predict_times for every official distance.
+
+Usage:
+    python -m benchmarks.bench_predictions
+    python -m benchmarks.bench_predictions --athletes 10000 --runs 5
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from mypacer_api.core import predictor
+from mypacer_api.models import OFFICIAL_DISTANCES
+
+
+def _random_records(count: int, seed: int = 42) -> list:
+    """
+    Build record sets of 2 to 6 random distances each.
+    """
+    rng = random.Random(seed)
+    records = []
+    for _ in range(count):
+        pace = rng.uniform(180, 360)  # seconds per kilometer over 5 km
+        distances = rng.sample(OFFICIAL_DISTANCES, rng.randint(2, 6))
+        records.append(
+            {d: round(pace * d / 1000 * (d / 5000) ** 0.06, 2) for d in distances}
+        )
+    return records
+
+
+def main():
+    """
+    Entry point: print the median time per call and per athlete for each model.
+    """
+    parser = argparse.ArgumentParser(description="Prediction throughput benchmark.")
+    parser.add_argument("--athletes", type=int, default=5000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    records = _random_records(args.athletes)
+    for model in predictor.PREDICTION_MODELS:
+        # Build the lookup tables outside of the measure
+        predictor.predict_times(records[:1], OFFICIAL_DISTANCES, model)
+        durations = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            predictor.predict_times(records, OFFICIAL_DISTANCES, model)
+            durations.append(time.perf_counter() - start)
+        median = statistics.median(durations)
+        print(
+            f"{model:<7} {args.athletes} athletes x {len(OFFICIAL_DISTANCES)} distances: "
+            f"{median * 1000:8.1f} ms/call, {median / args.athletes * 1e6:6.1f} us/athlete"
+        )
+
+
+if __name__ == "__main__":
+    main()
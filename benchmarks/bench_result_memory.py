@@ -0,0 +1,117 @@
+"""
+Memory of one cached entry with per-row dicts versus the compact result types.
+
+Measures with tracemalloc the memory retained by a search results page (as cached by
+core.search_cache), a scraped record set (records cache) and a pace table (pace table
+cache), built as dicts (the previous representation) and as the types of
+core.results.
+
+Usage:
+    python -m benchmarks.bench_result_memory
+    python -m benchmarks.bench_result_memory --entries 500
+"""
+
+import argparse
+import gc
+import random
+import tracemalloc
+
+from mypacer_api.core import calculator
+from mypacer_api.core.results import AthleteHit, RecordSet
+from mypacer_api.models import OFFICIAL_DISTANCES
+
+
+def _search_rows(rng: random.Random, limit: int = 25) -> list:
+    """
+    Build the tuples of one search results page, as returned by the cursor.
+    """
+    return [
+        (
+            rng.randrange(1_000_000),
+            str(rng.randrange(10**9)),
+            f"DUPONT Jean {rng.randrange(1000)}",
+            f"https://bases.athle.fr/asp.net/athletes.aspx?base=records&seq={i}",
+            f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/19{rng.randint(50, 99)}",
+            str(rng.randrange(10**6)),
+            rng.choice("MF"),
+            "FRA",
+            rng.random(),
+        )
+        for i in range(limit)
+    ]
+
+
+def _records(rng: random.Random) -> dict:
+    """
+    Build the raw times of one record set (4 to 10 distances).
+    """
+    distances = rng.sample(OFFICIAL_DISTANCES, rng.randint(4, 10))
+    return {d: rng.uniform(0.15, 0.4) * d for d in distances}
+
+
+def _parse(raw: dict) -> dict:
+    """
+    Convert raw times like the scraper does (new float objects per record set).
+    """
+    return {d: round(seconds, 2) for d, seconds in raw.items()}
+
+
+def _measure(build, entries: int) -> float:
+    """
+    Return the average memory in bytes retained by one entry built by `build`.
+    """
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [build(i) for i in range(entries)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return (after - before) / entries
+
+
+def main():
+    """
+    Entry point: print the memory of one cache entry per representation.
+    """
+    parser = argparse.ArgumentParser(description="Cached entries memory benchmark.")
+    parser.add_argument("--entries", type=int, default=200)
+    args = parser.parse_args()
+
+    columns = list(AthleteHit._fields)
+    pages = [_search_rows(random.Random(i)) for i in range(args.entries)]
+    records = [_records(random.Random(i)) for i in range(args.entries)]
+    table = (600, 120, 1, OFFICIAL_DISTANCES)
+
+    cases = [
+        (
+            "search page (25 athletes)",
+            lambda i: [dict(zip(columns, row)) for row in pages[i]],
+            lambda i: list(map(AthleteHit._make, pages[i])),
+        ),
+        (
+            "athlete records",
+            lambda i: _parse(records[i]),
+            lambda i: RecordSet(_parse(records[i])),
+        ),
+        (
+            "pace table (481 rows)",
+            lambda i: calculator.calculate_pace_table(*table),
+            lambda i: calculator.build_pace_table(*table),
+        ),
+    ]
+
+    print(f"{'entry':<28} {'dicts':>10} {'compact':>10} {'ratio':>7}")
+    for name, as_dicts, as_compact in cases:
+        # Pace tables are large: fewer entries are enough
+        entries = args.entries if "table" not in name else max(args.entries // 20, 1)
+        dict_bytes = _measure(as_dicts, entries)
+        compact_bytes = _measure(as_compact, entries)
+        print(
+            f"{name:<28} {dict_bytes:>9.0f}B {compact_bytes:>9.0f}B "
+            f"{dict_bytes / compact_bytes:>6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Compare the "ilike" and "knn" athlete search modes on a live database.
+
+For each query, both modes are run several times and the script reports the
+median latency (the search result cache is cleared before each run, so every
+run reaches PostgreSQL), the number of results and the overlap between the two top-k
+lists (how many athletes returned by "ilike" are also returned by "knn").
+
+Usage:
+    python -m benchmarks.compare_search_modes
+    python -m benchmarks.compare_search_modes --limit 10 --runs 20 martin "dupont jean"
+
+The database connection uses the same POSTGRES_* environment variables as the API.
+"""
+
+import argparse
+import statistics
+import time
+
+from mypacer_api.core import database, search_cache
+from mypacer_api.services import athletes_service
+
+# Common names (many matches), full names, and typos (no exact substring match)
+DEFAULT_QUERIES = [
+    "martin",
+    "bernard",
+    "dupont",
+    "moron cyril",
+    "jean",
+    "mart",
+    "marten",
+    "dupnt",
+    "lemaire sophie",
+]
+
+
+def _measure(name: str, mode: str, limit: int, runs: int) -> tuple:
+    """
+    Run one search several times and return (median latency in ms, last results).
+    """
+    durations = []
+    results: list = []
+    for _ in range(runs):
+        # Otherwise only the first run reaches the database
+        search_cache.invalidate()
+        start = time.perf_counter()
+        results = athletes_service.get_athletes_from_db(name, limit=limit, mode=mode)
+        durations.append((time.perf_counter() - start) * 1000)
+    return statistics.median(durations), results
+
+
+def main():
+    """
+    Entry point: print a comparison table for each query.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("queries", nargs="*", default=DEFAULT_QUERIES)
+    parser.add_argument("--limit", type=int, default=25)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    print(
+        f"{'query':<20} {'ilike ms':>9} {'n':>4} {'knn ms':>9} {'n':>4} {'overlap':>8}"
+    )
+    try:
+        for query in args.queries:
+            ilike_ms, ilike_rows = _measure(query, "ilike", args.limit, args.runs)
+            knn_ms, knn_rows = _measure(query, "knn", args.limit, args.runs)
+            ilike_ids = {row.id for row in ilike_rows}
+            knn_ids = {row.id for row in knn_rows}
+            overlap = len(ilike_ids & knn_ids) / len(ilike_ids) if ilike_ids else 0.0
+            print(
+                f"{query:<20} {ilike_ms:>9.2f} {len(ilike_rows):>4} "
+                f"{knn_ms:>9.2f} {len(knn_rows):>4} {overlap:>8.0%}"
+            )
+    finally:
+        database.close_all_connections()
+
+
+if __name__ == "__main__":
+    main()
@@ -42,6 +42,19 @@ CREATE INDEX IF NOT EXISTS idx_clubs_normalized_name_trgm ON clubs
     USING GIN (normalized_name gin_trgm_ops);
 CREATE INDEX IF NOT EXISTS idx_clubs_years ON clubs(first_year, last_year);
 
+-- ============================================================================
+-- Table: data_generation
+-- ============================================================================
+-- Génération des données, incrémentée par chaque ingestion qui modifie des lignes
+-- (mypacer_api.core.ingestion). Les workers de l'API la relisent régulièrement et
+-- vident leurs caches en mémoire quand elle change.
+\echo 'Creating data_generation table...'
+CREATE TABLE IF NOT EXISTS data_generation (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),   -- Une seule ligne
+    generation BIGINT NOT NULL DEFAULT 0
+);
+INSERT INTO data_generation DEFAULT VALUES ON CONFLICT DO NOTHING;
+
 -- ============================================================================
 -- Table: athletes
 -- ============================================================================
@@ -77,8 +90,62 @@ CREATE INDEX IF NOT EXISTS idx_athletes_license_id ON athletes(license_id)
 CREATE INDEX IF NOT EXISTS idx_athletes_normalized_name_trgm ON athletes
     USING GIN (normalized_name gin_trgm_ops);
 CREATE INDEX IF NOT EXISTS idx_athletes_normalized_name ON athletes(normalized_name);
+-- Recherche par préfixe des requêtes courtes ('du', 'l m') : le GIN trigramme ne peut
+-- rien extraire d'un mot de moins de 3 lettres (ILIKE '%du%' parcourt tout l'index).
+-- En collation "C", le B-tree sert LIKE 'du%' et renvoie les noms déjà triés.
+CREATE INDEX IF NOT EXISTS idx_athletes_normalized_name_prefix ON athletes
+    (normalized_name COLLATE "C");
+-- Index GiST trigram pour la recherche KNN (ORDER BY 'requête' <<-> normalized_name)
+-- Le GIN ne sait pas renvoyer les lignes triées par distance, le GiST si :
+-- PostgreSQL s'arrête après LIMIT lignes au lieu de classer toutes les correspondances.
+CREATE INDEX IF NOT EXISTS idx_athletes_normalized_name_gist ON athletes
+    USING GIST (normalized_name gist_trgm_ops);
 CREATE INDEX IF NOT EXISTS idx_athletes_sexe ON athletes(sexe) WHERE sexe IS NOT NULL;
 CREATE INDEX IF NOT EXISTS idx_athletes_birth_date ON athletes(birth_date) WHERE birth_date IS NOT NULL;
+-- Filtre par année de naissance de la recherche : birth_date contient soit l'année
+-- ('1934') soit la date complète ('07/01/1963'), l'année est donc toujours à la fin
+CREATE INDEX IF NOT EXISTS idx_athletes_birth_year ON athletes(right(birth_date, 4))
+    WHERE birth_date IS NOT NULL;
+-- Date de dernière modification (validation des caches HTTP de l'API : MAX(updated_at))
+CREATE INDEX IF NOT EXISTS idx_athletes_updated_at ON athletes(updated_at);
+
+-- ============================================================================
+-- Table: athlete_clubs
+-- ============================================================================
+-- Appartenance d'un athlète à un club pour une saison. La clé primaire
+-- (club_id, season, athlete_id) sert l'effectif d'un club pour une saison
+-- (et MAX(season) d'un club) sans autre index.
+\echo 'Creating athlete_clubs table...'
+CREATE TABLE IF NOT EXISTS athlete_clubs (
+    club_id INTEGER NOT NULL REFERENCES clubs(id) ON DELETE CASCADE,
+    season INTEGER NOT NULL,                  -- Saison (année)
+    athlete_id INTEGER NOT NULL REFERENCES athletes(id) ON DELETE CASCADE,
+    PRIMARY KEY (club_id, season, athlete_id)
+);
+
+-- Clubs d'un athlète (et suppressions en cascade depuis athletes)
+CREATE INDEX IF NOT EXISTS idx_athlete_clubs_athlete ON athlete_clubs(athlete_id, season);
+
+-- ============================================================================
+-- Table: performances
+-- ============================================================================
+-- Historique complet des performances chronométrées, extrait de la page
+-- bases.athle.fr de l'athlète lors du scraping des records (remplacé à chaque
+-- nouveau scraping de la page)
+\echo 'Creating performances table...'
+CREATE TABLE IF NOT EXISTS performances (
+    id BIGSERIAL PRIMARY KEY,
+    athlete_id INTEGER NOT NULL REFERENCES athletes(id) ON DELETE CASCADE,
+    event TEXT NOT NULL,                      -- Épreuve telle qu'affichée ('10 Km Route')
+    distance REAL,                            -- Distance en mètres (NULL si inconnue)
+    seconds REAL NOT NULL,                    -- Temps en secondes
+    perf_date DATE,                           -- Date de la performance
+    competition TEXT,                         -- Compétition ou lieu
+    created_at TIMESTAMP DEFAULT NOW()
+);
+
+-- Progression d'un athlète (par distance, triée par date)
+CREATE INDEX IF NOT EXISTS idx_performances_athlete ON performances(athlete_id, distance, perf_date);
 
 -- ============================================================================
 -- Fonction: Normaliser un texte (minuscules, sans accents, espaces nettoyés)
@@ -97,7 +164,11 @@ $$ LANGUAGE SQL IMMUTABLE;
 CREATE OR REPLACE FUNCTION update_athlete_normalized_name()
 RETURNS TRIGGER AS $$
 BEGIN
-    NEW.normalized_name := normalize_text(NEW.name);
+    -- L'ingestion en masse (mypacer_api.core.ingestion) fournit déjà normalized_name
+    IF (TG_OP = 'INSERT' AND NEW.normalized_name IS NULL)
+        OR (TG_OP = 'UPDATE' AND NEW.name IS DISTINCT FROM OLD.name) THEN
+        NEW.normalized_name := normalize_text(NEW.name);
+    END IF;
     NEW.updated_at := NOW();
     RETURN NEW;
 END;
@@ -113,7 +184,11 @@ CREATE TRIGGER trigger_update_athlete_normalized_name
 CREATE OR REPLACE FUNCTION update_club_normalized_name()
 RETURNS TRIGGER AS $$
 BEGIN
-    NEW.normalized_name := normalize_text(NEW.name);
+    -- L'ingestion en masse (mypacer_api.core.ingestion) fournit déjà normalized_name
+    IF (TG_OP = 'INSERT' AND NEW.normalized_name IS NULL)
+        OR (TG_OP = 'UPDATE' AND NEW.name IS DISTINCT FROM OLD.name) THEN
+        NEW.normalized_name := normalize_text(NEW.name);
+    END IF;
     NEW.updated_at := NOW();
     RETURN NEW;
 END;
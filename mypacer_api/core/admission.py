@@ -0,0 +1,218 @@
+"""
+Admission control for expensive endpoints.
+
+ConcurrencyLimiter bounds how many requests run at once on a route and how many may
+wait for a slot; extra requests are rejected immediately with 503 and a Retry-After
+header instead of piling up on the database pool and the upstream website.
+
+CircuitBreaker stops calling a failing upstream (bases.athle.fr) after repeated
+failures, and lets a single trial request through once the reset timeout has elapsed.
+"""
+
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+
+from fastapi import HTTPException
+
+
+def service_unavailable(detail: str, retry_after: float) -> HTTPException:
+    """
+    Build a 503 error telling the client when to retry.
+
+    Args:
+        detail (str): The error message.
+        retry_after (float): Seconds before the client should retry.
+
+    Returns:
+        HTTPException: The 503 exception with a Retry-After header.
+    """
+    return HTTPException(
+        status_code=503,
+        detail=detail,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+class ConcurrencyLimiter:
+    """
+    Async context manager limiting concurrent executions with a bounded wait queue.
+
+    Usage:
+        async with limiter:
+            ...
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_queue: int,
+        queue_timeout: float,
+        retry_after: float = 1,
+    ):
+        """
+        Args:
+            max_concurrency (int): Maximum number of executions running at once.
+            max_queue (int): Maximum number of requests waiting for a slot.
+            queue_timeout (float): Maximum time in seconds spent waiting for a slot.
+            retry_after (float): Retry-After value sent when a request is rejected.
+        """
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self._active = 0
+        self._waiters: deque = deque()
+
+    @property
+    def active(self) -> int:
+        """Number of executions currently holding a slot."""
+        return self._active
+
+    @property
+    def waiting(self) -> int:
+        """Number of requests waiting for a slot."""
+        return len(self._waiters)
+
+    async def acquire(self):
+        """
+        Take a slot, waiting in the queue if needed.
+
+        Raises:
+            HTTPException: 503 if the queue is full or the wait timed out.
+        """
+        if self._active < self.max_concurrency and not self._waiters:
+            self._active += 1
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            raise service_unavailable(
+                "Too many concurrent requests, please retry later.", self.retry_after
+            )
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            # The slot is handed over by release(), _active already counts it
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError as exc:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise service_unavailable(
+                "Too many concurrent requests, please retry later.", self.retry_after
+            ) from exc
+        except asyncio.CancelledError:
+            # Client went away: leave the queue, or give back a slot already handed over
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            elif waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        """
+        Give the slot to the oldest waiting request, or free it.
+        """
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.get_loop().call_soon_threadsafe(self._hand_over, waiter)
+                return
+        self._active -= 1
+
+    def _hand_over(self, waiter: asyncio.Future):
+        """
+        Wake a waiting request, or pass the slot on if it gave up meanwhile.
+        """
+        if waiter.done():
+            self.release()
+        else:
+            waiter.set_result(None)
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, traceback):
+        self.release()
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker for calls to an unreliable upstream.
+
+    States:
+    - closed: calls are allowed, consecutive failures are counted.
+    - open: calls are refused until `reset_timeout` seconds have elapsed.
+    - half-open: one trial call is allowed; success closes, failure re-opens.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        """
+        Args:
+            failure_threshold (int): Consecutive failures before opening the circuit.
+            reset_timeout (float): Seconds to wait before allowing a trial call.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_progress = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Current state: "closed", "open" or "half-open"."""
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half-open"
+            return "open"
+
+    def allow_request(self) -> bool:
+        """
+        Check whether a call to the upstream may be made now.
+
+        Returns:
+            bool: True if the circuit is closed, or if this call is the half-open trial.
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial_in_progress:
+                return False
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._trial_in_progress = True
+                return True
+            return False
+
+    def retry_after(self) -> float:
+        """
+        Seconds until the next trial call is allowed.
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return 0
+            return max(0, self._opened_at + self.reset_timeout - time.monotonic())
+
+    def record_success(self):
+        """
+        Record a successful call: the circuit closes.
+        """
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_progress = False
+
+    def record_failure(self):
+        """
+        Record a failed call: the circuit opens once the threshold is reached.
+        """
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_progress or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_in_progress = False
@@ -2,26 +2,16 @@
 Module containing functions for calculating running paces and times.
 """
 
-from typing import Dict, List
+from array import array
+from typing import Dict, Iterator, List, Mapping
 
+from mypacer_api.core.results import PaceTable
 
-def calculate_pace_table(
-    min_pace: int, max_pace: int, increment: int, distances: list
-) -> List[Dict]:
-    """
-    Calculate the pace table for given pace parameters.
-
-    Args:
-    min_pace (int): The minimum pace in seconds per kilometer.
-    max_pace (int): The maximum pace in seconds per kilometer.
-    increment (int): The increment in seconds per kilometer for each row.
-    distances (list): A list of distances in meters.
 
-    Returns:
-    List[Dict]: A list of dictionaries where each dictionary represents a row in the pace table,
-    with keys being the distances and values being the calculated times.
+def _validate_pace_range(min_pace: int, max_pace: int, increment: int):
+    """
+    Validate the pace parameters of a table, raising ValueError if invalid.
     """
-    # Validate input parameters
     if min_pace <= 0:
         raise ValueError("Minimum pace must be positive and greater than zero.")
     if max_pace > min_pace:
@@ -32,17 +22,130 @@ def calculate_pace_table(
                 and minimum pace."
         )
 
+
+def iter_pace_table(
+    min_pace: int, max_pace: int, increment: int, distances: list
+) -> Iterator[Dict]:
+    """
+    Iterate over the rows of the pace table, computing each row on demand.
+
+    Parameters are validated immediately; rows are only computed as they are consumed,
+    so memory stays bounded whatever the number of rows.
+
+    Args:
+    min_pace (int): The minimum pace in seconds per kilometer.
+    max_pace (int): The maximum pace in seconds per kilometer.
+    increment (int): The increment in seconds per kilometer for each row.
+    distances (list): A list of distances in meters.
+
+    Returns:
+    Iterator[Dict]: The rows of the pace table, with keys being the distances and
+    values being the calculated times.
+    """
+    _validate_pace_range(min_pace, max_pace, increment)
+
     # Pre-compute distance conversions and keys to avoid repeated calculations
     distance_data = [(str(d), d / 1000) for d in distances]
 
-    # Use list comprehension for better performance
-    results = [
+    return (
         {
             "pace": pace,
             "speed": round(3600 / pace, 2),
             **{key: round(dist_km * pace, 2) for key, dist_km in distance_data},
         }
         for pace in range(min_pace, max_pace - 1, -increment)
-    ]
+    )
+
+
+def calculate_pace_table(
+    min_pace: int, max_pace: int, increment: int, distances: list
+) -> List[Dict]:
+    """
+    Calculate the pace table for given pace parameters.
 
-    return results
+    Args:
+    min_pace (int): The minimum pace in seconds per kilometer.
+    max_pace (int): The maximum pace in seconds per kilometer.
+    increment (int): The increment in seconds per kilometer for each row.
+    distances (list): A list of distances in meters.
+
+    Returns:
+    List[Dict]: A list of dictionaries where each dictionary represents a row in the pace table,
+    with keys being the distances and values being the calculated times.
+    """
+    return list(iter_pace_table(min_pace, max_pace, increment, distances))
+
+
+def build_pace_table(
+    min_pace: int, max_pace: int, increment: int, distances: list
+) -> PaceTable:
+    """
+    Calculate the pace table in its compact form, with the same values as
+    calculate_pace_table but stored in arrays (used by the pace table cache).
+
+    Args:
+    min_pace (int): The minimum pace in seconds per kilometer.
+    max_pace (int): The maximum pace in seconds per kilometer.
+    increment (int): The increment in seconds per kilometer for each row.
+    distances (list): A list of distances in meters.
+
+    Returns:
+    PaceTable: The pace table, encoded to rows with PaceTable.to_rows().
+    """
+    _validate_pace_range(min_pace, max_pace, increment)
+
+    distances_km = [d / 1000 for d in distances]
+    paces = array("q", range(min_pace, max_pace - 1, -increment))
+    return PaceTable(
+        keys=tuple(str(d) for d in distances),
+        paces=paces,
+        speeds=array("d", [round(3600 / pace, 2) for pace in paces]),
+        times=array(
+            "d",
+            [round(dist_km * pace, 2) for pace in paces for dist_km in distances_km],
+        ),
+    )
+
+
+def locate_paces(
+    min_pace: int,
+    max_pace: int,
+    increment: int,
+    distances: list,
+    records: Mapping[float, float],
+) -> List[Dict]:
+    """
+    Match an athlete's records to the rows of a pace table.
+
+    Rows are evenly spaced (row i has pace min_pace - i * increment), so the
+    closest row is found by arithmetic instead of scanning the table.
+
+    Args:
+    min_pace (int): The minimum pace of the table in seconds per kilometer.
+    max_pace (int): The maximum pace of the table in seconds per kilometer.
+    increment (int): The increment of the table in seconds per kilometer.
+    distances (list): The distances of the table in meters.
+    records (Mapping[float, float]): Best times in seconds, keyed by distance in meters.
+
+    Returns:
+    List[Dict]: One entry per table distance with a record, with the record time,
+    the exact pace in seconds per kilometer and the index of the closest row
+    (None when the pace is outside the table).
+    """
+    last_row = (min_pace - max_pace) // increment
+    matches = []
+    for distance in distances:
+        time = records.get(distance)
+        if not time:
+            continue
+        pace = time / (distance / 1000)
+        row = round((min_pace - pace) / increment)
+        matches.append(
+            {
+                "distance": distance,
+                "time": time,
+                "pace": round(pace, 2),
+                "row": row if 0 <= row <= last_row else None,
+            }
+        )
+    return matches
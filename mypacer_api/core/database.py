@@ -7,20 +7,51 @@ improving performance.
 """
 
 import atexit
+import itertools
 import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
 
 from dotenv import load_dotenv
 from psycopg2 import pool
 
+from mypacer_api.core import slow_queries
+
 load_dotenv()
 
 # Connection pool configuration
 MIN_CONNECTIONS = 2
 MAX_CONNECTIONS = 20
 
+# statement_timeout set when a connection is checked out for a route, in
+# milliseconds (0: no timeout). A pathological query is cancelled by PostgreSQL
+# instead of holding a pool connection.
+STATEMENT_TIMEOUTS = {
+    # Athlete searches (typeahead)
+    "search": int(os.getenv("SEARCH_STATEMENT_TIMEOUT_MS", "2000")),
+    # Single-athlete lookups (URL, progression)
+    "lookup": int(os.getenv("LOOKUP_STATEMENT_TIMEOUT_MS", "1000")),
+    # Streamed exports: applies to each FETCH of the server-side cursor
+    "export": int(os.getenv("EXPORT_STATEMENT_TIMEOUT_MS", "5000")),
+}
+
 # Global connection pool
 _connection_pool = None
 
+# Latest query of each client search session: session -> [ticket, connection]
+# (connection is None until the query runs, see start_session_query)
+_session_queries: Dict[str, list] = {}
+_session_lock = threading.Lock()
+_session_tickets = itertools.count(1)
+# Cancels of superseded queries: (session, ticket) -> cancel being sent. Sending
+# a cancel is a blocking round trip to the server: never under the registry lock
+# nor on the event loop
+_session_cancels: Dict[Tuple[str, int], Future] = {}
+_cancel_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cancel")
+
 
 def get_connection_pool():
     """
@@ -47,15 +78,68 @@ def get_connection_pool():
     return _connection_pool
 
 
-def get_connection():
+def get_connection(route: Optional[str] = None):
     """
     Get a connection from the pool.
 
+    Args:
+        route (str): A key of STATEMENT_TIMEOUTS: the statement timeout of the route
+            is set for the current transaction (reset when the connection is released).
+
     Returns:
         psycopg2.connection: A database connection from the pool.
     """
     pool_instance = get_connection_pool()
-    return pool_instance.getconn()
+    conn = pool_instance.getconn()
+
+    timeout = STATEMENT_TIMEOUTS.get(route, 0) if route else 0
+    if timeout > 0:
+        try:
+            with conn.cursor() as cursor:
+                # Same as SET LOCAL, which does not accept a bind parameter
+                cursor.execute(
+                    "SELECT set_config('statement_timeout', %s, true)",
+                    (f"{timeout}ms",),
+                )
+        except Exception:
+            pool_instance.putconn(conn)
+            raise
+    return conn
+
+
+@contextmanager
+def timed(query: str) -> Iterator[None]:
+    """
+    Time a block running a query, recording it in the slow-query log when it is
+    slow (see core.slow_queries). For statements not run by execute(), e.g.
+    psycopg2.extras.execute_values.
+
+    Args:
+        query (str): The SQL query, as recorded in the log.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        # Recorded even when cancelled: timeouts are the slowest queries
+        slow_queries.record(query, (time.perf_counter() - start) * 1000)
+
+
+def execute(cursor, query: str, params=None):
+    """
+    Execute a query, recording it in the slow-query log when it is slow
+    (see core.slow_queries).
+
+    Args:
+        cursor: The cursor to execute the query with.
+        query (str): The SQL query.
+        params: The query parameters, if any.
+    """
+    with timed(query):
+        if params is None:
+            cursor.execute(query)
+        else:
+            cursor.execute(query, params)
 
 
 def release_connection(conn):
@@ -80,5 +164,108 @@ def close_all_connections():
         _connection_pool = None
 
 
+def start_session_query(session: str) -> Tuple[str, int]:
+    """
+    Start a new query for a client session, superseding its previous one.
+
+    The previous query of the session, if still running, is cancelled (the same
+    as pg_cancel_backend): it fails with QueryCanceled and its connection goes back
+    to the pool. Queries not started yet are told they are superseded by
+    attach_session_query.
+
+    The cancel is only submitted here, to a thread of its own: it never blocks the
+    registry lock nor the caller. The query is detached from its session at once,
+    and its connection does not go back to the pool (detach_session_query) until
+    the cancel has been sent, so a query of another request running on the same
+    connection is never cancelled.
+
+    Must be called in arrival order (from the event loop), not from the thread
+    running the query.
+
+    Args:
+        session (str): The client session (e.g. one search box).
+
+    Returns:
+        Tuple[str, int]: The (session, ticket) of the new query.
+    """
+    with _session_lock:
+        ticket = next(_session_tickets)
+        previous = _session_queries.get(session)
+        _session_queries[session] = [ticket, None]
+        if previous is not None and previous[1] is not None:
+            _session_cancels[(session, previous[0])] = _cancel_executor.submit(
+                previous[1].cancel
+            )
+    return session, ticket
+
+
+def attach_session_query(session: str, ticket: int, conn) -> bool:
+    """
+    Register the connection about to run the query of a session.
+
+    Args:
+        session (str): The client session.
+        ticket (int): The ticket returned by start_session_query.
+        conn: The connection running the query.
+
+    Returns:
+        bool: False if a newer query of the session started meanwhile (the query
+        should not run).
+    """
+    with _session_lock:
+        current = _session_queries.get(session)
+        if current is None or current[0] != ticket:
+            return False
+        current[1] = conn
+        return True
+
+
+def detach_session_query(session: str, ticket: int):
+    """
+    Unregister the connection of a session query, before it goes back to the pool.
+
+    If a newer query of the session is cancelling this one, waits until the cancel
+    has been sent: sent later, it could hit the query of another request.
+
+    Args:
+        session (str): The client session.
+        ticket (int): The ticket returned by start_session_query.
+    """
+    with _session_lock:
+        current = _session_queries.get(session)
+        if current is not None and current[0] == ticket:
+            current[1] = None
+        cancel = _session_cancels.pop((session, ticket), None)
+    if cancel is not None:
+        wait([cancel])
+
+
+def is_latest_session_query(session: str, ticket: int) -> bool:
+    """
+    Check that no newer query of a session started (the query was not superseded).
+
+    Args:
+        session (str): The client session.
+        ticket (int): The ticket returned by start_session_query.
+    """
+    with _session_lock:
+        current = _session_queries.get(session)
+        return current is not None and current[0] == ticket
+
+
+def end_session_query(session: str, ticket: int):
+    """
+    Forget the query of a session once it is done, unless a newer one started.
+
+    Args:
+        session (str): The client session.
+        ticket (int): The ticket returned by start_session_query.
+    """
+    with _session_lock:
+        current = _session_queries.get(session)
+        if current is not None and current[0] == ticket:
+            del _session_queries[session]
+
+
 # Register cleanup function to run on application exit
 atexit.register(close_all_connections)
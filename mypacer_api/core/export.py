@@ -0,0 +1,107 @@
+"""
+Module containing encoders for streamed responses (NDJSON and CSV).
+
+Encoders consume an iterator of rows and yield bytes chunks of about CHUNK_SIZE
+bytes, so that a response of any size is produced with bounded memory.
+"""
+
+import csv
+import io
+import json
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+# Approximate size of the chunks sent to the client, in bytes
+CHUNK_SIZE = 64 * 1024
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def iter_ndjson(rows: Iterable[Dict]) -> Iterator[bytes]:
+    """
+    Encode rows as newline-delimited JSON.
+
+    Args:
+        rows (Iterable[Dict]): The rows to encode.
+
+    Returns:
+        Iterator[bytes]: Chunks of NDJSON, one JSON object per line.
+    """
+    buffer: List[str] = []
+    size = 0
+    for row in rows:
+        line = json.dumps(row, default=str, separators=(",", ":")) + "\n"
+        buffer.append(line)
+        size += len(line)
+        if size >= CHUNK_SIZE:
+            yield "".join(buffer).encode()
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer).encode()
+
+
+def iter_csv(rows: Iterable[Dict], fieldnames: List[str]) -> Iterator[bytes]:
+    """
+    Encode rows as CSV with a header line.
+
+    Args:
+        rows (Iterable[Dict]): The rows to encode.
+        fieldnames (List[str]): The columns, in order.
+
+    Returns:
+        Iterator[bytes]: Chunks of CSV.
+    """
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=fieldnames, extrasaction="ignore")
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(row)
+        if output.tell() >= CHUNK_SIZE:
+            yield output.getvalue().encode()
+            output.seek(0)
+            output.truncate()
+    if output.tell():
+        yield output.getvalue().encode()
+
+
+def encode_rows(rows: Iterable[Dict], fieldnames: List[str], fmt: str):
+    """
+    Encode rows in one of the streaming formats.
+
+    Args:
+        rows (Iterable[Dict]): The rows to encode.
+        fieldnames (List[str]): The columns, in order (used by CSV).
+        fmt (str): "ndjson" or "csv".
+
+    Returns:
+        Iterator[bytes]: The encoded chunks.
+    """
+    if fmt == "csv":
+        return iter_csv(rows, fieldnames)
+    return iter_ndjson(rows)
+
+
+class ClosingStream:
+    """
+    Encoded chunks whose rows hold resources (a cursor, a pool connection).
+
+    close() releases them whether or not the chunks were iterated: closing a
+    generator that never started does not run its finally block, so the owner of
+    a streamed response must call close() once it is sent or abandoned.
+    """
+
+    def __init__(
+        self, chunks: Iterator[bytes], close: Optional[Callable[[], None]] = None
+    ):
+        self._chunks = chunks
+        self._close = close
+
+    def __iter__(self) -> Iterator[bytes]:
+        return self._chunks
+
+    def close(self) -> None:
+        """Release the resources of the rows (safe to call more than once)."""
+        if self._close is not None:
+            self._close()
@@ -0,0 +1,214 @@
+"""
+HTTP caching for read endpoints: Cache-Control, ETag, Last-Modified and 304 responses.
+
+Each cached route has a CachePolicy. When the policy can tell cheaply which version
+of the data a request would return (e.g. when an athlete's records were fetched, or
+when the athletes table was last updated), a weak ETag and Last-Modified are derived
+from that version and conditional requests are answered with 304 before the endpoint
+runs. Otherwise the response body is hashed into a strong ETag, which still saves
+the transfer of unchanged responses.
+
+These headers also let the nginx reverse proxy and browsers cache and revalidate
+responses without reaching the Python workers.
+"""
+
+import hashlib
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Callable, Dict, Optional
+
+from fastapi import Request
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import Response
+
+from mypacer_api import __version__
+
+# Headers copied from the full response to a 304 response
+_VALIDATOR_HEADERS = ("cache-control", "etag", "last-modified", "vary")
+
+
+class CachePolicy:
+    """
+    Caching rules of a route.
+
+    Attributes:
+        cache_control (str): Value of the Cache-Control header.
+        version (Callable): Function taking the request and returning the timestamp of
+            the data it would return, or None when unknown. It runs in the thread pool
+            on every request and must be cheap (in-memory or cached lookups).
+    """
+
+    __slots__ = ("cache_control", "version")
+
+    def __init__(
+        self,
+        cache_control: str,
+        version: Optional[Callable[[Request], Optional[float]]] = None,
+    ):
+        self.cache_control = cache_control
+        self.version = version
+
+
+def _weak_etag(version: float) -> str:
+    """
+    Build a weak ETag from a data version (and the API version, for format changes).
+    """
+    digest = hashlib.sha1(f"{__version__}:{version!r}".encode()).hexdigest()[:16]
+    return f'W/"{digest}"'
+
+
+def _strong_etag(body: bytes) -> str:
+    """
+    Build a strong ETag from the response body.
+    """
+    return f'"{hashlib.sha1(body).hexdigest()[:16]}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Weak comparison of an ETag with an If-None-Match header (RFC 9110).
+    """
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def _not_modified(request: Request, etag: str, last_modified: Optional[float]) -> bool:
+    """
+    Evaluate the conditional headers of a request.
+    If-None-Match takes precedence over If-Modified-Since.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        # HTTP dates have a one second resolution
+        return int(last_modified) <= since
+    return False
+
+
+def accepts_encoding(accept_encoding: Optional[str], coding: str) -> bool:
+    """
+    Tell whether an Accept-Encoding header accepts a content coding (RFC 9110).
+
+    Args:
+        accept_encoding (str): The header value, e.g. "gzip;q=0.8, br".
+        coding (str): The content coding, e.g. "gzip".
+
+    Returns:
+        bool: True if the coding is listed, or matched by "*", with a q-value above 0.
+    """
+    qvalues = {}
+    for item in (accept_encoding or "").split(","):
+        name, _, params = item.partition(";")
+        qvalue = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    qvalue = float(value)
+                except ValueError:
+                    qvalue = 0.0
+        if name.strip():
+            qvalues[name.strip().lower()] = qvalue
+    if coding in qvalues:
+        return qvalues[coding] > 0
+    return qvalues.get("*", 0.0) > 0
+
+
+def _validator_headers(
+    policy: CachePolicy, etag: str, last_modified: Optional[float]
+) -> Dict[str, str]:
+    """
+    Build the caching headers of a response.
+    """
+    headers = {"Cache-Control": policy.cache_control, "ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+    return headers
+
+
+class HTTPCacheMiddleware(BaseHTTPMiddleware):
+    """
+    Middleware adding caching headers to GET routes and answering 304 when possible.
+    """
+
+    def __init__(self, app, policies: Dict[str, CachePolicy]):
+        """
+        Args:
+            app: The ASGI application.
+            policies (Dict[str, CachePolicy]): Caching rules, keyed by route path.
+        """
+        super().__init__(app)
+        self.policies = policies
+
+    async def _version(self, policy: CachePolicy, request: Request):
+        """
+        Get the data version of a request, None if unknown or unavailable.
+        """
+        if policy.version is None:
+            return None
+        try:
+            return await run_in_threadpool(policy.version, request)
+        except Exception:  # noqa: BLE001 - caching must never break the endpoint
+            return None
+
+    async def dispatch(self, request: Request, call_next):
+        policy = self.policies.get(request.url.path)
+        if policy is None or request.method != "GET":
+            return await call_next(request)
+
+        # Answer revalidations without running the endpoint
+        version = await self._version(policy, request)
+        if version is not None:
+            etag = _weak_etag(version)
+            if _not_modified(request, etag, version):
+                return Response(
+                    status_code=304,
+                    headers=_validator_headers(policy, etag, version),
+                )
+
+        response = await call_next(request)
+        if response.status_code != 200:
+            return response
+
+        body = b"".join([chunk async for chunk in response.body_iterator])
+
+        # The endpoint may have produced the data (e.g. records fetched just now)
+        if version is None:
+            version = await self._version(policy, request)
+        etag = _weak_etag(version) if version is not None else _strong_etag(body)
+
+        headers = {
+            key: value
+            for key, value in response.headers.items()
+            if key.lower() != "content-length"
+        }
+        headers.update(_validator_headers(policy, etag, version))
+
+        if _not_modified(request, etag, version):
+            return Response(
+                status_code=304,
+                headers={
+                    key: value
+                    for key, value in headers.items()
+                    if key.lower() in _VALIDATOR_HEADERS
+                },
+            )
+
+        return Response(
+            content=body,
+            status_code=response.status_code,
+            headers=headers,
+            media_type=response.media_type,
+        )
@@ -0,0 +1,222 @@
+"""
+Bulk ingestion of FFA athletes, clubs and club memberships into PostgreSQL.
+
+Rows are streamed with COPY into an UNLOGGED staging table, then merged into the live
+table with a single set-based upsert keyed on `ffa_id`. Names are normalized with
+normalize_text() inside the merge, so the row triggers do not recompute them. Rows
+whose values did not change are skipped, so a nightly refresh only writes (and only
+bloats the trigram indexes with) the rows that actually changed. Readers are never blocked: the merge
+only takes row locks. When rows changed, the data generation is bumped in the same
+transaction: API workers drop their search caches when they see it (within
+SEARCH_CACHE_GENERATION_CHECK seconds, see core.search_cache).
+
+Usage:
+    python -m mypacer_api.core.ingestion athletes athletes.csv
+    python -m mypacer_api.core.ingestion clubs - < clubs.csv
+    python -m mypacer_api.core.ingestion athlete_clubs memberships.csv
+
+Memberships reference athletes and clubs by FFA id: load athletes and clubs first.
+
+The CSV files must have a header line with the column names listed in TABLES.
+"""
+
+import argparse
+import sys
+import time
+from typing import IO, Dict
+
+import psycopg2
+
+from mypacer_api.core import database
+
+# Columns expected in the CSV source, per target table
+TABLES: Dict[str, tuple] = {
+    "athletes": (
+        "ffa_id",
+        "license_id",
+        "name",
+        "url",
+        "birth_date",
+        "sexe",
+        "nationality",
+    ),
+    "clubs": ("ffa_id", "name", "first_year", "last_year", "url"),
+    "athlete_clubs": ("athlete_ffa_id", "club_ffa_id", "season"),
+}
+
+# Same rule as the idx_athletes_license_id_unique partial index
+_VALID_LICENSE = "{0} IS NOT NULL AND {0} NOT IN ('', '-', 'None')"
+
+_MERGE_QUERIES: Dict[str, str] = {
+    "athletes": f"""
+        WITH source AS (
+            SELECT DISTINCT ON (ffa_id) *
+            FROM athletes_staging
+            WHERE ffa_id IS NOT NULL AND name IS NOT NULL
+            ORDER BY ffa_id
+        ),
+        deduplicated AS (
+            SELECT *,
+                row_number() OVER (PARTITION BY license_id ORDER BY ffa_id) AS rank
+            FROM source
+        )
+        INSERT INTO athletes (
+            ffa_id, license_id, name, normalized_name, url, birth_date, sexe, nationality
+        )
+        SELECT s.ffa_id, s.license_id, s.name, normalize_text(s.name), s.url,
+            s.birth_date, s.sexe, s.nationality
+        FROM deduplicated s
+        WHERE NOT ({_VALID_LICENSE.format("s.license_id")})
+            OR (
+                s.rank = 1
+                AND NOT EXISTS (
+                    SELECT 1 FROM athletes a
+                    WHERE a.license_id = s.license_id AND a.ffa_id <> s.ffa_id
+                )
+            )
+        ON CONFLICT (ffa_id) DO UPDATE SET
+            license_id = EXCLUDED.license_id,
+            name = EXCLUDED.name,
+            normalized_name = EXCLUDED.normalized_name,
+            url = EXCLUDED.url,
+            birth_date = EXCLUDED.birth_date,
+            sexe = EXCLUDED.sexe,
+            nationality = EXCLUDED.nationality
+        WHERE (athletes.license_id, athletes.name, athletes.url,
+               athletes.birth_date, athletes.sexe, athletes.nationality)
+            IS DISTINCT FROM
+              (EXCLUDED.license_id, EXCLUDED.name, EXCLUDED.url,
+               EXCLUDED.birth_date, EXCLUDED.sexe, EXCLUDED.nationality)
+        """,
+    "clubs": """
+        INSERT INTO clubs (ffa_id, name, normalized_name, first_year, last_year, url)
+        SELECT DISTINCT ON (ffa_id) ffa_id, name, normalize_text(name),
+            first_year::INTEGER, last_year::INTEGER, url
+        FROM clubs_staging
+        WHERE ffa_id IS NOT NULL AND name IS NOT NULL
+        ORDER BY ffa_id
+        ON CONFLICT (ffa_id) DO UPDATE SET
+            name = EXCLUDED.name,
+            normalized_name = EXCLUDED.normalized_name,
+            first_year = EXCLUDED.first_year,
+            last_year = EXCLUDED.last_year,
+            url = EXCLUDED.url
+        WHERE (clubs.name, clubs.first_year, clubs.last_year, clubs.url)
+            IS DISTINCT FROM
+              (EXCLUDED.name, EXCLUDED.first_year, EXCLUDED.last_year, EXCLUDED.url)
+        """,
+    # Memberships of unknown athletes or clubs are skipped; existing ones are kept
+    "athlete_clubs": """
+        INSERT INTO athlete_clubs (club_id, season, athlete_id)
+        SELECT c.id, s.season::INTEGER, a.id
+        FROM athlete_clubs_staging s
+        JOIN athletes a ON a.ffa_id = s.athlete_ffa_id
+        JOIN clubs c ON c.ffa_id = s.club_ffa_id
+        WHERE s.season IS NOT NULL
+        ON CONFLICT DO NOTHING
+        """,
+}
+
+
+def ingest(table: str, source: IO) -> dict:
+    """
+    Load a CSV stream into a table through an unlogged staging table.
+
+    Args:
+        table (str): The target table, one of TABLES.
+        source (IO): A file-like object with CSV content (header line included).
+
+    Returns:
+        dict: Ingestion report with the number of rows loaded into staging, the
+        number of rows inserted or updated, the duration and the throughput.
+    """
+    if table not in TABLES:
+        raise ValueError(f"Unknown table '{table}'. Expected one of {list(TABLES)}.")
+
+    columns = ", ".join(TABLES[table])
+    staging = f"{table}_staging"
+    column_definitions = ", ".join(f"{column} TEXT" for column in TABLES[table])
+
+    conn = None
+    cursor = None
+    start = time.perf_counter()
+
+    try:
+        conn = database.get_connection()
+        cursor = conn.cursor()
+
+        # The staging table is rebuilt on every run and never needs to survive a crash
+        cursor.execute(
+            f"CREATE UNLOGGED TABLE IF NOT EXISTS {staging} ({column_definitions})"
+        )
+        cursor.execute(f"TRUNCATE {staging}")
+        cursor.execute("SET LOCAL synchronous_commit = off")
+
+        cursor.copy_expert(
+            f"COPY {staging} ({columns}) FROM STDIN WITH (FORMAT csv, HEADER true)",
+            source,
+        )
+        rows_loaded = cursor.rowcount
+
+        cursor.execute(_MERGE_QUERIES[table])
+        rows_merged = cursor.rowcount
+        if rows_merged:
+            # Committed with the merge: API workers see both together
+            cursor.execute("UPDATE data_generation SET generation = generation + 1")
+
+        cursor.execute(f"TRUNCATE {staging}")
+        conn.commit()
+
+        # Refresh planner statistics once instead of relying on autoanalyze
+        cursor.execute(f"ANALYZE {table}")
+        conn.commit()
+
+    except psycopg2.Error:
+        if conn:
+            conn.rollback()
+        raise
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            database.release_connection(conn)
+
+    seconds = time.perf_counter() - start
+    return {
+        "table": table,
+        "rows_loaded": rows_loaded,
+        "rows_merged": rows_merged,
+        "seconds": round(seconds, 3),
+        "rows_per_second": round(rows_loaded / seconds) if seconds else 0,
+    }
+
+
+def main():
+    """
+    Command line entry point.
+    """
+    parser = argparse.ArgumentParser(
+        description="Bulk load athletes, clubs or club memberships."
+    )
+    parser.add_argument("table", choices=list(TABLES))
+    parser.add_argument("source", help="CSV file path, or - for standard input")
+    args = parser.parse_args()
+
+    try:
+        if args.source == "-":
+            report = ingest(args.table, sys.stdin)
+        else:
+            with open(args.source, encoding="utf-8") as source:
+                report = ingest(args.table, source)
+    finally:
+        database.close_all_connections()
+
+    print(
+        f"{report['table']}: {report['rows_loaded']} rows loaded, "
+        f"{report['rows_merged']} inserted/updated in {report['seconds']}s "
+        f"({report['rows_per_second']} rows/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Module containing functions for predicting race times from an athlete's records.
+
+Two models are available:
+- "riegel": T2 = T1 * (D2 / D1) ** RIEGEL_EXPONENT
+- "vdot": Jack Daniels' VDOT, the VO2max equivalent of a performance. Times for
+  every distance at every VDOT of a grid are precomputed once; predictions are
+  then a VDOT computation and an interpolation in that table.
+
+For each target distance the prediction uses the athlete's record at the closest
+distance (in distance ratio), so a 10 km prediction comes from the 5 km or the
+half-marathon record rather than from the 800 m one.
+"""
+
+import math
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Dict, List, Mapping, Optional
+
+RIEGEL_EXPONENT = 1.06
+
+PREDICTION_MODELS = ("riegel", "vdot")
+
+# VDOT grid of the precomputed table
+_VDOT_MIN = 10.0
+_VDOT_MAX = 100.0
+_VDOT_STEP = 0.5
+_VDOT_GRID = [
+    _VDOT_MIN + i * _VDOT_STEP
+    for i in range(int((_VDOT_MAX - _VDOT_MIN) / _VDOT_STEP) + 1)
+]
+
+
+def vdot(distance: float, seconds: float) -> float:
+    """
+    Compute the VDOT of a performance (Daniels & Gilbert formulas).
+
+    Args:
+    distance (float): The distance in meters.
+    seconds (float): The time in seconds.
+
+    Returns:
+    float: The VDOT of the performance.
+    """
+    minutes = seconds / 60
+    velocity = distance / minutes
+    vo2 = -4.60 + 0.182258 * velocity + 0.000104 * velocity**2
+    fraction = (
+        0.8
+        + 0.1894393 * math.exp(-0.012778 * minutes)
+        + 0.2989558 * math.exp(-0.1932605 * minutes)
+    )
+    return vo2 / fraction
+
+
+def _solve_vdot_time(distance: float, target: float) -> float:
+    """
+    Find the time in seconds whose VDOT over a distance equals the target (bisection).
+    """
+    # VDOT decreases when the time increases
+    low, high = distance / 15, distance * 2
+    for _ in range(60):
+        middle = (low + high) / 2
+        if vdot(distance, middle) > target:
+            low = middle
+        else:
+            high = middle
+    return (low + high) / 2
+
+
+@lru_cache(maxsize=32)
+def _vdot_table(distances: tuple) -> List[List[float]]:
+    """
+    Precompute the time of every distance at every VDOT of the grid.
+
+    Returns:
+    List[List[float]]: table[j][k] is the time in seconds over distances[j]
+    at VDOT _VDOT_GRID[k].
+    """
+    return [
+        [_solve_vdot_time(distance, value) for value in _VDOT_GRID]
+        for distance in distances
+    ]
+
+
+@lru_cache(maxsize=32)
+def _riegel_factors(distances: tuple) -> List[List[float]]:
+    """
+    Precompute the Riegel factors between every pair of distances.
+
+    Returns:
+    List[List[float]]: factors[i][j] converts a time over distances[i]
+    into a time over distances[j].
+    """
+    return [
+        [(target / source) ** RIEGEL_EXPONENT for target in distances]
+        for source in distances
+    ]
+
+
+@lru_cache(maxsize=4096)
+def _closest_sources(distances: tuple, available: int) -> tuple:
+    """
+    For each target distance, the index of the closest distance with a record.
+
+    Athletes share a limited number of record patterns, so the choice of the
+    source record is computed once per pattern.
+
+    Args:
+    distances (tuple): The distances in meters.
+    available (int): Bit i is set when there is a record over distances[i].
+
+    Returns:
+    tuple: The source index of each target distance, or None without any record.
+    """
+    candidates = [i for i in range(len(distances)) if available >> i & 1]
+    if not candidates:
+        return (None,) * len(distances)
+
+    def closest(target: float) -> int:
+        return min(candidates, key=lambda i: abs(math.log(distances[i] / target)))
+
+    return tuple(closest(target) for target in distances)
+
+
+def _interpolate_time(row: List[float], value: float, distance: float) -> float:
+    """
+    Interpolate the time of a VDOT in one row of the precomputed table.
+    """
+    if not _VDOT_MIN <= value <= _VDOT_MAX:
+        return _solve_vdot_time(distance, value)
+    k = min(bisect_right(_VDOT_GRID, value), len(_VDOT_GRID) - 1)
+    ratio = (value - _VDOT_GRID[k - 1]) / _VDOT_STEP
+    return row[k - 1] + (row[k] - row[k - 1]) * ratio
+
+
+def predict_times(
+    athletes_records: List[Mapping[float, float]],
+    distances: list,
+    model: str = "riegel",
+) -> List[Dict[str, Optional[float]]]:
+    """
+    Predict race times for every distance, for many athletes at once.
+
+    Args:
+    athletes_records (List[Mapping[float, float]]): For each athlete, best times in
+        seconds keyed by distance in meters.
+    distances (list): The distances in meters to predict.
+    model (str): One of PREDICTION_MODELS.
+
+    Returns:
+    List[Dict[str, Optional[float]]]: For each athlete, predicted times in seconds
+    keyed by distance (as in the pace table), None when the athlete has no record
+    to predict from.
+    """
+    if model not in PREDICTION_MODELS:
+        raise ValueError(
+            f"Unknown prediction model '{model}'. Expected one of {PREDICTION_MODELS}."
+        )
+
+    distances_key = tuple(distances)
+    keys = [str(distance) for distance in distances_key]
+    if model == "riegel":
+        factors = _riegel_factors(distances_key)
+    else:
+        table = _vdot_table(distances_key)
+
+    predictions = []
+    for records in athletes_records:
+        # Record of each distance, or None
+        times = [records.get(distance) or None for distance in distances_key]
+        available = sum(1 << i for i, time in enumerate(times) if time)
+        sources = _closest_sources(distances_key, available)
+
+        if model == "riegel":
+            values = [
+                None if i is None else times[i] * factors[i][j]
+                for j, i in enumerate(sources)
+            ]
+        else:
+            athlete_vdot = {
+                i: vdot(distances_key[i], times[i])
+                for i in set(sources)
+                if i is not None
+            }
+            values = [
+                (
+                    None
+                    if i is None
+                    else _interpolate_time(table[j], athlete_vdot[i], distances_key[j])
+                )
+                for j, i in enumerate(sources)
+            ]
+
+        predictions.append(
+            {
+                key: (
+                    times[j]
+                    if sources[j] == j
+                    else None if value is None else round(value, 2)
+                )
+                for j, (key, value) in enumerate(zip(keys, values))
+            }
+        )
+
+    return predictions
@@ -0,0 +1,151 @@
+"""
+Pre-rendering of common pace tables to static, gzip-compressed JSON files.
+
+The default tables (official distances, usual min/max/increment combinations) are
+the same for every user. They are rendered once with the calculator to
+`<name>.json.gz` files plus a `manifest.json` describing them. File names contain a
+hash of their content, so they can be served with immutable cache headers, by nginx
+(`gzip_static`) or by the API.
+
+Usage:
+    python -m mypacer_api.core.prerender --out static/pace_tables
+"""
+
+import argparse
+import gzip
+import hashlib
+import itertools
+import json
+import os
+import time
+from typing import Dict, Iterable, Optional
+
+from mypacer_api.core import calculator
+from mypacer_api.models import OFFICIAL_DISTANCES
+
+MANIFEST_NAME = "manifest.json"
+
+# Manifests of another version (older table keys) are ignored by load_manifest()
+MANIFEST_VERSION = 2
+
+# Usual combinations of the pace table form (seconds per kilometer)
+DEFAULT_MIN_PACES = (600, 540, 480, 420, 360, 300)
+DEFAULT_MAX_PACES = (120, 150, 180, 210, 240)
+DEFAULT_INCREMENTS = (1, 2, 5, 10, 15, 30)
+
+
+def default_presets() -> Iterable[tuple]:
+    """
+    Iterate over the (min_pace, max_pace, increment, distances) tables to render.
+    """
+    for min_pace, max_pace, increment in itertools.product(
+        DEFAULT_MIN_PACES, DEFAULT_MAX_PACES, DEFAULT_INCREMENTS
+    ):
+        yield min_pace, max_pace, increment, OFFICIAL_DISTANCES
+
+
+def table_key(min_pace: int, max_pace: int, increment: int, distances: list) -> str:
+    """
+    Build the manifest key of a table (distances order does not matter).
+
+    Distances are formatted like the keys of the table rows (str()), so 1000 and
+    1000.0 are different tables: their JSON rows have "1000" and "1000.0" keys.
+    """
+    distances_key = ",".join(str(d) for d in sorted(distances))
+    return f"{min_pace}:{max_pace}:{increment}:{distances_key}"
+
+
+def render(out_dir: str, presets: Iterable[tuple]) -> dict:
+    """
+    Render pace tables to gzip-compressed JSON files and write their manifest.
+
+    Args:
+        out_dir (str): The output directory, created if needed.
+        presets (Iterable[tuple]): (min_pace, max_pace, increment, distances) tuples.
+
+    Returns:
+        dict: The manifest, mapping each table key to its file and description.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    tables = {}
+
+    for min_pace, max_pace, increment, distances in presets:
+        rows = calculator.calculate_pace_table(min_pace, max_pace, increment, distances)
+        # Same encoding as the JSON responses of the API
+        content = json.dumps(rows, separators=(",", ":")).encode()
+        digest = hashlib.sha1(content).hexdigest()[:12]
+        name = f"pace-{min_pace}-{max_pace}-{increment}-{digest}.json"
+        # mtime=0 keeps the compressed bytes reproducible
+        compressed = gzip.compress(content, compresslevel=9, mtime=0)
+
+        with open(os.path.join(out_dir, f"{name}.gz"), "wb") as artifact:
+            artifact.write(compressed)
+
+        tables[table_key(min_pace, max_pace, increment, distances)] = {
+            "file": name,
+            "min_pace": min_pace,
+            "max_pace": max_pace,
+            "increment": increment,
+            "distances": list(distances),
+            "rows": len(rows),
+            "bytes": len(content),
+            "gzip_bytes": len(compressed),
+        }
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "generated_at": int(time.time()),
+        "tables": tables,
+    }
+
+    # Atomic replace: the API never reads a partially written manifest
+    manifest_path = os.path.join(out_dir, MANIFEST_NAME)
+    with open(f"{manifest_path}.tmp", "w", encoding="utf-8") as manifest_file:
+        json.dump(manifest, manifest_file, indent=1)
+    os.replace(f"{manifest_path}.tmp", manifest_path)
+
+    return manifest
+
+
+def load_manifest(out_dir: str) -> Optional[Dict]:
+    """
+    Load the manifest of a directory of pre-rendered tables.
+
+    Args:
+        out_dir (str): The directory written by render().
+
+    Returns:
+        dict: The manifest, or None if the directory has no manifest or it was
+        written by another version (the tables must be rendered again).
+    """
+    try:
+        with open(os.path.join(out_dir, MANIFEST_NAME), encoding="utf-8") as manifest:
+            content = json.load(manifest)
+    except FileNotFoundError:
+        return None
+    if content.get("version") != MANIFEST_VERSION:
+        return None
+    return content
+
+
+def main():
+    """
+    Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description="Pre-render common pace tables.")
+    parser.add_argument("--out", required=True, help="Output directory")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    manifest = render(args.out, default_presets())
+    tables = manifest["tables"].values()
+    print(
+        f"{len(tables)} tables written to {args.out} in "
+        f"{time.perf_counter() - start:.1f}s "
+        f"({sum(t['bytes'] for t in tables) / 1e6:.1f} MB raw, "
+        f"{sum(t['gzip_bytes'] for t in tables) / 1e6:.1f} MB gzip)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+Opt-in statistical sampling profiler for production diagnosis.
+
+A background thread reads the Python stack of every other thread of the worker
+(`sys._current_frames()`) at a fixed interval and counts identical stacks. The result
+is returned in the folded format ("frame;frame;frame count" per line) read by
+flamegraph.pl, speedscope or inferno.
+
+Two modes:
+- timed: every thread is sampled for N seconds.
+- route: only requests to one route are profiled, a random fraction of them; threads
+  are sampled only while at least one of those requests is running, and stacks are
+  rooted at the route. Other requests running at the same time may contribute
+  samples too, so profile a route while it dominates the traffic.
+
+When no session is running, ProfilerMiddleware costs one attribute check per request
+and no thread is sampling.
+"""
+
+import asyncio
+import os
+import random
+import sys
+import threading
+from collections import Counter
+from types import FrameType
+from typing import Optional
+
+# Longest profiling session allowed, in seconds
+PROFILER_MAX_SECONDS = float(os.getenv("PROFILER_MAX_SECONDS", "60"))
+
+# Default time between two samples, in seconds
+DEFAULT_INTERVAL = 0.005
+
+# Leaf frames of threads waiting for work (event loop select, idle thread pool)
+_IDLE_FRAMES = {
+    ("selectors", "select"),
+    ("threading", "wait"),
+    ("queue", "get"),
+}
+
+# Running session, if any (at most one per worker process)
+_session: Optional["SamplingProfiler"] = None
+
+
+def _frame_name(frame) -> str:
+    """
+    Name a frame as "module:qualified_name".
+    """
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{frame.f_code.co_qualname}"
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of the other threads of the process from a background thread.
+
+    Attributes:
+        stacks (Counter): Number of samples of each folded stack.
+        samples (int): Number of sampling rounds taken.
+        requests (int): Number of requests profiled (route mode).
+    """
+
+    def __init__(
+        self,
+        interval: float = DEFAULT_INTERVAL,
+        route: Optional[str] = None,
+        fraction: float = 1.0,
+        include_idle: bool = False,
+    ):
+        """
+        Args:
+            interval (float): Time between two samples, in seconds.
+            route (str): Only profile requests to this path (None: timed mode).
+            fraction (float): Fraction of the requests to the route that are profiled.
+            include_idle (bool): Also count threads waiting for work.
+        """
+        self.interval = interval
+        self.route = route
+        self.fraction = fraction
+        self.include_idle = include_idle
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.requests = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+
+    def start(self):
+        """
+        Start sampling in the background thread.
+        """
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop sampling and wait for the background thread.
+        """
+        self._stop.set()
+        self._thread.join()
+
+    def should_profile(self, path: str) -> bool:
+        """
+        Decide whether a request is profiled (route mode only).
+        """
+        return path == self.route and random.random() < self.fraction
+
+    def enter_request(self):
+        """
+        Mark a profiled request as running: threads are sampled until it exits.
+        """
+        with self._lock:
+            self._in_flight += 1
+            self.requests += 1
+
+    def exit_request(self):
+        """
+        Mark a profiled request as finished.
+        """
+        with self._lock:
+            self._in_flight -= 1
+
+    def _run(self):
+        own_ident = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            if self.route is not None and not self._in_flight:
+                continue
+            self._sample(own_ident)
+
+    def _sample(self, own_ident: int):
+        """
+        Record the current stack of every other thread.
+        """
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        root = self.route
+        self.samples += 1
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            leaf = (frame.f_globals.get("__name__"), frame.f_code.co_name)
+            if not self.include_idle and leaf in _IDLE_FRAMES:
+                continue
+
+            stack = []
+            current: Optional[FrameType] = frame
+            while current is not None:
+                stack.append(_frame_name(current))
+                current = current.f_back
+            stack.append(root or names.get(ident, f"thread-{ident}"))
+            self.stacks[";".join(reversed(stack))] += 1
+
+    def folded(self) -> str:
+        """
+        Return the samples in the folded stacks format, most frequent first.
+        """
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.stacks.most_common()
+        )
+
+
+def get_session() -> Optional[SamplingProfiler]:
+    """
+    Get the running profiling session, None when the profiler is disabled.
+    """
+    return _session
+
+
+async def profile(
+    seconds: float,
+    interval: float = DEFAULT_INTERVAL,
+    route: Optional[str] = None,
+    fraction: float = 1.0,
+) -> SamplingProfiler:
+    """
+    Run a profiling session for a duration, without blocking the event loop.
+
+    Args:
+        seconds (float): Duration of the session (at most PROFILER_MAX_SECONDS).
+        interval (float): Time between two samples, in seconds.
+        route (str): Only profile requests to this path (None: every thread).
+        fraction (float): Fraction of the requests to the route that are profiled.
+
+    Returns:
+        SamplingProfiler: The finished session, with its samples.
+
+    Raises:
+        RuntimeError: If a session is already running.
+    """
+    global _session
+
+    if _session is not None:
+        raise RuntimeError("A profiling session is already running.")
+
+    session = SamplingProfiler(interval=interval, route=route, fraction=fraction)
+    _session = session
+    session.start()
+    try:
+        await asyncio.sleep(min(seconds, PROFILER_MAX_SECONDS))
+    finally:
+        _session = None
+        session.stop()
+    return session
+
+
+class ProfilerMiddleware:
+    """
+    ASGI middleware selecting the requests profiled in route mode.
+
+    Plain ASGI rather than BaseHTTPMiddleware, so that requests are passed through
+    untouched when no session is running.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        session = _session
+        if (
+            session is None
+            or session.route is None
+            or scope["type"] != "http"
+            or not session.should_profile(scope["path"])
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        session.enter_request()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            session.exit_request()
@@ -0,0 +1,232 @@
+"""
+Compact result types used internally and in the in-memory caches.
+
+Search results, scraped records and pace tables used to be carried as plain dicts
+(one dict per row), which dominates the memory of the caches and the allocations of
+the hot loops. These types hold the same data in tuples and arrays; they are encoded
+to the existing JSON shapes only at the response boundary (see main.py).
+
+`python -m benchmarks.bench_result_memory` measures the memory of each cached entry
+with both representations.
+"""
+
+import base64
+import binascii
+import json
+from array import array
+from collections.abc import Mapping
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+
+class AthleteHit(NamedTuple):
+    """
+    One athlete returned by a search, in the column order of the search queries.
+    """
+
+    id: int
+    ffa_id: Optional[str] = None
+    name: Optional[str] = None
+    url: Optional[str] = None
+    birth_date: Optional[str] = None
+    license_id: Optional[str] = None
+    sexe: Optional[str] = None
+    nationality: Optional[str] = None
+    score: Optional[float] = None
+
+
+class ClubHit(NamedTuple):
+    """
+    One club returned by a club search, in the column order of the search query.
+    """
+
+    id: int
+    ffa_id: Optional[str] = None
+    name: Optional[str] = None
+    first_year: Optional[int] = None
+    last_year: Optional[int] = None
+    url: Optional[str] = None
+    score: Optional[float] = None
+
+
+def encode_hits(
+    hits: Iterable[NamedTuple], fields: Optional[tuple] = None
+) -> List[Dict]:
+    """
+    Encode search results (AthleteHit or ClubHit) to the JSON shape of /get_athletes.
+
+    Args:
+        hits (Iterable[NamedTuple]): The search results, all of the same type.
+        fields (tuple): The fields to encode (default: all).
+
+    Returns:
+        List[Dict]: One dictionary per athlete or club.
+    """
+    hits = list(hits)
+    if fields is None:
+        return [hit._asdict() for hit in hits]
+    if not hits:
+        return []
+    positions = [hits[0]._fields.index(field) for field in fields]
+    return [{field: hit[i] for field, i in zip(fields, positions)} for hit in hits]
+
+
+def encode_cursor(values: tuple) -> str:
+    """
+    Encode the sort key of the last row of a page as an opaque pagination cursor.
+    """
+    data = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """
+    Decode a cursor built by encode_cursor().
+
+    Args:
+        cursor (str): The cursor sent by the client.
+        size (int): The expected number of values.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(data)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise ValueError("Invalid cursor.") from exc
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor.")
+    return values
+
+
+class Performance(NamedTuple):
+    """
+    One performance listed on an athlete's bases.athle.fr page.
+    """
+
+    event: str
+    distance: Optional[float]
+    seconds: float
+    date: Optional[date]
+    competition: Optional[str]
+
+
+def _distance_key(distance: float):
+    """
+    Return whole distances as int, as they are keyed in the scraper (800, not 800.0).
+    """
+    return int(distance) if distance.is_integer() else distance
+
+
+class RecordSet(Mapping):
+    """
+    Best times of an athlete, keyed by distance in meters.
+
+    Read-only mapping backed by a single array of doubles holding
+    (distance, time) pairs sorted by distance. Athletes have a dozen records at
+    most, so lookups scan the array.
+    """
+
+    __slots__ = ("_data",)
+
+    def __init__(self, records: Optional[Mapping] = None):
+        """
+        Args:
+            records (Mapping): Times in seconds keyed by distance in meters.
+        """
+        pairs = sorted((records or {}).items())
+        self._data = array("d", [value for pair in pairs for value in pair])
+
+    def __getitem__(self, distance: float) -> float:
+        data = self._data
+        for i in range(0, len(data), 2):
+            if data[i] == distance:
+                return data[i + 1]
+        raise KeyError(distance)
+
+    def __iter__(self) -> Iterator[float]:
+        return map(_distance_key, self._data[::2])
+
+    def __len__(self) -> int:
+        return len(self._data) // 2
+
+    def __repr__(self) -> str:
+        return f"RecordSet({self.to_dict()!r})"
+
+    def tobytes(self) -> bytes:
+        """
+        Serialize the records (machine byte order), see frombytes().
+        """
+        return self._data.tobytes()
+
+    @classmethod
+    def frombytes(cls, data: bytes) -> "RecordSet":
+        """
+        Rebuild records serialized by tobytes().
+        """
+        record_set = cls()
+        record_set._data.frombytes(data)
+        return record_set
+
+    def to_dict(self) -> Dict[float, float]:
+        """
+        Encode the records to the JSON shape of /get_athlete_records.
+        """
+        data = self._data
+        return dict(zip(map(_distance_key, data[::2]), data[1::2]))
+
+
+class PaceTable:
+    """
+    A pace table stored column-wise in arrays instead of one dict per row.
+
+    Attributes:
+        keys (tuple): The distance keys of the rows (str of each distance).
+        paces (array): The pace of each row, in seconds per kilometer (64-bit ints).
+        speeds (array): The speed of each row, in km/h.
+        times (array): The times in seconds, row-major (len(keys) values per row).
+    """
+
+    __slots__ = ("keys", "paces", "speeds", "times")
+
+    def __init__(self, keys: tuple, paces: array, speeds: array, times: array):
+        self.keys = keys
+        self.paces = paces
+        self.speeds = speeds
+        self.times = times
+
+    def __len__(self) -> int:
+        return len(self.paces)
+
+    def __iter__(self) -> Iterator[Dict]:
+        keys, times, width = self.keys, self.times, len(self.keys)
+        for i, (pace, speed) in enumerate(zip(self.paces, self.speeds)):
+            row = {"pace": pace, "speed": speed}
+            row.update(zip(keys, times[i * width : (i + 1) * width]))
+            yield row
+
+    def tobytes(self) -> bytes:
+        """
+        Serialize the arrays (machine byte order), see frombytes().
+        """
+        return self.paces.tobytes() + self.speeds.tobytes() + self.times.tobytes()
+
+    @classmethod
+    def frombytes(cls, keys: tuple, data: bytes) -> "PaceTable":
+        """
+        Rebuild a table serialized by tobytes(), given its distance keys.
+        """
+        rows = len(data) // (8 * (len(keys) + 2))
+        paces, speeds, times = array("q"), array("d"), array("d")
+        paces.frombytes(data[: 8 * rows])
+        speeds.frombytes(data[8 * rows : 16 * rows])
+        times.frombytes(data[16 * rows :])
+        return cls(keys, paces, speeds, times)
+
+    def to_rows(self) -> List[Dict]:
+        """
+        Encode the table to the JSON shape of /generate_table: one dict per row,
+        {"pace", "speed", <distance>: <time>, ...}.
+        """
+        return list(self)
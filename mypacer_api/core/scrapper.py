@@ -1,13 +1,69 @@
 """
-Module containing functions for scraping running records from the World Athletics website.
+Module containing functions for scraping running records and performance history
+from athlete pages.
 """
 
 import re
-from typing import Dict
+from datetime import date
+from typing import Dict, List, Optional, Tuple
 
 import requests
 from bs4 import BeautifulSoup as bs
 from fastapi import HTTPException
+from unidecode import unidecode
+
+from mypacer_api.core import workers
+from mypacer_api.core.results import Performance, RecordSet
+
+# Distance in meters of each running event of bases.athle.fr
+EVENT_DISTANCES: Dict[str, float] = {
+    "100m": 100,
+    "100m Piste Courte": 100,
+    "200m": 200,
+    "200m Piste Courte": 200,
+    "400m": 400,
+    "400m Piste Courte": 400,
+    "800m": 800,
+    "800m Piste Courte": 800,
+    "1 000m": 1000,
+    "1000m Piste Courte": 1000,
+    "1 500m": 1500,
+    "1 500m Piste Courte": 1500,
+    "Mile": 1609.34,
+    "Mile Piste Courte": 1609.34,
+    "3 000m": 3000,
+    "3 000m Piste Courte": 3000,
+    "5 000m": 5000,
+    "5 Km Route": 5000,
+    "10 Km Route": 10000,
+    "20 Km Route": 20000,
+    "1/2 Marathon": 21097,
+    "Marathon": 42195,
+}
+
+# French month abbreviations of bases.athle.fr dates ("4 Mai 2019", "20 Avr. 2019")
+_FRENCH_MONTHS = {
+    "janv": 1,
+    "fevr": 2,
+    "mars": 3,
+    "avr": 4,
+    "mai": 5,
+    "juin": 6,
+    "juil": 7,
+    "aout": 8,
+    "sept": 9,
+    "oct": 10,
+    "nov": 11,
+    "dec": 12,
+}
+
+# Header names of the performance tables, by field (first match wins)
+_PERFORMANCE_HEADERS = {
+    "event": ("epreuve",),
+    "performance": ("performance", "perf"),
+    "date": ("date",),
+    "competition": ("competition", "lieu"),
+}
 
 
 def ba_convert_time_to_seconds(time_str: str) -> float:
@@ -55,7 +111,7 @@ def ba_convert_time_to_seconds(time_str: str) -> float:
     return float(total_seconds)
 
 
-def parse_bases_athle_record_page(soup: bs) -> Dict[float, float]:
+def parse_bases_athle_record_page(soup: bs) -> RecordSet:
     """
     Function to extract athlete data from a record page using BeautifulSoup.
 
@@ -63,13 +119,13 @@ def parse_bases_athle_record_page(soup: bs) -> Dict[float, float]:
     soup (BeautifulSoup): The BeautifulSoup object containing the record page.
 
     Returns:
-    dict: A dictionary containing athlete data, including the athlete's name,
+    RecordSet: The best time in seconds of each distance in meters.
     """
 
     section = soup.find("section", attrs={"data-content": "section_5"})
 
     if not section:
-        return {}
+        return RecordSet()
 
     # Find the table with class 'linedRed' or 'base-table'
     table = section.find("table", class_="linedRed") or section.find(
@@ -77,33 +133,7 @@ def parse_bases_athle_record_page(soup: bs) -> Dict[float, float]:
     )
 
     if not table:
-        return {}
-
-    # Distance mapping in meters
-    distances: dict[str, float] = {
-        "100m": 100,
-        "100m Piste Courte": 100,
-        "200m": 200,
-        "200m Piste Courte": 200,
-        "400m": 400,
-        "400m Piste Courte": 400,
-        "800m": 800,
-        "800m Piste Courte": 800,
-        "1 000m": 1000,
-        "1000m Piste Courte": 1000,
-        "1 500m": 1500,
-        "1 500m Piste Courte": 1500,
-        "Mile": 1609.34,
-        "Mile Piste Courte": 1609.34,
-        "3 000m": 3000,
-        "3 000m Piste Courte": 3000,
-        "5 000m": 5000,
-        "5 Km Route": 5000,
-        "10 Km Route": 10000,
-        "20 Km Route": 20000,
-        "1/2 Marathon": 21097,
-        "Marathon": 42195,
-    }
+        return RecordSet()
 
     # Extract athlete records
     athlete_records: Dict[float, float] = {}
@@ -123,15 +153,17 @@ def parse_bases_athle_record_page(soup: bs) -> Dict[float, float]:
         event = cols[0].get_text(strip=True)
         performance = cols[1].get_text(strip=True)
 
-        event_key = distances.get(event)
+        event_key = EVENT_DISTANCES.get(event)
 
         # Skip if event is not recognized
         if not event_key:
             continue
 
-        perf_seconds = ba_convert_time_to_seconds(performance)
-
         # Skip if performance could not be converted
+        try:
+            perf_seconds = ba_convert_time_to_seconds(performance)
+        except ValueError:
+            continue
         if perf_seconds <= 0:
             continue
 
@@ -139,10 +171,169 @@ def parse_bases_athle_record_page(soup: bs) -> Dict[float, float]:
         prev = athlete_records.get(event_key)
         athlete_records[event_key] = min(prev, perf_seconds) if prev else perf_seconds
 
-    return athlete_records
+    return RecordSet(athlete_records)
+
+
+def parse_french_date(text: str) -> Optional[date]:
+    """
+    Convert a bases.athle.fr date ("4 Mai 2019", "20 Avr. 2019", "07/01/1963").
+
+    Args:
+    text (str): The date as displayed on the page.
+
+    Returns:
+    date: The date, or None if it cannot be parsed.
+    """
+    month: Optional[int]
+    text = unidecode(text).lower().strip()
+    numeric = re.fullmatch(r"(\d{1,2})/(\d{1,2})/(\d{4})", text)
+    if numeric:
+        day, month, year = map(int, numeric.groups())
+    else:
+        parts = text.replace(".", " ").split()
+        if len(parts) != 3 or not parts[2].isdigit():
+            return None
+        month = next(
+            (
+                number
+                for prefix, number in _FRENCH_MONTHS.items()
+                if parts[1].startswith(prefix)
+            ),
+            None,
+        )
+        day_text = parts[0].removesuffix("er")
+        if month is None or not day_text.isdigit():
+            return None
+        day, year = int(day_text), int(parts[2])
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def parse_performances(soup: bs) -> List[Performance]:
+    """
+    Extract every timed performance listed on an athlete page, in one pass.
+
+    Every table whose header has an event ("Epreuve") and a performance column is
+    read, columns being located by header name. Performances listed in several
+    tables (e.g. a record that is also a season result) are kept once.
+
+    Args:
+    soup (BeautifulSoup): The BeautifulSoup object containing the athlete page.
+
+    Returns:
+    List[Performance]: The performances, in page order. Non-timed performances
+    (jumps, throws) and unparseable times are skipped; events without a known
+    distance keep distance None.
+    """
+    performances = []
+    seen = set()
+
+    for table in soup.find_all("table"):
+        headers = [
+            unidecode(header.get_text(strip=True)).lower()
+            for header in table.find_all("th")
+        ]
+        columns = {}
+        for field, names in _PERFORMANCE_HEADERS.items():
+            for name in names:
+                if name in headers:
+                    columns[field] = headers.index(name)
+                    break
+        if "event" not in columns or "performance" not in columns:
+            continue
+
+        for row in table.find_all("tr"):
+            if "detail-row" in (row.get("class", None) or []):
+                continue
+            cells = row.find_all("td", recursive=False)
+            if len(cells) <= max(columns.values()):
+                continue
+            texts = [cell.get_text(strip=True) for cell in cells]
+
+            try:
+                seconds = ba_convert_time_to_seconds(texts[columns["performance"]])
+            except ValueError:
+                # Malformed time (e.g. text around the quote marks): skip the row only
+                continue
+            if seconds <= 0:
+                continue
+
+            event = texts[columns["event"]]
+            performance = Performance(
+                event=event,
+                distance=EVENT_DISTANCES.get(event),
+                seconds=seconds,
+                date=(
+                    parse_french_date(texts[columns["date"]])
+                    if "date" in columns
+                    else None
+                ),
+                competition=(
+                    texts[columns["competition"]] or None
+                    if "competition" in columns
+                    else None
+                ),
+            )
+            if performance not in seen:
+                seen.add(performance)
+                performances.append(performance)
+
+    return performances
+
+
+def parse_records_html(html: bytes) -> RecordSet:
+    """
+    Parse the raw HTML of a record page.
+
+    This is the CPU-bound part of scraping, kept as a module-level function
+    taking bytes so that it can run in the worker process pool.
+
+    Args:
+    html (bytes): The HTML content of the athlete record page.
+
+    Returns:
+    RecordSet: The best time in seconds of each distance in meters.
+    """
+    soup = bs(html, "html.parser")
+    return parse_bases_athle_record_page(soup)
+
+
+def parse_athlete_page_html(html: bytes) -> Tuple[RecordSet, List[Performance]]:
+    """
+    Parse the raw HTML of a record page into its records and all its performances,
+    parsing the HTML once (runs in the worker process pool, like parse_records_html).
+
+    Args:
+    html (bytes): The HTML content of the athlete record page.
+
+    Returns:
+    Tuple[RecordSet, List[Performance]]: The best times and every performance.
+    """
+    soup = bs(html, "html.parser")
+    return parse_bases_athle_record_page(soup), parse_performances(soup)
+
+
+def scrap_athlete_page(url: str) -> Tuple[RecordSet, List[Performance]]:
+    """
+    Scrape the records and the full performance history of an athlete.
+
+    Args:
+    url (str): The URL of the athlete record page on 'bases.athle.fr'.
+
+    Returns:
+    Tuple[RecordSet, List[Performance]]: The best times and every performance.
+    """
+    response = requests.get(url, timeout=10)
+    if response.status_code == 200:
+        return workers.run(parse_athlete_page_html, response.content)
+    raise HTTPException(
+        status_code=response.status_code, detail="Failed to make an external request"
+    )
 
 
-def scrap_athlete_records(url: str) -> Dict[float, float]:
+def scrap_athlete_records(url: str) -> RecordSet:
     """
     Function to scrape athlete data from the 'bases.athle.fr' website.
 
@@ -150,12 +341,11 @@ def scrap_athlete_records(url: str) -> Dict[float, float]:
     html (str): The HTML content of the athlete record page.
 
     Returns:
-    dict: A dictionary containing athlete data, including the athlete's name,
+    RecordSet: The best time in seconds of each distance in meters.
     """
     response = requests.get(url, timeout=10)
     if response.status_code == 200:
-        soup = bs(response.text, "html.parser")
-        return parse_bases_athle_record_page(soup)
+        return workers.run(parse_records_html, response.content)
     raise HTTPException(
         status_code=response.status_code, detail="Failed to make an external request"
     )
@@ -0,0 +1,274 @@
+"""
+Short-lived in-memory cache for athlete search results.
+
+Typeahead traffic is highly repetitive: the same prefixes are typed by many users and
+the same user backspaces over the same queries. This module caches search results
+keyed on the normalized query, limit, offset, search mode and variant (projected
+fields and filters), with a short TTL.
+
+Ingestion runs in another process: it bumps the data generation row in PostgreSQL
+(see core.ingestion), and each worker drops its cache when it sees a new generation
+(checked at most every SEARCH_CACHE_GENERATION_CHECK seconds, see check_generation).
+
+When a cached result set is complete (offset 0 and fewer rows than the limit, so every
+matching athlete is known), a longer query starting with the same text can be answered
+by filtering that set in Python: with the ILIKE search, every athlete matching "dupon"
+also matches "dupo".
+"""
+
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple
+
+from unidecode import unidecode
+
+from mypacer_api.core.results import AthleteHit
+
+# Time-to-live of a cached result, in seconds
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "30"))
+_MAX_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", "2000"))
+
+# Only the ILIKE search is monotonic (a longer query matches a subset of the rows)
+_PREFIX_REUSE_MODES = ("ilike",)
+
+# Key: (normalized_query, limit, offset, mode, variant)
+# Value: (expires_at, rows)
+_search_cache: "OrderedDict[tuple, Tuple[float, list]]" = OrderedDict()
+
+# Complete result sets usable for prefix reuse
+# Key: (normalized_query, mode, variant)
+# Value: (expires_at, rows)
+_complete_sets: "OrderedDict[tuple, Tuple[float, list]]" = OrderedDict()
+
+# Time between two checks of the data generation, in seconds
+SEARCH_CACHE_GENERATION_CHECK = float(os.getenv("SEARCH_CACHE_GENERATION_CHECK", "5"))
+
+# Last data generation seen, and when to check it again (time.monotonic())
+_generation: Optional[int] = None
+_next_generation_check = 0.0
+
+_lock = threading.Lock()
+
+
+def _normalize(text: str) -> str:
+    """
+    Normalize a text the same way as athletes_service.normalize_query.
+    """
+    return " ".join(unidecode(text).lower().strip().split())
+
+
+def _trigrams(text: str) -> set:
+    """
+    Extract the trigram set of a text, following pg_trgm conventions.
+
+    Words are sequences of alphanumeric characters, each padded with two
+    spaces in front and one space at the end.
+    """
+    words = "".join(c if c.isalnum() else " " for c in text.lower()).split()
+    trigrams: set = set()
+    for word in words:
+        padded = f"  {word} "
+        trigrams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return trigrams
+
+
+def _as_real(value: float) -> float:
+    """
+    Round a float to the shortest representation of the nearest float4,
+    matching the value returned by PostgreSQL for a `real` column.
+    """
+    single = struct.unpack("f", struct.pack("f", value))[0]
+    for digits in range(1, 10):
+        shortest = float(f"{single:.{digits}g}")
+        if struct.unpack("f", struct.pack("f", shortest))[0] == single:
+            return shortest
+    return single
+
+
+def trigram_similarity(left: str, right: str) -> float:
+    """
+    Python equivalent of pg_trgm similarity().
+
+    Args:
+        left (str): First text.
+        right (str): Second text.
+
+    Returns:
+        float: Shared trigrams divided by distinct trigrams of both texts (0-1).
+    """
+    left_set, right_set = _trigrams(left), _trigrams(right)
+    union = len(left_set | right_set)
+    if not union:
+        return 0.0
+    return _as_real(len(left_set & right_set) / union)
+
+
+def _store(cache: OrderedDict, key: tuple, value: tuple):
+    """
+    Insert a value in an LRU-ordered cache, evicting the oldest entry if full.
+    """
+    cache[key] = value
+    cache.move_to_end(key)
+    if len(cache) > _MAX_CACHE_SIZE:
+        cache.popitem(last=False)
+
+
+def _lookup(cache: OrderedDict, key: tuple, now: float) -> Optional[tuple]:
+    """
+    Return a non-expired entry from a cache, dropping it if it has expired.
+    """
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    if entry[0] <= now:
+        del cache[key]
+        return None
+    cache.move_to_end(key)
+    return entry
+
+
+def _filter_complete_set(normalized_query: str, rows: list) -> List[AthleteHit]:
+    """
+    Narrow a complete result set to the rows matching a longer query,
+    ranked like the ILIKE search (score DESC, name).
+    """
+    words = normalized_query.split()
+    matches = []
+    for row in rows:
+        normalized_name = _normalize(row.name)
+        if all(word in normalized_name for word in words):
+            matches.append(
+                row._replace(
+                    score=trigram_similarity(normalized_name, normalized_query)
+                )
+            )
+    matches.sort(key=lambda row: (-row.score, row.name))
+    return matches
+
+
+def get(
+    normalized_query: str, limit: int, offset: int, mode: str, variant: tuple = ()
+) -> Optional[list]:
+    """
+    Get cached search results, reusing a complete shorter query when possible.
+
+    Args:
+        normalized_query (str): The normalized search query.
+        limit (int): Maximum number of results.
+        offset (int): Number of results skipped.
+        mode (str): The search mode.
+        variant (tuple): Other parameters changing the results (fields, filters).
+
+    Returns:
+        The cached list of AthleteHit, or None on a cache miss.
+    """
+    now = time.monotonic()
+    with _lock:
+        entry = _lookup(
+            _search_cache, (normalized_query, limit, offset, mode, variant), now
+        )
+        if entry is not None:
+            return entry[1]
+
+        if mode not in _PREFIX_REUSE_MODES:
+            return None
+
+        for end in range(len(normalized_query), 0, -1):
+            prefix = normalized_query[:end].rstrip()
+            complete = _lookup(_complete_sets, (prefix, mode, variant), now)
+            if complete is None:
+                continue
+
+            expires_at, rows = complete
+            if prefix != normalized_query:
+                rows = _filter_complete_set(normalized_query, rows)
+                # A subset of a complete set is complete too
+                _store(
+                    _complete_sets,
+                    (normalized_query, mode, variant),
+                    (expires_at, rows),
+                )
+
+            results = rows[offset : offset + limit]
+            _store(
+                _search_cache,
+                (normalized_query, limit, offset, mode, variant),
+                (expires_at, results),
+            )
+            return results
+
+    return None
+
+
+def put(
+    normalized_query: str,
+    limit: int,
+    offset: int,
+    mode: str,
+    rows: list,
+    variant: tuple = (),
+):
+    """
+    Store search results in the cache.
+
+    Args:
+        normalized_query (str): The normalized search query.
+        limit (int): Maximum number of results requested.
+        offset (int): Number of results skipped.
+        mode (str): The search mode.
+        rows (list): The AthleteHit results returned by the database.
+        variant (tuple): Other parameters changing the results (fields, filters).
+    """
+    expires_at = time.monotonic() + SEARCH_CACHE_TTL
+    with _lock:
+        _store(
+            _search_cache,
+            (normalized_query, limit, offset, mode, variant),
+            (expires_at, rows),
+        )
+        # Fewer rows than requested from the first page: every match is known
+        if offset == 0 and len(rows) < limit and mode in _PREFIX_REUSE_MODES:
+            _store(
+                _complete_sets, (normalized_query, mode, variant), (expires_at, rows)
+            )
+
+
+def check_generation(read_generation: Callable[[], Optional[int]]):
+    """
+    Drop every cached result if the data changed since the last check.
+
+    The generation is read at most every SEARCH_CACHE_GENERATION_CHECK seconds,
+    by the first request after the interval (the others do not wait for it).
+
+    Args:
+        read_generation (Callable): Returns the current data generation, or None
+            if it is unknown (the cache is then kept).
+    """
+    global _generation, _next_generation_check
+
+    now = time.monotonic()
+    with _lock:
+        if now < _next_generation_check:
+            return
+        _next_generation_check = now + SEARCH_CACHE_GENERATION_CHECK
+
+    generation = read_generation()
+    if generation is None:
+        return
+    with _lock:
+        if _generation is not None and generation != _generation:
+            _search_cache.clear()
+            _complete_sets.clear()
+        _generation = generation
+
+
+def invalidate():
+    """
+    Drop every cached result of this process.
+    """
+    with _lock:
+        _search_cache.clear()
+        _complete_sets.clear()
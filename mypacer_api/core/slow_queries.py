@@ -0,0 +1,109 @@
+"""
+In-process log of slow database queries, grouped by query shape.
+
+Queries run through database.execute() that take SLOW_QUERY_MS or more are recorded
+under their normalized shape (literals and placeholders replaced by "?", repeated
+conditions collapsed), so the eight-word search and the two-word search show up as
+the same statement, as in pg_stat_statements. Exposed by /admin/slow_queries.
+"""
+
+import os
+import re
+import threading
+import time
+from collections import deque
+from typing import Dict, List
+
+# Queries taking at least this long are recorded, in milliseconds
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+
+# Distinct shapes kept (the least recently seen are dropped first)
+_MAX_SHAPES = int(os.getenv("SLOW_QUERY_SHAPES", "200"))
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s")
+_REPEATED_CONDITION = re.compile(r"(\b[\w.]+ (?:I?LIKE|=) \?)(?: AND \1)+")
+
+# Key: shape
+# Value: {"count", "total_ms", "max_ms", "last_at"}
+_shapes: Dict[str, dict] = {}
+# Latest slow queries: {"shape", "duration_ms", "at"}
+_recent: deque = deque(maxlen=50)
+_lock = threading.Lock()
+
+
+def normalize(query: str) -> str:
+    """
+    Reduce a query to its shape.
+
+    Args:
+        query (str): The SQL query, with psycopg2 placeholders.
+
+    Returns:
+        str: The query on one line, literals and placeholders replaced by "?" and
+        repeated conditions ("name ILIKE ? AND name ILIKE ?") collapsed into one.
+    """
+    shape = _STRING_LITERAL.sub("?", query)
+    shape = _PLACEHOLDER.sub("?", shape.replace("%%", "%"))
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = " ".join(shape.split())
+    return _REPEATED_CONDITION.sub(r"\1 AND ...", shape)
+
+
+def record(query: str, duration_ms: float):
+    """
+    Record a query if it was slow.
+
+    Args:
+        query (str): The SQL query that was executed.
+        duration_ms (float): Its duration, in milliseconds.
+    """
+    if duration_ms < SLOW_QUERY_MS:
+        return
+    shape = normalize(query)
+    now = time.time()
+    with _lock:
+        stats = _shapes.pop(shape, None) or {"count": 0, "total_ms": 0.0, "max_ms": 0.0}
+        if len(_shapes) >= _MAX_SHAPES:
+            _shapes.pop(next(iter(_shapes)))
+        stats["count"] += 1
+        stats["total_ms"] += duration_ms
+        stats["max_ms"] = max(stats["max_ms"], duration_ms)
+        stats["last_at"] = now
+        _shapes[shape] = stats
+        _recent.append({"shape": shape, "duration_ms": duration_ms, "at": now})
+
+
+def report() -> dict:
+    """
+    Get the slow-query log of this process.
+
+    Returns:
+        dict: The threshold, the shapes sorted by total time (with count, total,
+        mean and max durations) and the latest slow queries.
+    """
+    with _lock:
+        shapes: List[dict] = [
+            {
+                "shape": shape,
+                "count": stats["count"],
+                "total_ms": round(stats["total_ms"], 1),
+                "mean_ms": round(stats["total_ms"] / stats["count"], 1),
+                "max_ms": round(stats["max_ms"], 1),
+                "last_at": stats["last_at"],
+            }
+            for shape, stats in _shapes.items()
+        ]
+        recent = list(_recent)
+    shapes.sort(key=lambda stats: stats["total_ms"], reverse=True)
+    return {"threshold_ms": SLOW_QUERY_MS, "shapes": shapes, "recent": recent}
+
+
+def reset():
+    """
+    Clear the log.
+    """
+    with _lock:
+        _shapes.clear()
+        _recent.clear()
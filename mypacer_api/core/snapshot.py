@@ -0,0 +1,230 @@
+"""
+Warm-state snapshots of the in-memory caches, for fast restarts.
+
+The pace table cache and the scraped records cache are written periodically (and on
+shutdown) to a single local file, and reloaded lazily by the next process: at startup
+only the index is read, and each entry is rebuilt from the memory-mapped file the
+first time it is requested. A restarted worker is warm as soon as the index is read,
+without recomputing tables nor scraping bases.athle.fr again.
+
+File layout:
+    magic (8 bytes) | index length (uint32, little-endian) | JSON index | blobs
+
+The index describes each entry and the offset and length of its blob in the blobs
+area. Blobs are the raw arrays of PaceTable and RecordSet (see core.results), in the
+byte order recorded in the index.
+
+The search cache is not persisted: its entries live SEARCH_CACHE_TTL seconds (30 by
+default), less than a restart.
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from typing import Dict, Optional, Tuple
+
+from mypacer_api import __version__
+from mypacer_api.core.results import PaceTable, RecordSet
+
+# Snapshot file (snapshots are disabled when unset)
+SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH")
+
+# Time between two periodic snapshots, in seconds
+SNAPSHOT_INTERVAL = float(os.getenv("SNAPSHOT_INTERVAL", "300"))
+
+_MAGIC = b"MPSNAP1\n"
+_HEADER = struct.Struct("<8sI")
+_FORMAT_VERSION = 1
+
+# Snapshot read at startup, if any
+_loaded: Optional["Snapshot"] = None
+
+
+def write(
+    path: str,
+    pace_tables: Dict[tuple, PaceTable],
+    records: Dict[str, Tuple[float, RecordSet]],
+) -> dict:
+    """
+    Write a snapshot file, atomically replacing the previous one.
+
+    Args:
+        path (str): The snapshot file.
+        pace_tables (Dict[tuple, PaceTable]): Pace tables keyed by
+            (min_pace, max_pace, increment, distances).
+        records (Dict[str, Tuple[float, RecordSet]]): (fetched_at, records) keyed by
+            athlete id.
+
+    Returns:
+        dict: The number of tables and records written and the file size in bytes.
+    """
+    blobs = []
+    offset = 0
+
+    def add_blob(data: bytes) -> list:
+        nonlocal offset
+        blobs.append(data)
+        offset += len(data)
+        return [offset - len(data), len(data)]
+
+    index = {
+        "format": _FORMAT_VERSION,
+        "api_version": __version__,
+        "byteorder": sys.byteorder,
+        "created_at": time.time(),
+        "pace_tables": [
+            {
+                "key": [key[0], key[1], key[2], list(key[3])],
+                "columns": list(table.keys),
+                "blob": add_blob(table.tobytes()),
+            }
+            for key, table in pace_tables.items()
+        ],
+        "records": [
+            {
+                "ident": ident,
+                "fetched_at": fetched_at,
+                "blob": add_blob(record_set.tobytes()),
+            }
+            for ident, (fetched_at, record_set) in records.items()
+        ],
+    }
+    index_bytes = json.dumps(index, separators=(",", ":")).encode()
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as snapshot_file:
+        snapshot_file.write(_HEADER.pack(_MAGIC, len(index_bytes)))
+        snapshot_file.write(index_bytes)
+        for blob in blobs:
+            snapshot_file.write(blob)
+    os.replace(tmp_path, path)
+
+    return {
+        "pace_tables": len(pace_tables),
+        "records": len(records),
+        "bytes": _HEADER.size + len(index_bytes) + offset,
+    }
+
+
+class Snapshot:
+    """
+    A snapshot file, memory-mapped, whose entries are rebuilt on demand.
+    """
+
+    def __init__(self, path: str):
+        """
+        Read the index of a snapshot file.
+
+        Args:
+            path (str): The snapshot file.
+
+        Raises:
+            OSError: If the file cannot be read.
+            ValueError: If the file is not a snapshot of this version of the API.
+        """
+        with open(path, "rb") as snapshot_file:
+            self._map = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            magic, index_length = _HEADER.unpack_from(self._map)
+            if magic != _MAGIC:
+                raise ValueError("Not a snapshot file.")
+            index = json.loads(self._map[_HEADER.size : _HEADER.size + index_length])
+            if (
+                index["format"] != _FORMAT_VERSION
+                or index["api_version"] != __version__
+                or index["byteorder"] != sys.byteorder
+            ):
+                raise ValueError("Snapshot written by another version of the API.")
+        except (struct.error, ValueError, KeyError) as exc:
+            self._map.close()
+            raise ValueError(f"Invalid snapshot file: {exc}") from exc
+
+        self._blobs_start = _HEADER.size + index_length
+        self.created_at = index["created_at"]
+        self._pace_tables = {}
+        for entry in index["pace_tables"]:
+            min_pace, max_pace, increment, distances = entry["key"]
+            key = (min_pace, max_pace, increment, tuple(distances))
+            self._pace_tables[key] = entry
+        self._records = {entry["ident"]: entry for entry in index["records"]}
+
+    def __len__(self) -> int:
+        return len(self._pace_tables) + len(self._records)
+
+    def _blob(self, entry: dict) -> bytes:
+        start = self._blobs_start + entry["blob"][0]
+        return self._map[start : start + entry["blob"][1]]
+
+    def pace_table(self, key: tuple) -> Optional[PaceTable]:
+        """
+        Rebuild a snapshotted pace table.
+
+        Args:
+            key (tuple): The cache key (min_pace, max_pace, increment, distances).
+
+        Returns:
+            PaceTable: The table, or None if it is not in the snapshot.
+        """
+        entry = self._pace_tables.get(key)
+        if entry is None:
+            return None
+        return PaceTable.frombytes(tuple(entry["columns"]), self._blob(entry))
+
+    def records(self, ident: str) -> Optional[Tuple[float, RecordSet]]:
+        """
+        Rebuild the snapshotted records of an athlete.
+
+        Args:
+            ident (str): The athlete id.
+
+        Returns:
+            Tuple[float, RecordSet]: (fetched_at, records), or None if not snapshotted.
+        """
+        entry = self._records.get(ident)
+        if entry is None:
+            return None
+        return entry["fetched_at"], RecordSet.frombytes(self._blob(entry))
+
+    def close(self):
+        """
+        Unmap the file.
+        """
+        self._map.close()
+
+
+def load(path: str) -> Optional[Snapshot]:
+    """
+    Open a snapshot file and use it for lookups (get_pace_table, get_records).
+
+    Args:
+        path (str): The snapshot file.
+
+    Returns:
+        Snapshot: The snapshot, or None if the file is missing or unusable
+        (the caches then start empty).
+    """
+    global _loaded
+
+    try:
+        _loaded = Snapshot(path)
+    except (OSError, ValueError):
+        _loaded = None
+    return _loaded
+
+
+def get_pace_table(key: tuple) -> Optional[PaceTable]:
+    """
+    Look up a pace table in the loaded snapshot, None without snapshot or on a miss.
+    """
+    return _loaded.pace_table(key) if _loaded is not None else None
+
+
+def get_records(ident: str) -> Optional[Tuple[float, RecordSet]]:
+    """
+    Look up athlete records in the loaded snapshot, None without snapshot or on a miss.
+    """
+    return _loaded.records(ident) if _loaded is not None else None
@@ -0,0 +1,107 @@
+"""
+Bounded process pool for CPU-bound work (HTML parsing, large pace tables).
+
+Pure-Python CPU work holds the GIL: run in the worker threads, it slows down every
+other request of the uvicorn worker. When CPU_WORKERS > 0, such work is sent to a pool
+of processes instead; only compact inputs and outputs cross the process boundary
+(raw HTML bytes in, records dict out). With CPU_WORKERS = 0 (default), work runs inline.
+
+run() blocks the calling thread until the result is available and must be called
+from the thread pool (sync code), never from the event loop.
+"""
+
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable
+
+# Number of worker processes (0 disables the pool)
+CPU_WORKERS = int(os.getenv("CPU_WORKERS", "0"))
+
+# Maximum number of tasks submitted to the pool at once; callers beyond it wait
+CPU_MAX_PENDING = int(os.getenv("CPU_MAX_PENDING", "0")) or max(1, CPU_WORKERS) * 4
+
+_executor = None
+_pending_slots = threading.BoundedSemaphore(CPU_MAX_PENDING)
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    """
+    Get or create the global process pool.
+
+    Returns:
+        ProcessPoolExecutor: The process pool instance.
+    """
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            # "spawn" avoids forking a process that already runs threads
+            _executor = ProcessPoolExecutor(
+                max_workers=CPU_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+
+    return _executor
+
+
+def _discard_executor(broken: ProcessPoolExecutor):
+    """
+    Drop a broken process pool so that the next call creates a new one.
+
+    Args:
+        broken (ProcessPoolExecutor): The pool that raised BrokenProcessPool; ignored
+        if another thread already replaced it.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is broken:
+            broken.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def run(func: Callable, *args):
+    """
+    Run a CPU-bound function in the process pool, or inline if the pool is disabled.
+
+    Args:
+        func (Callable): A module-level (picklable) function.
+        *args: Picklable arguments, kept small (bytes, numbers, tuples).
+
+    Returns:
+        The return value of func.
+
+    Raises:
+        BrokenProcessPool: If the pool breaks again after being recreated once.
+    """
+    if CPU_WORKERS <= 0:
+        return func(*args)
+
+    with _pending_slots:
+        executor = _get_executor()
+        try:
+            return executor.submit(func, *args).result()
+        except BrokenProcessPool:
+            # A worker process died (OOM kill, crash): the whole pool is unusable,
+            # retry once on a new one
+            _discard_executor(executor)
+            return _get_executor().submit(func, *args).result()
+
+
+def shutdown():
+    """
+    Stop the worker processes.
+    Called automatically on application shutdown.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(cancel_futures=True)
+            _executor = None
+
+
+# Register cleanup function to run on application exit
+atexit.register(shutdown)
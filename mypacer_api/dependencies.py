@@ -0,0 +1,48 @@
+"""
+Shared objects used by the API routes.
+"""
+
+import hmac
+import os
+from typing import Optional
+
+from fastapi import Header, HTTPException
+
+from mypacer_api.core.admission import ConcurrencyLimiter
+
+# Limits concurrent /get_athlete_records calls: each one holds a pool connection
+# and a bases.athle.fr request. Extra requests wait in a bounded queue, then get a 503.
+records_limiter = ConcurrencyLimiter(
+    max_concurrency=int(os.getenv("RECORDS_MAX_CONCURRENCY", "4")),
+    max_queue=int(os.getenv("RECORDS_MAX_QUEUE", "16")),
+    queue_timeout=float(os.getenv("RECORDS_QUEUE_TIMEOUT", "5")),
+    retry_after=float(os.getenv("RECORDS_RETRY_AFTER", "2")),
+)
+
+# Limits concurrent /get_athletes/export calls: each one holds a pool connection
+# until the whole export has been sent to the client.
+export_limiter = ConcurrencyLimiter(
+    max_concurrency=int(os.getenv("EXPORT_MAX_CONCURRENCY", "2")),
+    max_queue=int(os.getenv("EXPORT_MAX_QUEUE", "4")),
+    queue_timeout=float(os.getenv("EXPORT_QUEUE_TIMEOUT", "5")),
+    retry_after=float(os.getenv("EXPORT_RETRY_AFTER", "10")),
+)
+
+# Token of the /admin routes, sent in the X-Admin-Token header (routes disabled if unset)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """
+    Check the admin token of a request.
+
+    Raises:
+        HTTPException: 404 when no ADMIN_TOKEN is configured (the admin routes do
+        not exist), 403 when the token is missing or wrong.
+    """
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if x_admin_token is None or not hmac.compare_digest(
+        x_admin_token.encode(), ADMIN_TOKEN.encode()
+    ):
+        raise HTTPException(status_code=403, detail="Invalid admin token.")
@@ -4,13 +4,62 @@ various distances.  This API  takes input  parameters  like minimum pace, maximu
 increment step, and returns a table of  estimated running times for official race distances.
 """
 
-from fastapi import FastAPI
+import asyncio
+import gzip
+from contextlib import asynccontextmanager
+from typing import Optional
+from uuid import UUID
+
+import anyio
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import (
+    JSONResponse,
+    PlainTextResponse,
+    RedirectResponse,
+    Response,
+    StreamingResponse,
+)
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+
+from mypacer_api.core import database, export, profiler, slow_queries
+from mypacer_api.core.http_cache import (
+    CachePolicy,
+    HTTPCacheMiddleware,
+    accepts_encoding,
+)
+from mypacer_api.core.results import RecordSet, encode_hits
+from mypacer_api.dependencies import export_limiter, records_limiter, require_admin
+from mypacer_api.models import (
+    ExportFormat,
+    PredictionParameters,
+    SearchMode,
+    Sexe,
+    TableFormat,
+    TableParameters,
+)
+from mypacer_api.services import (
+    athletes_service,
+    clubs_service,
+    database_service,
+    pace_table_service,
+    performances_service,
+    prediction_service,
+    snapshot_service,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Restore the warm state of the caches on startup, save it on shutdown.
+    """
+    await run_in_threadpool(snapshot_service.start)
+    yield
+    await run_in_threadpool(snapshot_service.stop)
 
-from mypacer_api.models import TableParameters
-from mypacer_api.services import athletes_service, database_service, pace_table_service
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # CORS only needed for local development (Vite dev server on different port)
 # In production, API is served via /api reverse proxy (same origin = no CORS needed)
@@ -19,6 +68,34 @@ allowed_origins = [
     "http://127.0.0.1:5173",
 ]
 
+# HTTP caching of read endpoints (Cache-Control, ETag, Last-Modified, 304)
+_search_cache_policy = CachePolicy(
+    "public, max-age=60",
+    lambda request: database_service.get_athletes_last_update(),
+)
+# Records and progression change only when the athlete page is scraped again
+_records_cache_policy = CachePolicy(
+    "public, max-age=3600",
+    lambda request: athletes_service.get_records_fetched_at(
+        request.query_params.get("ident")
+    ),
+)
+app.add_middleware(
+    HTTPCacheMiddleware,
+    policies={
+        "/get_athletes": _search_cache_policy,
+        "/get_athletes_from_db": _search_cache_policy,
+        "/get_athlete_records": _records_cache_policy,
+        "/get_athlete_progression": _records_cache_policy,
+        # Club counts and the vacuum-based last_update are not covered by any cheap
+        # version: the ETag is a hash of the returned values
+        "/database_status": CachePolicy("public, max-age=300"),
+    },
+)
+
+# Selects the requests profiled by /admin/profile in route mode (no-op when idle)
+app.add_middleware(profiler.ProfilerMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=allowed_origins,
@@ -69,48 +146,217 @@ async def readiness_check():
             "athletes_count": db_status.get("nb_athletes", 0),
         }
     except Exception as e:
-        from fastapi import HTTPException
-
         raise HTTPException(
             status_code=503,
             detail=f"Service not ready: Database connection failed - {str(e)}",
         )
 
 
+async def _fetch_athlete_records(ident) -> RecordSet:
+    """
+    Fetch athlete records through the admission limiter of /get_athlete_records.
+
+    Blocking database and HTTP calls run in the thread pool. Fresh cached records
+    are returned directly, without taking a slot of the limiter.
+    """
+    records = athletes_service.get_cached_records(ident)
+    if records is not None:
+        return records
+    async with records_limiter:
+        return await run_in_threadpool(athletes_service.get_athlete_records, ident)
+
+
 @app.post("/generate_table")
-async def generate_table(params: TableParameters):
+async def generate_table(
+    params: TableParameters, output_format: TableFormat = Query("json", alias="format")
+):
     """
     Endpoint to generate a table of paces for various official race distances.
 
+    When `athlete_ids` are given, the records of each athlete are fetched (from cache
+    when available) and matched to the table rows, replacing one
+    /get_athlete_records call per athlete and the client-side matching.
+
+    Tables pre-rendered with `python -m mypacer_api.core.prerender` (when
+    PRERENDERED_TABLES_DIR is set) are answered with a 303 redirect to their
+    static file.
+
+    With `format=ndjson` or `format=csv`, rows are streamed as they are computed
+    (bounded memory for very large tables); athlete overlay is not available then.
+
     Args:
     params (TableParameters): The pace parameters for generating the table.
+    format (str): "json" (default), "ndjson" or "csv".
 
     Raises:
-    HTTPException: If the minimum pace is greater than the maximum pace.
+    HTTPException: 422 if a pace or the increment is not positive, 400 if the
+    minimum pace is greater than the maximum pace (checked before any I/O).
 
     Returns:
     List[Dict]: A table of calculated times for each distance at each pace.
+    Dict: With `athlete_ids`, {"table": [...], "athletes": {id: [{distance, time,
+    pace, row}, ...]}} where row is the index of the closest table row.
     """
-    return pace_table_service.get_pace_table(
-        params.min_pace, params.max_pace, params.increment, params.distances
+    # Validate before looking up pre-rendered tables or fetching any records
+    if params.max_pace > params.min_pace:
+        raise HTTPException(
+            status_code=400, detail="Minimum pace must be more than maximum pace."
+        )
+
+    if output_format != "json":
+        if params.athlete_ids:
+            raise HTTPException(
+                status_code=400,
+                detail="athlete_ids are only supported with the json format.",
+            )
+        return StreamingResponse(
+            pace_table_service.stream_pace_table(
+                params.min_pace,
+                params.max_pace,
+                params.increment,
+                params.distances,
+                output_format,
+            ),
+            media_type=export.MEDIA_TYPES[output_format],
+        )
+
+    if not params.athlete_ids:
+        # Common tables are static files: let the client (and nginx) fetch them
+        prerendered_url = pace_table_service.find_prerendered_table(
+            params.min_pace, params.max_pace, params.increment, params.distances
+        )
+        if prerendered_url:
+            return RedirectResponse(prerendered_url, status_code=303)
+
+        # Large tables may be computed in the worker process pool: wait in the thread pool
+        table = await run_in_threadpool(
+            pace_table_service.get_pace_table,
+            params.min_pace,
+            params.max_pace,
+            params.increment,
+            params.distances,
+        )
+        return JSONResponse(table.to_rows())
+
+    athlete_ids = list(dict.fromkeys(params.athlete_ids))
+    records = await asyncio.gather(
+        *(_fetch_athlete_records(ident) for ident in athlete_ids)
     )
+    result = await run_in_threadpool(
+        pace_table_service.get_pace_table_with_athletes,
+        params.min_pace,
+        params.max_pace,
+        params.increment,
+        params.distances,
+        dict(zip(athlete_ids, records)),
+    )
+    return JSONResponse({**result, "table": result["table"].to_rows()})
+
+
+@app.get("/pace_tables/{name}")
+async def get_prerendered_table(name: str, request: Request):
+    """
+    Serves a pre-rendered pace table with long-lived immutable cache headers.
+
+    In production nginx serves these files directly (see docs); this endpoint is the
+    fallback. File names contain a hash of their content, so they never change.
+
+    Args:
+        name (str): The file name, as listed in the manifest.
+
+    Returns:
+        Response: The JSON table, gzip-encoded when the client accepts it.
+    """
+    content = await run_in_threadpool(pace_table_service.read_prerendered_table, name)
+    if content is None:
+        raise HTTPException(status_code=404, detail="Pace table not found.")
+
+    headers = {
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "Vary": "Accept-Encoding",
+    }
+    if accepts_encoding(request.headers.get("accept-encoding"), "gzip"):
+        headers["Content-Encoding"] = "gzip"
+    else:
+        content = gzip.decompress(content)
+    return Response(content, media_type="application/json", headers=headers)
+
+
+@app.post("/predict_times")
+async def predict_times(params: PredictionParameters):
+    """
+    Endpoint to predict race times for every distance from athletes' records.
+
+    Predictions for all record sets are computed in one batch, from the record at
+    the closest distance, with the Riegel formula or Daniels' VDOT tables.
+
+    Args:
+    params (PredictionParameters): The record sets or athlete ids, distances and model.
+
+    Returns:
+    Dict: {"predictions": [...]} aligned with `records`, and {"athletes": {id: ...}}
+    for `athlete_ids`; each prediction maps a distance to a time in seconds.
+    """
+    athlete_ids = list(dict.fromkeys(params.athlete_ids))
+    athletes_records = await asyncio.gather(
+        *(_fetch_athlete_records(ident) for ident in athlete_ids)
+    )
+    predictions = await run_in_threadpool(
+        prediction_service.get_predictions,
+        params.records + list(athletes_records),
+        params.distances,
+        params.model,
+    )
+    nb_records = len(params.records)
+    return {
+        "predictions": predictions[:nb_records],
+        "athletes": dict(
+            zip(map(str, athlete_ids), predictions[nb_records:], strict=True)
+        ),
+    }
 
 
 @app.get("/get_athletes")
-async def get_athletes(name: str, limit: int = 25, offset: int = 0):
+async def get_athletes(
+    name: str,
+    limit: int = 25,
+    offset: int = 0,
+    mode: SearchMode = "ilike",
+    fields: Optional[str] = None,
+    sexe: Optional[Sexe] = None,
+    birth_year_min: Optional[int] = None,
+    birth_year_max: Optional[int] = None,
+    x_search_session: Optional[UUID] = Header(None),
+):
     """
     Retrieves athlete information from the local database based on the provided athlete name.
 
     This endpoint uses optimized trigram indexes for fast fuzzy matching and supports pagination.
     Results are ordered by relevance (similarity score).
 
+    Typeahead clients can send an `X-Search-Session` header (a random UUID, e.g.
+    one per search box): a new search of the session cancels the database query of
+    the previous one, which then answers 409 instead of holding a pool connection
+    for a result nobody will read. The UUID is the only scope of the session (behind
+    the proxy every client has the same address): anyone knowing it can cancel the
+    searches of the session, so it must be random (uuid4), never derived from user
+    data.
+
     Args:
         name (str): The name of the athlete to search for.
         limit (int): Maximum number of results to return (default: 25, max: 100).
         offset (int): Number of results to skip for pagination (default: 0).
+        mode (str): "ilike" (every word must match, default) or "knn"
+            (nearest-neighbour scan on word similarity, typo tolerant).
+        fields (str): Comma-separated fields to return (default: all), e.g.
+            "id,name,birth_date" for a typeahead; id is always returned.
+        sexe (str): Only return athletes of this sexe ("M" or "F").
+        birth_year_min (int): Only return athletes born this year or later.
+        birth_year_max (int): Only return athletes born this year or earlier.
+        x_search_session (UUID): The client search session (X-Search-Session header).
 
     Returns:
-        List[dict]: A list of athlete dictionaries containing:
+        List[dict]: A list of athlete dictionaries containing (or only `fields`):
             - id: Athlete identifier
             - ffa_id: FFA unique identifier
             - name: Athlete name
@@ -124,6 +370,8 @@ async def get_athletes(name: str, limit: int = 25, offset: int = 0):
     Examples:
         GET /get_athletes?name=John Doe
         GET /get_athletes?name=John Doe&limit=10&offset=0
+        GET /get_athletes?name=Jon Do&mode=knn
+        GET /get_athletes?name=dupont&fields=id,name,birth_date&sexe=F&birth_year_min=1990
     """
     # Limit validation
     if limit > 100:
@@ -133,7 +381,94 @@ async def get_athletes(name: str, limit: int = 25, offset: int = 0):
     if offset < 0:
         offset = 0
 
-    return athletes_service.get_athletes_from_db(name, limit=limit, offset=offset)
+    selected_fields = athletes_service.parse_fields(fields)
+    # Tickets are taken here, in arrival order, before the query reaches the pool
+    search_session = None
+    if x_search_session is not None:
+        search_session = database.start_session_query(str(x_search_session))
+    try:
+        hits = await run_in_threadpool(
+            athletes_service.get_athletes_from_db,
+            name,
+            limit=limit,
+            offset=offset,
+            mode=mode,
+            fields=selected_fields,
+            sexe=sexe,
+            birth_year_min=birth_year_min,
+            birth_year_max=birth_year_max,
+            search_session=search_session,
+        )
+    finally:
+        if search_session is not None:
+            database.end_session_query(*search_session)
+    return encode_hits(hits, selected_fields)
+
+
+class _ExportResponse(StreamingResponse):
+    """
+    Streamed export that closes its chunks and gives back its limiter slot.
+
+    The cleanup runs once the response is sent, and also when the client goes
+    away before or while the body is sent: it is tied to the response itself,
+    not to the body iterator, which Starlette may never start.
+    """
+
+    def __init__(self, chunks, limiter, media_type: str):
+        super().__init__(iterate_in_threadpool(chunks), media_type=media_type)
+        self._chunks = chunks
+        self._limiter = limiter
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            # Closing may wait for a fetch still running in the threadpool
+            with anyio.CancelScope(shield=True):
+                await run_in_threadpool(self._chunks.close)
+            self._limiter.release()
+
+
+@app.get("/get_athletes/export")
+async def export_athletes(
+    name: str,
+    mode: SearchMode = "ilike",
+    output_format: ExportFormat = Query("ndjson", alias="format"),
+    limit: int = Query(
+        athletes_service.EXPORT_MAX_ROWS, ge=1, le=athletes_service.EXPORT_MAX_ROWS
+    ),
+):
+    """
+    Streams every athlete matching a search, ordered by relevance.
+
+    Rows are read from a server-side cursor and sent as they are fetched, so the
+    export uses bounded memory whatever the number of matches.
+
+    Each export holds a pool connection until it is sent: concurrent exports are
+    bounded by `export_limiter` (503 with Retry-After beyond its queue).
+
+    Args:
+        name (str): The name of the athlete to search for.
+        mode (str): "ilike" (default) or "knn", as for /get_athletes.
+        format (str): "ndjson" (default) or "csv".
+        limit (int): Maximum number of athletes (default and max: EXPORT_MAX_ROWS).
+
+    Returns:
+        StreamingResponse: One athlete per line (same fields as /get_athletes).
+    """
+    await export_limiter.acquire()
+    try:
+        # Shielded: a checked out connection must reach the response, which releases it
+        with anyio.CancelScope(shield=True):
+            chunks = await run_in_threadpool(
+                athletes_service.stream_athletes, name, mode, output_format, limit
+            )
+    except BaseException:
+        export_limiter.release()
+        raise
+    return _ExportResponse(
+        chunks, export_limiter, media_type=export.MEDIA_TYPES[output_format]
+    )
 
 
 @app.get("/get_athletes_from_db")
@@ -159,7 +494,90 @@ async def get_athletes_from_db(name: str, limit: int = 25, offset: int = 0):
     if offset < 0:
         offset = 0
 
-    return athletes_service.get_athletes_from_db(name, limit=limit, offset=offset)
+    # Blocking database call: run it in the threadpool, as /get_athletes does
+    hits = await run_in_threadpool(
+        athletes_service.get_athletes_from_db, name, limit=limit, offset=offset
+    )
+    return encode_hits(hits)
+
+
+@app.get("/get_clubs")
+async def get_clubs(
+    name: str,
+    limit: int = Query(25, ge=1, le=100),
+    cursor: Optional[str] = None,
+    season: Optional[int] = None,
+    fields: Optional[str] = None,
+):
+    """
+    Searches clubs by name, ordered by relevance (trigram similarity).
+
+    Args:
+        name (str): The name of the club to search for.
+        limit (int): Maximum number of clubs per page (default: 25, max: 100).
+        cursor (str): The `next_cursor` of the previous page (default: first page).
+        season (int): Only return clubs active this season.
+        fields (str): Comma-separated fields to return (default: all), e.g. "id,name";
+            id is always returned.
+
+    Returns:
+        dict: {"items": [...], "next_cursor": ...}, each club having the fields id,
+        ffa_id, name, first_year, last_year, url and score (or only `fields`).
+        next_cursor is null on the last page.
+
+    Examples:
+        GET /get_clubs?name=montreuil
+        GET /get_clubs?name=athletisme&season=2024&fields=id,name&cursor=...
+    """
+    selected_fields = athletes_service.parse_fields(fields, clubs_service.CLUB_FIELDS)
+    clubs, next_cursor = await run_in_threadpool(
+        clubs_service.search_clubs, name, limit=limit, cursor=cursor, season=season
+    )
+    return {"items": encode_hits(clubs, selected_fields), "next_cursor": next_cursor}
+
+
+@app.get("/get_club_roster")
+async def get_club_roster(
+    club_id: int,
+    season: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    sexe: Optional[Sexe] = None,
+):
+    """
+    Lists the athletes of a club for a season, ordered by name.
+
+    Args:
+        club_id (int): The ID of the club (from /get_clubs).
+        season (int): The season (default: the latest season of the club).
+        limit (int): Maximum number of athletes per page (default: 100, max: 500).
+        cursor (str): The `next_cursor` of the previous page (default: first page).
+        fields (str): Comma-separated fields to return, as for /get_athletes.
+        sexe (str): Only return athletes of this sexe ("M" or "F").
+
+    Returns:
+        dict: {"items": [...], "next_cursor": ...}, athletes having the fields of
+        /get_athletes (score is null). next_cursor is null on the last page.
+
+    Examples:
+        GET /get_club_roster?club_id=12
+        GET /get_club_roster?club_id=12&season=2024&fields=id,name,birth_date&sexe=F
+    """
+    selected_fields = athletes_service.parse_fields(fields)
+    athletes, next_cursor = await run_in_threadpool(
+        athletes_service.get_club_roster,
+        club_id,
+        season=season,
+        limit=limit,
+        cursor=cursor,
+        fields=selected_fields,
+        sexe=sexe,
+    )
+    return {
+        "items": encode_hits(athletes, selected_fields),
+        "next_cursor": next_cursor,
+    }
 
 
 @app.get("/get_athlete_records")
@@ -167,13 +585,49 @@ async def get_athlete_records(ident) -> dict:
     """
     Retrieves athlete records from the 'bases.athle.fr' website based on the provided athlete ID.
 
+    Concurrent calls are bounded by `records_limiter`: when its wait queue is full,
+    the request is rejected with 503 and a Retry-After header.
+
     Args:
     ident (str): The ID of the athlete to search for.
 
     Returns:
     dict: A dictionary containing the athlete's records for various disciplines and distances.
     """
-    return athletes_service.get_athlete_records(ident)
+    return dict(await _fetch_athlete_records(ident))
+
+
+@app.get("/get_athlete_progression")
+async def get_athlete_progression(
+    ident,
+    distance: Optional[float] = Query(None, gt=0),
+    season_best: bool = False,
+):
+    """
+    Retrieves the performance history of an athlete, stored when its record page
+    is scraped.
+
+    Athletes whose page was never scraped are scraped first (like
+    /get_athlete_records, through the same admission limiter).
+
+    Args:
+    ident (str): The ID of the athlete.
+    distance (float): Only return performances over this distance, in meters.
+    season_best (bool): Only return the best performance of each event per year.
+
+    Returns:
+    list: The performances (event, distance, seconds, date, competition), sorted by
+    distance then date.
+    """
+    progression = await run_in_threadpool(
+        performances_service.get_progression, ident, distance, season_best
+    )
+    if not progression and athletes_service.get_records_fetched_at(ident) is None:
+        await _fetch_athlete_records(ident)
+        progression = await run_in_threadpool(
+            performances_service.get_progression, ident, distance, season_best
+        )
+    return progression
 
 
 @app.get("/database_status")
@@ -187,3 +641,92 @@ async def database_status():
               and the date of the last update.
     """
     return database_service.get_database_status()
+
+
+@app.get(
+    "/admin/profile",
+    dependencies=[Depends(require_admin)],
+    include_in_schema=False,
+)
+async def profile(
+    seconds: float = Query(10, gt=0, le=profiler.PROFILER_MAX_SECONDS),
+    interval_ms: float = Query(5, ge=1, le=1000),
+    route: Optional[str] = None,
+    fraction: float = Query(1.0, gt=0, le=1),
+):
+    """
+    Profiles this worker process with a sampling profiler (requires X-Admin-Token).
+
+    The response is sent when the session ends, in the folded stacks format of
+    flamegraph.pl and speedscope. With several uvicorn workers, each call profiles
+    the worker that handles it.
+
+    Args:
+        seconds (float): Duration of the session.
+        interval_ms (float): Time between two samples, in milliseconds.
+        route (str): Only profile requests to this path, e.g. /generate_table
+            (default: every thread, whatever it runs).
+        fraction (float): Fraction of the requests to `route` that are profiled.
+
+    Returns:
+        PlainTextResponse: One "frame;frame;frame count" line per distinct stack,
+        with the X-Profile-Samples and X-Profile-Requests headers.
+
+    Examples:
+        GET /admin/profile?seconds=30 > profile.folded
+        GET /admin/profile?seconds=60&route=/generate_table&fraction=0.1
+    """
+    try:
+        session = await profiler.profile(
+            seconds, interval=interval_ms / 1000, route=route, fraction=fraction
+        )
+    except RuntimeError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+
+    return PlainTextResponse(
+        session.folded(),
+        headers={
+            "X-Profile-Samples": str(session.samples),
+            "X-Profile-Requests": str(session.requests),
+        },
+    )
+
+
+@app.get(
+    "/admin/slow_queries",
+    dependencies=[Depends(require_admin)],
+    include_in_schema=False,
+)
+async def get_slow_queries():
+    """
+    Slow-query log of this worker process (requires X-Admin-Token).
+
+    Queries taking SLOW_QUERY_MS or more are grouped by normalized shape, see
+    core.slow_queries. With several uvicorn workers, each call reads the log of the
+    worker that handles it.
+
+    Returns:
+        dict: The threshold, the shapes sorted by total time, the latest slow
+        queries, and the statement timeouts by route.
+    """
+    return {
+        **slow_queries.report(),
+        "statement_timeouts_ms": database.STATEMENT_TIMEOUTS,
+    }
+
+
+@app.delete(
+    "/admin/slow_queries",
+    dependencies=[Depends(require_admin)],
+    include_in_schema=False,
+)
+async def reset_slow_queries():
+    """
+    Clear the slow-query log of this worker process (requires X-Admin-Token).
+
+    Returns:
+        dict: The log as it was before being cleared, as for GET.
+    """
+    report = slow_queries.report()
+    slow_queries.reset()
+    return {**report, "statement_timeouts_ms": database.STATEMENT_TIMEOUTS}
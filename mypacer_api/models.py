@@ -2,7 +2,9 @@
 Module containing data models for the Running Pace Table API.
 """
 
-from pydantic import BaseModel
+from typing import Dict, List, Literal, Union
+
+from pydantic import BaseModel, Field, PositiveFloat, PositiveInt
 
 # Official race distances in meters
 OFFICIAL_DISTANCES = [
@@ -24,6 +26,32 @@ OFFICIAL_DISTANCES = [
     42195,
 ]
 
+# Maximum number of athletes overlaid on a pace table in one request
+MAX_OVERLAY_ATHLETES = 10
+
+# Athlete search modes (see athletes_service.get_athletes_from_db)
+SearchMode = Literal["ilike", "knn"]
+
+# Athlete sexe filter of the search
+Sexe = Literal["M", "F"]
+
+# Output formats of /generate_table, and of streamed exports
+TableFormat = Literal["json", "ndjson", "csv"]
+ExportFormat = Literal["ndjson", "csv"]
+
+# Race time prediction models (see core.predictor)
+PredictionModel = Literal["riegel", "vdot"]
+
+# Maximum number of record sets in one prediction request
+MAX_PREDICTION_RECORDS = 10000
+
+# Maximum number of distances of a table or prediction request: the prediction
+# tables cached per distance set grow with the square of their number
+MAX_DISTANCES = 50
+
+# Distances in meters: ints stay ints (the "1000" row keys), floats stay floats
+Distances = List[Union[PositiveInt, PositiveFloat]]
+
 
 class TableParameters(BaseModel):
     """
@@ -33,9 +61,34 @@ class TableParameters(BaseModel):
     min_pace: The minimum pace in seconds per kilometer.
     max_pace: The maximum pace in seconds per kilometer.
     increment: The increment in seconds per kilometer for each row in the table.
+    athlete_ids: Athletes whose records are matched to the table rows.
+    """
+
+    min_pace: int = Field(gt=0)
+    max_pace: int = Field(gt=0)
+    increment: int = Field(gt=0)
+    distances: Distances = Field(
+        default=OFFICIAL_DISTANCES, min_length=1, max_length=MAX_DISTANCES
+    )
+    athlete_ids: List[int] = Field(default=[], max_length=MAX_OVERLAY_ATHLETES)
+
+
+class PredictionParameters(BaseModel):
+    """
+    Parameters for predicting race times.
+
+    Attributes:
+    records: Record sets to predict from, each mapping a distance in meters to a time in seconds.
+    athlete_ids: Athletes whose scraped records are used to predict.
+    distances: The distances in meters to predict.
+    model: The prediction model.
     """
 
-    min_pace: int
-    max_pace: int
-    increment: int
-    distances: list = OFFICIAL_DISTANCES
+    records: List[Dict[PositiveFloat, PositiveFloat]] = Field(
+        default=[], max_length=MAX_PREDICTION_RECORDS
+    )
+    athlete_ids: List[int] = Field(default=[], max_length=MAX_OVERLAY_ATHLETES)
+    distances: Distances = Field(
+        default=OFFICIAL_DISTANCES, min_length=1, max_length=MAX_DISTANCES
+    )
+    model: PredictionModel = "riegel"
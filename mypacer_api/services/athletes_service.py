@@ -2,18 +2,368 @@
 This module contains the service functions for the 'athletes' endpoint.
 """
 
+import os
+import re
+import threading
+import time
+from typing import Iterator, Optional, Tuple
+
 import psycopg2
+import requests
 from dotenv import load_dotenv
 from fastapi import HTTPException
+from psycopg2.errors import QueryCanceled
 from psycopg2.extras import RealDictCursor
 from unidecode import unidecode
 
-from mypacer_api.core import database, scrapper
+from mypacer_api.core import (
+    database,
+    export,
+    scrapper,
+    search_cache,
+    slow_queries,
+    snapshot,
+)
+from mypacer_api.core.admission import CircuitBreaker, service_unavailable
+from mypacer_api.core.results import (
+    AthleteHit,
+    RecordSet,
+    decode_cursor,
+    encode_cursor,
+)
+from mypacer_api.services import database_service, performances_service
 
 load_dotenv()
 
 
-def get_athletes_from_db(name: str, limit: int = 25, offset: int = 0) -> list:
+# Search modes supported by get_athletes_from_db
+SEARCH_MODES = ("ilike", "knn")
+
+# Minimum word_similarity() a row must reach to be returned by the KNN mode.
+# Lower values return more (and fuzzier) candidates; pg_trgm default is 0.6.
+KNN_WORD_SIMILARITY_THRESHOLD = float(
+    os.getenv("SEARCH_KNN_WORD_SIMILARITY_THRESHOLD", "0.3")
+)
+
+# Words shorter than this cannot use the trigram index (ILIKE '%du%' scans the whole
+# index): queries made only of such words use the prefix plan instead
+MIN_TOKEN_LENGTH = int(os.getenv("SEARCH_MIN_TOKEN_LENGTH", "3"))
+
+# Scraped records cache
+# Key: athlete id (str)
+# Value: (fetched_at timestamp, RecordSet)
+_records_cache: dict = {}
+# Guards _records_cache: records are fetched from threadpool threads
+_records_lock = threading.Lock()
+_MAX_RECORDS_CACHE_SIZE = int(os.getenv("RECORDS_CACHE_SIZE", "5000"))
+
+# Records younger than this (seconds) are served without calling bases.athle.fr
+RECORDS_CACHE_TTL = float(os.getenv("RECORDS_CACHE_TTL", "3600"))
+
+# Stops calling bases.athle.fr after repeated failures or timeouts
+records_breaker = CircuitBreaker(
+    failure_threshold=int(os.getenv("RECORDS_BREAKER_FAILURES", "5")),
+    reset_timeout=float(os.getenv("RECORDS_BREAKER_RESET_TIMEOUT", "30")),
+)
+
+# Maximum number of athletes in a streamed export
+EXPORT_MAX_ROWS = int(os.getenv("EXPORT_MAX_ROWS", "100000"))
+
+# Columns of an exported athlete, in order
+EXPORT_COLUMNS = list(AthleteHit._fields)
+
+# Fields that can be requested with `fields=`; id is always returned
+SEARCH_FIELDS = AthleteHit._fields
+
+# Database columns, in the field order of AthleteHit (the score is computed)
+_COLUMNS = SEARCH_FIELDS[:-1]
+
+# Columns always selected: id identifies the athlete, name ranks and filters
+# cached results (see core.search_cache)
+_REQUIRED_COLUMNS = ("id", "name")
+
+
+def parse_fields(
+    fields: Optional[str], allowed: tuple = SEARCH_FIELDS
+) -> Optional[tuple]:
+    """
+    Parse the comma-separated `fields` parameter of a search.
+
+    Args:
+        fields (str): Requested fields, e.g. "id,name,birth_date" (None: all fields).
+        allowed (tuple): The fields of the results (default: SEARCH_FIELDS).
+
+    Returns:
+        tuple: The requested fields in `allowed` order, always including id,
+        or None for all fields.
+
+    Raises:
+        HTTPException: 400 if a field is unknown.
+    """
+    if not fields:
+        return None
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested.difference(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields {sorted(unknown)}. Expected some of {allowed}.",
+        )
+    return tuple(field for field in allowed if field == "id" or field in requested)
+
+
+def parse_cursor(cursor: Optional[str], size: int) -> Optional[list]:
+    """
+    Decode the `cursor` parameter of a paginated listing.
+
+    Args:
+        cursor (str): The next_cursor of the previous page (None: first page).
+        size (int): The number of values of the sort key.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed.
+    """
+    if not cursor:
+        return None
+    try:
+        return decode_cursor(cursor, size)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+def _select_columns(fields: Optional[tuple]) -> tuple:
+    """
+    Database columns to select for the requested fields, in AthleteHit order.
+    """
+    if fields is None:
+        return _COLUMNS
+    return tuple(
+        column for column in _COLUMNS if column in fields or column in _REQUIRED_COLUMNS
+    )
+
+
+def _build_filters(
+    sexe: Optional[str], birth_year_min: Optional[int], birth_year_max: Optional[int]
+) -> tuple:
+    """
+    Build the optional filters of a search.
+
+    The sexe filter is served by idx_athletes_sexe. birth_date holds either a
+    year ("1934") or a full date ("07/01/1963"), so years are compared on its
+    last four characters, served by the idx_athletes_birth_year expression index.
+
+    Returns:
+        Tuple (SQL conditions, params), conditions being ANDed with the search.
+    """
+    conditions = []
+    params: list = []
+    if sexe is not None:
+        conditions.append("sexe = %s")
+        params.append(sexe)
+    if birth_year_min is not None or birth_year_max is not None:
+        conditions.append(
+            "birth_date IS NOT NULL AND right(birth_date, 4) BETWEEN %s AND %s"
+        )
+        params += [
+            f"{birth_year_min or 0:04d}",
+            f"{9999 if birth_year_max is None else birth_year_max:04d}",
+        ]
+    return conditions, params
+
+
+def normalize_query(name: str) -> str:
+    """
+    Normalize a search query (same logic as database normalize_text function).
+
+    Args:
+        name (str): The raw search query.
+
+    Returns:
+        str: The query lowercased, without accents and with collapsed whitespace.
+    """
+    return " ".join(unidecode(name).lower().strip().split())
+
+
+def _build_ilike_query(
+    normalized_query: str,
+    limit: int,
+    offset: int,
+    columns: tuple = _COLUMNS,
+    filters: tuple = ((), []),
+) -> tuple:
+    """
+    Build the substring search: one ILIKE per word, ranked by similarity().
+
+    Every matching row is ranked before LIMIT is applied, which is accurate
+    but scales with the number of matches for common names.
+
+    Words shorter than MIN_TOKEN_LENGTH have no trigram: ILIKE '%du%' would make
+    the GIN index read every entry. They are matched with strpos() instead, which
+    the planner cannot push to the index and applies as a filter on the rows
+    found by the longer words. (Queries of short words only use the prefix plan.)
+
+    Args:
+        columns (tuple): The columns to select (the score is always selected last).
+        filters (tuple): (conditions, params) from _build_filters().
+
+    Returns:
+        Tuple (query, params) ready to be executed.
+    """
+    query_parts = normalized_query.split()
+    conditions, filter_params = filters
+
+    # Build WHERE clause using normalized_name and ILIKE for trigram index usage
+    # Each word must be found in the normalized_name (AND logic)
+    word_conditions = []
+    search_patterns = []
+    for part in query_parts:
+        if len(part) < MIN_TOKEN_LENGTH:
+            word_conditions.append("strpos(normalized_name, %s) > 0")
+            search_patterns.append(part)
+        else:
+            # % wildcards for substring matching
+            word_conditions.append("normalized_name ILIKE %s")
+            search_patterns.append(f"%{part}%")
+    where_clause = " AND ".join(word_conditions + list(conditions))
+
+    # Optimized query using:
+    # 1. normalized_name (indexed with GIN trigram)
+    # 2. similarity() function for ranking
+    # 3. ILIKE operator (uses trigram index when available)
+    query = f"""
+        SELECT {", ".join(columns)},
+            similarity(normalized_name, %s) AS score
+        FROM athletes
+        WHERE {where_clause}
+        ORDER BY score DESC, name
+        LIMIT %s OFFSET %s
+        """
+
+    # Add the full normalized query for similarity calculation
+    params = [normalized_query, *search_patterns, *filter_params, limit, offset]
+    return query, params
+
+
+def _build_prefix_query(
+    normalized_query: str,
+    limit: int,
+    offset: int,
+    columns: tuple = _COLUMNS,
+    filters: tuple = ((), []),
+) -> tuple:
+    """
+    Build the prefix search used for short queries ("d", "du", "l m").
+
+    Names starting with the query are read in order from the C-collated B-tree
+    index (idx_athletes_normalized_name_prefix), so PostgreSQL stops after
+    `limit + offset` rows. Results are ordered by name, not by score.
+
+    Args:
+        columns (tuple): The columns to select (the score is always selected last).
+        filters (tuple): (conditions, params) from _build_filters().
+
+    Returns:
+        Tuple (query, params) ready to be executed.
+    """
+    conditions, filter_params = filters
+    where_clause = " AND ".join(
+        ['normalized_name COLLATE "C" LIKE %s'] + list(conditions)
+    )
+
+    query = f"""
+        SELECT {", ".join(columns)},
+            similarity(normalized_name, %s) AS score
+        FROM athletes
+        WHERE {where_clause}
+        ORDER BY normalized_name COLLATE "C"
+        LIMIT %s OFFSET %s
+        """
+
+    # LIKE wildcards in the query itself are matched literally
+    prefix = re.sub(r"([\\%_])", r"\\\1", normalized_query)
+    params = [normalized_query, f"{prefix}%", *filter_params, limit, offset]
+    return query, params
+
+
+def _build_knn_query(
+    normalized_query: str,
+    limit: int,
+    offset: int,
+    columns: tuple = _COLUMNS,
+    filters: tuple = ((), []),
+) -> tuple:
+    """
+    Build the nearest-neighbour search ordered by word similarity distance.
+
+    The `<<->` operator is served by the GiST trigram index, which returns rows
+    in distance order so PostgreSQL stops after `limit + offset` rows instead
+    of ranking every match. The `<%` operator discards rows below
+    KNN_WORD_SIMILARITY_THRESHOLD (set for the current transaction only).
+
+    Args:
+        columns (tuple): The columns to select (the score is always selected last).
+        filters (tuple): (conditions, params) from _build_filters().
+
+    Returns:
+        Tuple (query, params) ready to be executed.
+    """
+    conditions, filter_params = filters
+    where_clause = " AND ".join(["%s <%% normalized_name", *conditions])
+    query = f"""
+        SELECT {", ".join(columns)},
+            1 - (%s <<-> normalized_name) AS score
+        FROM athletes
+        WHERE {where_clause}
+        ORDER BY %s <<-> normalized_name, name
+        LIMIT %s OFFSET %s
+        """
+    params = [
+        normalized_query,
+        normalized_query,
+        *filter_params,
+        normalized_query,
+        limit,
+        offset,
+    ]
+    return query, params
+
+
+def _hit_factory(columns: tuple):
+    """
+    Build the function converting a result tuple (columns, then score) to an
+    AthleteHit, leaving the fields that were not selected to None.
+    """
+    if columns == _COLUMNS:
+        return AthleteHit._make
+    selected = (*columns, "score")
+    positions = [
+        selected.index(field) if field in selected else None for field in SEARCH_FIELDS
+    ]
+    return lambda row: AthleteHit._make(
+        None if i is None else row[i] for i in positions
+    )
+
+
+def _search_superseded() -> HTTPException:
+    """
+    Error of a search cancelled by a newer search of the same session.
+    """
+    return HTTPException(
+        status_code=409, detail="Search superseded by a newer search of the session."
+    )
+
+
+def get_athletes_from_db(
+    name: str,
+    limit: int = 25,
+    offset: int = 0,
+    mode: str = "ilike",
+    fields: Optional[tuple] = None,
+    sexe: Optional[str] = None,
+    birth_year_min: Optional[int] = None,
+    birth_year_max: Optional[int] = None,
+    search_session: Optional[Tuple[str, int]] = None,
+) -> list:
     """
     Retrieves athletes information from the PostgreSQL database based on the provided athlete name.
 
@@ -21,60 +371,111 @@ def get_athletes_from_db(name: str, limit: int = 25, offset: int = 0) -> list:
     The search query is normalized using the database's normalize_text() function for
     accent-insensitive and case-insensitive matching.
 
+    Results are served from a short-lived cache when the same query (or a shorter
+    query with a complete result set) was answered recently, see core.search_cache.
+
+    Two search modes are available:
+    - "ilike": every word must appear in the name, results ranked by similarity().
+    - "knn": index-ordered nearest-neighbour scan on word similarity, tolerant to
+      typos and bounded by `limit` (see KNN_WORD_SIMILARITY_THRESHOLD).
+
+    In "ilike" mode, queries whose words are all shorter than MIN_TOKEN_LENGTH
+    return the names starting with the query, in name order (_build_prefix_query).
+    The query runs with the "search" statement timeout (database.STATEMENT_TIMEOUTS).
+
     Args:
         name (str): The name of the athlete to search for.
         limit (int): Maximum number of results to return (default: 25).
         offset (int): Number of results to skip for pagination (default: 0).
+        mode (str): Search mode, one of SEARCH_MODES (default: "ilike").
+        fields (tuple): Fields to select, from parse_fields() (default: all).
+            The other fields of the returned AthleteHit are None.
+        sexe (str): Only return athletes of this sexe ("M" or "F").
+        birth_year_min (int): Only return athletes born this year or later.
+        birth_year_max (int): Only return athletes born this year or earlier.
+        search_session (Tuple[str, int]): The (session, ticket) from
+            database.start_session_query: the query is cancelled when a newer
+            search of the same session starts.
 
     Returns:
-        List of dictionaries containing athlete data, ordered by relevance (similarity score).
+        List of AthleteHit, ordered by relevance (similarity score).
+
+    Raises:
+        HTTPException: 409 when superseded by a newer search of the same session,
+        503 when the statement timeout is reached, 500 on database errors.
     """
-    conn = None
-    cursor = None
+    if mode not in SEARCH_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown search mode '{mode}'. Expected one of {SEARCH_MODES}.",
+        )
 
-    try:
-        # Get connection from pool
-        conn = database.get_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
+    normalized_query = normalize_query(name)
+    if not normalized_query:
+        return []
 
-        # Normalize search query (same logic as database normalize_text function)
-        normalized_query = " ".join(unidecode(name).lower().strip().split())
-        query_parts = normalized_query.split()
+    # Queries of short words only use the prefix plan (cached apart: its results
+    # are not a subset of the substring search results)
+    plan = mode
+    if mode == "ilike" and all(
+        len(word) < MIN_TOKEN_LENGTH for word in normalized_query.split()
+    ):
+        plan = "prefix"
 
-        # Build WHERE clause using normalized_name and ILIKE for trigram index usage
-        # Each word must be found in the normalized_name (AND logic)
-        where_clause = " AND ".join(["normalized_name ILIKE %s" for _ in query_parts])
+    # Projection and filters change the results: part of the cache key
+    variant = (fields, sexe, birth_year_min, birth_year_max)
+    search_cache.check_generation(database_service.get_data_generation)
+    cached = search_cache.get(normalized_query, limit, offset, plan, variant)
+    if cached is not None:
+        return cached
 
-        # Optimized query using:
-        # 1. normalized_name (indexed with GIN trigram)
-        # 2. similarity() function for ranking
-        # 3. ILIKE operator (uses trigram index when available)
-        query = f"""
-        SELECT
-            id,
-            ffa_id,
-            name,
-            url,
-            birth_date,
-            license_id,
-            sexe,
-            nationality,
-            similarity(normalized_name, %s) AS score
-        FROM athletes
-        WHERE {where_clause}
-        ORDER BY score DESC, name
-        LIMIT %s OFFSET %s
-        """
+    columns = _select_columns(fields)
+    filters = _build_filters(sexe, birth_year_min, birth_year_max)
 
-        # Prepare search patterns for ILIKE (% wildcards for fuzzy matching)
-        search_patterns = [f"%{part}%" for part in query_parts]
+    conn = None
+    cursor = None
+
+    try:
+        # Get connection from pool, with the search statement timeout
+        conn = database.get_connection("search")
+        # Plain tuples, wrapped in AthleteHit (no dict per row)
+        cursor = conn.cursor()
 
-        # Add the full normalized query for similarity calculation
-        params = [normalized_query] + search_patterns + [limit, offset]
+        if plan == "knn":
+            # Scoped to the current transaction, rolled back when released to the pool
+            cursor.execute(
+                "SELECT set_config('pg_trgm.word_similarity_threshold', %s, true)",
+                (str(KNN_WORD_SIMILARITY_THRESHOLD),),
+            )
+            query, params = _build_knn_query(
+                normalized_query, limit, offset, columns, filters
+            )
+        elif plan == "prefix":
+            query, params = _build_prefix_query(
+                normalized_query, limit, offset, columns, filters
+            )
+        else:
+            query, params = _build_ilike_query(
+                normalized_query, limit, offset, columns, filters
+            )
 
-        cursor.execute(query, params)
-        results = cursor.fetchall()
+        if search_session is not None and not database.attach_session_query(
+            *search_session, conn
+        ):
+            raise _search_superseded()
+        database.execute(cursor, query, params)
+        results = list(map(_hit_factory(columns), cursor.fetchall()))
 
+    except QueryCanceled as exc:
+        if search_session is not None and not database.is_latest_session_query(
+            *search_session
+        ):
+            # Cancelled by a newer search of the session (start_session_query)
+            raise _search_superseded() from exc
+        raise HTTPException(
+            status_code=503,
+            detail="Search took too long, please type a longer name.",
+        ) from exc
     except psycopg2.Error as exc:
         raise HTTPException(
             status_code=500, detail=f"Database error: {str(exc)}"
@@ -82,29 +483,244 @@ def get_athletes_from_db(name: str, limit: int = 25, offset: int = 0) -> list:
     finally:
         if cursor:
             cursor.close()
+        if search_session is not None:
+            # A newer search must not cancel the connection once back in the pool
+            database.detach_session_query(*search_session)
         if conn:
             # Return connection to pool instead of closing it
             database.release_connection(conn)
 
+    search_cache.put(normalized_query, limit, offset, plan, results, variant)
     return results
 
 
-def get_athlete_records(ident) -> dict:
+def get_club_roster(
+    club_id: int,
+    season: Optional[int] = None,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    fields: Optional[tuple] = None,
+    sexe: Optional[str] = None,
+) -> Tuple[list, Optional[str]]:
     """
-    Retrieves athlete records from the 'athle.fr' website based on the provided athlete ID.
+    List the athletes of a club for a season, ordered by name.
+
+    Memberships are read from the primary key of athlete_clubs (club_id, season,
+    athlete_id), then joined to athletes: one indexed query per page. Pages are
+    chained with a keyset cursor on (name, id) instead of OFFSET. Pages are
+    cached like searches (see core.search_cache).
 
     Args:
-        ident (str): The ID of the athlete to search for.
+        club_id (int): The ID of the club.
+        season (int): The season (default: the latest season of the club).
+        limit (int): Maximum number of athletes per page (default: 100).
+        cursor (str): The next_cursor of the previous page (default: first page).
+        fields (tuple): Fields to select, from parse_fields() (default: all).
+        sexe (str): Only return athletes of this sexe ("M" or "F").
+
+    Returns:
+        Tuple (List of AthleteHit, next_cursor): next_cursor is None on the last page.
+
+    Raises:
+        HTTPException: 400 on an invalid cursor, 500 on database errors.
+    """
+    after = parse_cursor(cursor, 2)
+
+    variant = (fields, club_id, season, sexe, cursor)
+    search_cache.check_generation(database_service.get_data_generation)
+    rows = search_cache.get("", limit, 0, "roster", variant)
+    if rows is None:
+        columns = _select_columns(fields)
+        conditions, params = _build_filters(sexe, None, None)
+        conditions = list(conditions)
+        if after is not None:
+            conditions.append("(name, id) > (%s, %s)")
+            params = [*params, *after]
+
+        # The score of a roster is always NULL (AthleteHit.score)
+        query = f"""
+            SELECT {", ".join(columns)}, NULL::real AS score
+            FROM athlete_clubs
+            JOIN athletes ON athletes.id = athlete_clubs.athlete_id
+            WHERE athlete_clubs.club_id = %s
+                AND athlete_clubs.season = COALESCE(
+                    %s,
+                    (SELECT MAX(season) FROM athlete_clubs WHERE club_id = %s)
+                )
+                {"".join(f" AND {condition}" for condition in conditions)}
+            ORDER BY name, id
+            LIMIT %s
+            """
+        # One extra row tells whether there is a next page
+        params = [club_id, season, club_id, *params, limit + 1]
+
+        conn = None
+        db_cursor = None
+        try:
+            # Get connection from pool, with the search statement timeout
+            conn = database.get_connection("search")
+            db_cursor = conn.cursor()
+            database.execute(db_cursor, query, params)
+            rows = list(map(_hit_factory(columns), db_cursor.fetchall()))
+
+        except psycopg2.Error as exc:
+            raise HTTPException(
+                status_code=500, detail=f"Database error: {str(exc)}"
+            ) from exc
+        finally:
+            if db_cursor:
+                db_cursor.close()
+            if conn:
+                # Return connection to pool instead of closing it
+                database.release_connection(conn)
+
+        search_cache.put("", limit, 0, "roster", rows, variant)
+
+    if len(rows) <= limit:
+        return rows, None
+    last = rows[limit - 1]
+    return rows[:limit], encode_cursor((last.name, last.id))
+
+
+class _CursorRows:
+    """
+    The rows of a server-side cursor, fetched itersize at a time.
+
+    close() records the time spent in fetches (not waiting for the client to read
+    the rows) in the slow-query log under the query of the cursor, closes the
+    cursor and releases its connection. It runs once the rows are exhausted or
+    fail, and may be called by the owner of an export that was abandoned, even
+    from another thread while a fetch is in progress.
+    """
+
+    def __init__(self, conn, cursor, query: str):
+        self._conn = conn
+        self._cursor = cursor
+        self._query = query
+        self._fetch_ms = 0.0
+        # Serializes the fetches and close(): a connection is released only once,
+        # and never while one of its fetches is running
+        self._lock = threading.Lock()
+
+    def __iter__(self) -> Iterator[dict]:
+        try:
+            while True:
+                with self._lock:
+                    if self._conn is None:
+                        return
+                    start = time.perf_counter()
+                    rows = self._cursor.fetchmany(self._cursor.itersize)
+                    self._fetch_ms += (time.perf_counter() - start) * 1000
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Record the fetches, close the cursor and release the connection, once."""
+        with self._lock:
+            if self._conn is None:
+                return
+            conn, self._conn = self._conn, None
+            slow_queries.record(self._query, self._fetch_ms)
+            try:
+                self._cursor.close()
+            finally:
+                database.release_connection(conn)
+
+
+def stream_athletes(
+    name: str,
+    mode: str = "ilike",
+    fmt: str = "ndjson",
+    limit: int = EXPORT_MAX_ROWS,
+):
+    """
+    Stream every athlete matching a search, as NDJSON or CSV.
+
+    Rows are read through a server-side (named) cursor, fetched from PostgreSQL
+    in batches as the response is sent, so memory stays bounded whatever the
+    number of matches. The pool connection is held until the whole export has
+    been sent, with the "export" statement timeout on each fetch.
+
+    Args:
+        name (str): The name of the athlete to search for.
+        mode (str): Search mode, one of SEARCH_MODES (default: "ilike").
+        fmt (str): "ndjson" or "csv".
+        limit (int): Maximum number of athletes, capped at EXPORT_MAX_ROWS.
+
+    Returns:
+        export.ClosingStream: The encoded chunks, ordered by relevance. Its close()
+            releases the connection, whether or not the chunks were iterated.
+    """
+    if mode not in SEARCH_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown search mode '{mode}'. Expected one of {SEARCH_MODES}.",
+        )
+
+    limit = max(1, min(limit, EXPORT_MAX_ROWS))
+    normalized_query = normalize_query(name)
+    if not normalized_query:
+        return export.ClosingStream(export.encode_rows(iter(()), EXPORT_COLUMNS, fmt))
+
+    conn = None
+    cursor = None
+
+    try:
+        conn = database.get_connection("export")
+
+        if mode == "knn":
+            with conn.cursor() as settings_cursor:
+                settings_cursor.execute(
+                    "SELECT set_config('pg_trgm.word_similarity_threshold', %s, true)",
+                    (str(KNN_WORD_SIMILARITY_THRESHOLD),),
+                )
+            query, params = _build_knn_query(normalized_query, limit, 0)
+        else:
+            query, params = _build_ilike_query(normalized_query, limit, 0)
+
+        # Named cursor: rows stay on the server and are fetched itersize at a time
+        cursor = conn.cursor(name="athletes_export", cursor_factory=RealDictCursor)
+        cursor.itersize = 1000
+        # Only declares the cursor: the fetches are timed by _CursorRows
+        database.execute(cursor, query, params)
+
+    except psycopg2.Error as exc:
+        if cursor:
+            cursor.close()
+        if conn:
+            database.release_connection(conn)
+        raise HTTPException(
+            status_code=500, detail=f"Database error: {str(exc)}"
+        ) from exc
+
+    rows = _CursorRows(conn, cursor, query)
+    return export.ClosingStream(
+        export.encode_rows(rows, EXPORT_COLUMNS, fmt), rows.close
+    )
+
+
+def _get_athlete_url(ident) -> str:
+    """
+    Look up the 'bases.athle.fr' records page URL of an athlete.
+
+    Args:
+        ident (str): The ID of the athlete.
 
     Returns:
-        dict: A dictionary containing the athlete's records for various disciplines and distances.
+        str: The URL of the athlete's records page.
+
+    Raises:
+        HTTPException: 404 if the athlete or its URL is unknown, 500 on database errors.
     """
     conn = None
     cursor = None
 
     try:
         # Get connection from pool
-        conn = database.get_connection()
+        conn = database.get_connection("lookup")
         cursor = conn.cursor(cursor_factory=RealDictCursor)
 
         query = """
@@ -114,7 +730,7 @@ def get_athlete_records(ident) -> dict:
         LIMIT 1
         """
 
-        cursor.execute(query, (ident,))
+        database.execute(cursor, query, (ident,))
         result = cursor.fetchone()
 
         if not result:
@@ -136,5 +752,136 @@ def get_athlete_records(ident) -> dict:
     if not url:
         raise HTTPException(status_code=404, detail="Athlete URL not found.")
 
-    # Scrape athlete records from FFA website
-    return scrapper.scrap_athlete_records(url)
+    return url
+
+
+def _cache_records(ident: str, records: RecordSet, fetched_at: Optional[float] = None):
+    """
+    Store freshly scraped records, evicting the least recently fetched entry if full.
+    """
+    with _records_lock:
+        _records_cache.pop(ident, None)
+        if len(_records_cache) >= _MAX_RECORDS_CACHE_SIZE:
+            _records_cache.pop(next(iter(_records_cache)))
+        _records_cache[ident] = (fetched_at or time.time(), records)
+
+
+def copy_records_cache() -> dict:
+    """
+    Get a copy of the records cache, safe to iterate while records are fetched.
+    """
+    with _records_lock:
+        return dict(_records_cache)
+
+
+def get_records_fetched_at(ident) -> Optional[float]:
+    """
+    Get the time at which the cached records of an athlete were fetched.
+
+    Args:
+        ident (str): The ID of the athlete.
+
+    Returns:
+        float: The fetch timestamp, or None if the records are not cached or
+        older than RECORDS_CACHE_TTL (the next call will fetch them again).
+    """
+    cached = _records_cache.get(str(ident))
+    if cached and time.time() - cached[0] < RECORDS_CACHE_TTL:
+        return cached[0]
+    return None
+
+
+def get_cached_records(ident) -> Optional[RecordSet]:
+    """
+    Get the records of an athlete if they are cached in memory and fresh.
+
+    Args:
+        ident (str): The ID of the athlete.
+
+    Returns:
+        RecordSet: The cached records, or None if get_athlete_records() would need
+        to read the snapshot or call bases.athle.fr.
+    """
+    cached = _records_cache.get(str(ident))
+    if cached and time.time() - cached[0] < RECORDS_CACHE_TTL:
+        return cached[1]
+    return None
+
+
+def get_athlete_records(ident) -> RecordSet:
+    """
+    Retrieves athlete records from the 'athle.fr' website based on the provided athlete ID.
+
+    Records fetched less than RECORDS_CACHE_TTL seconds ago are served from memory
+    (or from the warm-state snapshot written before a restart).
+    Each scrape also stores the full performance history listed on the page
+    (see performances_service), from the same request.
+    When bases.athle.fr keeps failing, the circuit breaker opens and older cached
+    records are served instead of calling the website again.
+
+    Args:
+        ident (str): The ID of the athlete to search for.
+
+    Returns:
+        RecordSet: The athlete's best times in seconds, keyed by distance in meters.
+
+    Raises:
+        HTTPException: 503 with Retry-After when the website is unavailable and no
+        cached records exist, 502/504 when the request to the website fails.
+    """
+    ident = str(ident)
+    cached = _records_cache.get(ident)
+    if cached is None:
+        # Records scraped before a restart, kept with their original fetch time
+        cached = snapshot.get_records(ident)
+        if cached is not None:
+            _cache_records(ident, cached[1], fetched_at=cached[0])
+    if cached and time.time() - cached[0] < RECORDS_CACHE_TTL:
+        return cached[1]
+
+    if cached and records_breaker.state == "open":
+        return cached[1]
+
+    url = _get_athlete_url(ident)
+
+    if not records_breaker.allow_request():
+        if cached:
+            return cached[1]
+        raise service_unavailable(
+            "bases.athle.fr is unavailable, please retry later.",
+            records_breaker.retry_after(),
+        )
+
+    # Scrape athlete records (and the full performance history) from FFA website
+    try:
+        records, performances = scrapper.scrap_athlete_page(url)
+    except (requests.RequestException, HTTPException) as exc:
+        if isinstance(exc, HTTPException) and exc.status_code < 500:
+            records_breaker.record_success()
+            raise
+        records_breaker.record_failure()
+        if cached:
+            return cached[1]
+        if isinstance(exc, requests.Timeout):
+            raise HTTPException(
+                status_code=504, detail="bases.athle.fr did not respond in time."
+            ) from exc
+        if isinstance(exc, requests.RequestException):
+            raise HTTPException(
+                status_code=502, detail="Failed to make an external request"
+            ) from exc
+        raise
+    except Exception:
+        # Unexpected error (parsing, broken worker pool): still ends the half-open
+        # trial, otherwise the circuit would stay refused forever
+        records_breaker.record_failure()
+        raise
+
+    records_breaker.record_success()
+    _cache_records(ident, records)
+    try:
+        performances_service.store_performances(ident, performances)
+    except HTTPException:
+        # The history is refreshed at the next scrape, the records are still served
+        pass
+    return records
@@ -0,0 +1,133 @@
+"""
+This module contains the service functions for the 'clubs' endpoints.
+"""
+
+from typing import Optional, Tuple
+
+import psycopg2
+from fastapi import HTTPException
+
+from mypacer_api.core import database, search_cache
+from mypacer_api.core.results import ClubHit, encode_cursor
+from mypacer_api.services import database_service
+from mypacer_api.services.athletes_service import normalize_query, parse_cursor
+
+# Fields that can be requested with `fields=`; id is always returned
+CLUB_FIELDS = ClubHit._fields
+
+# Database columns, in the field order of ClubHit (the score is computed)
+_CLUB_COLUMNS = CLUB_FIELDS[:-1]
+
+
+def _build_club_query(
+    normalized_query: str,
+    limit: int,
+    after: Optional[list] = None,
+    season: Optional[int] = None,
+) -> tuple:
+    """
+    Build the club search: one ILIKE per word (idx_clubs_normalized_name_trgm),
+    ranked by similarity(), paginated with a keyset on (score, name, id).
+
+    Args:
+        after (list): The (score, name, id) of the last club of the previous page.
+        season (int): Only return clubs active this season (idx_clubs_years).
+
+    Returns:
+        Tuple (query, params) ready to be executed.
+    """
+    words = normalized_query.split()
+    conditions = ["normalized_name ILIKE %s" for _ in words]
+    params: list = [normalized_query, *(f"%{word}%" for word in words)]
+    if season is not None:
+        conditions.append("first_year <= %s AND last_year >= %s")
+        params += [season, season]
+
+    keyset = ""
+    if after is not None:
+        # The score is a real: compared as a real, not as the double sent back
+        keyset = """
+        WHERE score < %s::real
+            OR (score = %s::real AND (name, id) > (%s, %s))
+        """
+        params += [after[0], after[0], after[1], after[2]]
+
+    query = f"""
+        SELECT {", ".join(_CLUB_COLUMNS)}, score
+        FROM (
+            SELECT {", ".join(_CLUB_COLUMNS)},
+                similarity(normalized_name, %s) AS score
+            FROM clubs
+            WHERE {" AND ".join(conditions)}
+        ) AS matches
+        {keyset}
+        ORDER BY score DESC, name, id
+        LIMIT %s
+        """
+    # One extra row tells whether there is a next page
+    params.append(limit + 1)
+    return query, params
+
+
+def search_clubs(
+    name: str,
+    limit: int = 25,
+    cursor: Optional[str] = None,
+    season: Optional[int] = None,
+) -> Tuple[list, Optional[str]]:
+    """
+    Search clubs by name, ordered by relevance.
+
+    Uses the same path as the athlete search: normalized query, trigram index,
+    short-lived result cache (core.search_cache) and the "search" statement timeout.
+    Pages are chained with a keyset cursor instead of OFFSET.
+
+    Args:
+        name (str): The name of the club to search for.
+        limit (int): Maximum number of clubs per page (default: 25).
+        cursor (str): The next_cursor of the previous page (default: first page).
+        season (int): Only return clubs active this season.
+
+    Returns:
+        Tuple (List of ClubHit, next_cursor): next_cursor is None on the last page.
+
+    Raises:
+        HTTPException: 400 on an invalid cursor, 500 on database errors.
+    """
+    after = parse_cursor(cursor, 3)
+    normalized_query = normalize_query(name)
+    if not normalized_query:
+        return [], None
+
+    variant = (season, cursor)
+    search_cache.check_generation(database_service.get_data_generation)
+    rows = search_cache.get(normalized_query, limit, 0, "clubs", variant)
+    if rows is None:
+        query, params = _build_club_query(normalized_query, limit, after, season)
+
+        conn = None
+        db_cursor = None
+        try:
+            # Get connection from pool, with the search statement timeout
+            conn = database.get_connection("search")
+            db_cursor = conn.cursor()
+            database.execute(db_cursor, query, params)
+            rows = list(map(ClubHit._make, db_cursor.fetchall()))
+
+        except psycopg2.Error as exc:
+            raise HTTPException(
+                status_code=500, detail=f"Database error: {str(exc)}"
+            ) from exc
+        finally:
+            if db_cursor:
+                db_cursor.close()
+            if conn:
+                # Return connection to pool instead of closing it
+                database.release_connection(conn)
+
+        search_cache.put(normalized_query, limit, 0, "clubs", rows, variant)
+
+    if len(rows) <= limit:
+        return rows, None
+    last = rows[limit - 1]
+    return rows[:limit], encode_cursor((last.score, last.name, last.id))
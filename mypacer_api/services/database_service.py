@@ -2,6 +2,10 @@
 This module contains functions that interact with the database.
 """
 
+import os
+import time
+from datetime import timezone
+
 import psycopg2
 from dotenv import load_dotenv
 
@@ -9,6 +13,12 @@ from mypacer_api.core import database
 
 load_dotenv()
 
+# How long the last update time of the athletes table is cached, in seconds
+ATHLETES_VERSION_TTL = float(os.getenv("ATHLETES_VERSION_TTL", "60"))
+
+# (expires_at, timestamp) of the last athletes update
+_athletes_last_update = None
+
 
 def get_database_status():
     """
@@ -27,13 +37,14 @@ def get_database_status():
         conn = database.get_connection()
         cursor = conn.cursor()
 
-        cursor.execute("SELECT COUNT(*) FROM clubs;")
+        database.execute(cursor, "SELECT COUNT(*) FROM clubs;")
         num_clubs = cursor.fetchone()[0]
 
-        cursor.execute("SELECT COUNT(*) FROM athletes;")
+        database.execute(cursor, "SELECT COUNT(*) FROM athletes;")
         num_athletes = cursor.fetchone()[0]
 
-        cursor.execute(
+        database.execute(
+            cursor,
             """
         SELECT GREATEST(
             MAX(last_vacuum),
@@ -43,7 +54,7 @@ def get_database_status():
         ) AS last_update
         FROM pg_stat_all_tables
         WHERE relname = 'athletes';
-        """
+        """,
         )
         last_update = cursor.fetchone()[0]
 
@@ -60,3 +71,77 @@ def get_database_status():
         if conn:
             # Return connection to pool instead of closing it
             database.release_connection(conn)
+
+
+def get_athletes_last_update():
+    """
+    Retrieves the last modification time of the athletes table.
+
+    The value is cached for ATHLETES_VERSION_TTL seconds, so that it can be used to
+    validate HTTP caches on every request without querying the database each time.
+
+    Returns:
+        float: Timestamp of the most recent athlete insert or update, or None if
+        the table is empty.
+    """
+    global _athletes_last_update
+
+    now = time.monotonic()
+    if _athletes_last_update is not None and now < _athletes_last_update[0]:
+        return _athletes_last_update[1]
+
+    conn = None
+    cursor = None
+
+    try:
+        # Get connection from pool
+        conn = database.get_connection()
+        cursor = conn.cursor()
+
+        # Served by idx_athletes_updated_at (backward index scan, one row)
+        cursor.execute("SELECT MAX(updated_at) FROM athletes;")
+        last_update = cursor.fetchone()[0]
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            # Return connection to pool instead of closing it
+            database.release_connection(conn)
+
+    # updated_at is set by NOW() in the server time zone (UTC in the Docker images)
+    timestamp = (
+        last_update.replace(tzinfo=timezone.utc).timestamp() if last_update else None
+    )
+    _athletes_last_update = (now + ATHLETES_VERSION_TTL, timestamp)
+    return timestamp
+
+
+def get_data_generation():
+    """
+    Retrieves the data generation, incremented by every ingestion that changed rows.
+
+    API workers compare it to the generation of their in-memory caches
+    (see core.search_cache.check_generation).
+
+    Returns:
+        int: The generation, or None if it cannot be read (the caches are then
+        kept until they expire).
+    """
+    conn = None
+    cursor = None
+
+    try:
+        # Get connection from pool
+        conn = database.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT generation FROM data_generation;")
+        row = cursor.fetchone()
+        return row[0] if row else None
+    except psycopg2.Error:
+        return None
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            # Return connection to pool instead of closing it
+            database.release_connection(conn)
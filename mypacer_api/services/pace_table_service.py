@@ -2,15 +2,33 @@
 This module contains the pace table service, which is responsible for generating a pace table.
 """
 
+import os
+import threading
+from typing import Iterator, Optional
+
 from fastapi import HTTPException
 
-from mypacer_api.core import calculator
+from mypacer_api.core import calculator, export, prerender, snapshot, workers
+from mypacer_api.core.results import PaceTable
 
 # Simple cache for pace table results
 # Key: (min_pace, max_pace, increment, tuple of distances)
-# Value: calculated pace table
+# Value: calculated pace table (compact PaceTable, encoded to rows by the endpoint)
 _pace_table_cache: dict = {}
 _MAX_CACHE_SIZE = 100
+# Guards _pace_table_cache: tables are computed from threadpool threads
+_pace_table_lock = threading.Lock()
+
+# Directory of tables pre-rendered by `python -m mypacer_api.core.prerender`
+# (disabled when unset), and the URL prefix under which they are served
+PRERENDERED_TABLES_DIR = os.getenv("PRERENDERED_TABLES_DIR")
+PRERENDERED_TABLES_URL = os.getenv("PRERENDERED_TABLES_URL", "/pace_tables")
+
+# (manifest modification time, manifest) of the pre-rendered tables
+_prerendered_manifest: tuple = (None, None)
+
+# Tables with more cells (rows x distances) are computed in the worker process pool
+OFFLOAD_MIN_CELLS = int(os.getenv("PACE_TABLE_OFFLOAD_MIN_CELLS", "20000"))
 
 
 def _get_cache_key(
@@ -26,14 +44,16 @@ def _get_cache_key(
         distances: List of distances in meters
 
     Returns:
-        Tuple that can be used as a dictionary key
+        Tuple that can be used as a dictionary key. Distances are formatted like
+        the row keys, so that 1000 and 1000.0 (keys "1000" and "1000.0") do not
+        share a table.
     """
-    return (min_pace, max_pace, increment, tuple(sorted(distances)))
+    return (min_pace, max_pace, increment, tuple(sorted(str(d) for d in distances)))
 
 
 def get_pace_table(
     min_pace: int, max_pace: int, increment: int, distances: list = []
-) -> list:
+) -> PaceTable:
     """
     Get a pace table for a given range of paces and increment.
     Results are cached to improve performance for repeated requests.
@@ -45,8 +65,7 @@ def get_pace_table(
     distances (list): A list of distances in meters
 
     Returns:
-    List[Dict]: A list of dictionaries where each dictionary represents a row in the pace table,
-    with keys being the distances and values being the calculated times.
+    PaceTable: The pace table, encoded to a list of rows with PaceTable.to_rows().
     """
     if max_pace > min_pace:
         raise HTTPException(
@@ -55,17 +74,175 @@ def get_pace_table(
 
     # Check cache first
     cache_key = _get_cache_key(min_pace, max_pace, increment, distances)
-    if cache_key in _pace_table_cache:
-        return _pace_table_cache[cache_key]
-
-    # Calculate if not in cache
-    result = calculator.calculate_pace_table(min_pace, max_pace, increment, distances)
+    with _pace_table_lock:
+        cached = _pace_table_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # Restore from the warm-state snapshot, or calculate
+    result = snapshot.get_pace_table(cache_key)
+    if result is None:
+        nb_cells = ((min_pace - max_pace) // max(increment, 1) + 1) * len(distances)
+        if nb_cells >= OFFLOAD_MIN_CELLS:
+            result = workers.run(
+                calculator.build_pace_table, min_pace, max_pace, increment, distances
+            )
+        else:
+            result = calculator.build_pace_table(
+                min_pace, max_pace, increment, distances
+            )
 
     # Store in cache (with simple size limit)
-    if len(_pace_table_cache) >= _MAX_CACHE_SIZE:
-        # Remove oldest entry (first key)
-        _pace_table_cache.pop(next(iter(_pace_table_cache)))
-
-    _pace_table_cache[cache_key] = result
+    with _pace_table_lock:
+        if cache_key not in _pace_table_cache and (
+            len(_pace_table_cache) >= _MAX_CACHE_SIZE
+        ):
+            # Remove oldest entry (first key)
+            _pace_table_cache.pop(next(iter(_pace_table_cache)))
+        _pace_table_cache[cache_key] = result
 
     return result
+
+
+def cache_items() -> dict:
+    """
+    Get a copy of the pace table cache, safe to iterate while tables are computed.
+    """
+    with _pace_table_lock:
+        return dict(_pace_table_cache)
+
+
+def stream_pace_table(
+    min_pace: int, max_pace: int, increment: int, distances: list, fmt: str
+) -> Iterator[bytes]:
+    """
+    Stream a pace table as NDJSON or CSV, computing rows as they are sent.
+
+    The table is never materialized nor cached, so memory stays bounded for
+    fine-grained tables with many rows and distances.
+
+    Args:
+    min_pace (int): The minimum pace in seconds per kilometer.
+    max_pace (int): The maximum pace in seconds per kilometer.
+    increment (int): The increment in seconds per kilometer.
+    distances (list): A list of distances in meters
+    fmt (str): "ndjson" or "csv".
+
+    Returns:
+    Iterator[bytes]: The encoded chunks of the table.
+    """
+    if max_pace > min_pace:
+        raise HTTPException(
+            status_code=400, detail="Minimum pace must be more than maximum pace."
+        )
+    try:
+        rows = calculator.iter_pace_table(min_pace, max_pace, increment, distances)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    fieldnames = ["pace", "speed", *(str(d) for d in distances)]
+    return export.encode_rows(rows, fieldnames, fmt)
+
+
+def get_pace_table_with_athletes(
+    min_pace: int,
+    max_pace: int,
+    increment: int,
+    distances: list,
+    athletes_records: dict,
+) -> dict:
+    """
+    Get a pace table along with the position of each athlete's records in it.
+
+    Args:
+    min_pace (int): The minimum pace in seconds per kilometer.
+    max_pace (int): The maximum pace in seconds per kilometer.
+    increment (int): The increment in seconds per kilometer.
+    distances (list): A list of distances in meters
+    athletes_records (dict): Records of each athlete, keyed by athlete id.
+
+    Returns:
+    dict: The PaceTable under "table", and under "athletes" the list of
+    {distance, time, pace, row} matches of each athlete.
+    """
+    table = get_pace_table(min_pace, max_pace, increment, distances)
+    return {
+        "table": table,
+        "athletes": {
+            str(ident): calculator.locate_paces(
+                min_pace, max_pace, increment, distances, records
+            )
+            for ident, records in athletes_records.items()
+        },
+    }
+
+
+def _get_prerendered_manifest() -> Optional[dict]:
+    """
+    Get the manifest of the pre-rendered tables, reloaded when the file changes.
+
+    Returns:
+        dict: The manifest, or None if pre-rendered tables are disabled or missing.
+    """
+    global _prerendered_manifest
+
+    if not PRERENDERED_TABLES_DIR:
+        return None
+    try:
+        mtime = os.stat(
+            os.path.join(PRERENDERED_TABLES_DIR, prerender.MANIFEST_NAME)
+        ).st_mtime
+    except FileNotFoundError:
+        return None
+
+    if _prerendered_manifest[0] != mtime:
+        _prerendered_manifest = (mtime, prerender.load_manifest(PRERENDERED_TABLES_DIR))
+    return _prerendered_manifest[1]
+
+
+def find_prerendered_table(
+    min_pace: int, max_pace: int, increment: int, distances: list
+) -> Optional[str]:
+    """
+    Find the static file of a pre-rendered pace table.
+
+    Args:
+    min_pace (int): The minimum pace in seconds per kilometer.
+    max_pace (int): The maximum pace in seconds per kilometer.
+    increment (int): The increment in seconds per kilometer.
+    distances (list): A list of distances in meters
+
+    Returns:
+    str: The URL of the pre-rendered table, or None if it was not pre-rendered.
+    """
+    manifest = _get_prerendered_manifest()
+    if not manifest:
+        return None
+    table = manifest["tables"].get(
+        prerender.table_key(min_pace, max_pace, increment, distances)
+    )
+    if table is None:
+        return None
+    return f"{PRERENDERED_TABLES_URL}/{table['file']}"
+
+
+def read_prerendered_table(name: str) -> Optional[bytes]:
+    """
+    Read the gzip-compressed content of a pre-rendered table.
+
+    Args:
+    name (str): The file name, as listed in the manifest.
+
+    Returns:
+    bytes: The gzip-compressed JSON table, or None if the file is unknown.
+    """
+    manifest = _get_prerendered_manifest()
+    # Only names listed in the manifest are served (no path traversal)
+    if (
+        not PRERENDERED_TABLES_DIR
+        or not manifest
+        or not any(table["file"] == name for table in manifest["tables"].values())
+    ):
+        return None
+    with open(os.path.join(PRERENDERED_TABLES_DIR, f"{name}.gz"), "rb") as artifact:
+        return artifact.read()
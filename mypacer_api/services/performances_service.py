@@ -0,0 +1,146 @@
+"""
+This module contains the service functions for the performance history of athletes
+(the 'performances' table, filled when a record page is scraped).
+"""
+
+from typing import Dict, List, Optional
+
+import psycopg2
+from fastapi import HTTPException
+from psycopg2.extras import RealDictCursor, execute_values
+
+from mypacer_api.core import database
+from mypacer_api.core.results import Performance
+
+# Rows sent per INSERT statement by store_performances
+_INSERT_PAGE_SIZE = 500
+
+_INSERT_QUERY = """
+    INSERT INTO performances
+        (athlete_id, event, distance, seconds, perf_date, competition)
+    VALUES %s
+    """
+
+# First key of the advisory locks taken by store_performances (the second is the
+# athlete id), so that they do not collide with other advisory locks
+_ADVISORY_LOCK_NAMESPACE = 4201
+
+
+def store_performances(athlete_id, performances: List[Performance]):
+    """
+    Replace the stored performance history of an athlete.
+
+    The page lists the whole history, so the previous rows are deleted and the new
+    ones inserted in batches, in a single transaction. Concurrent scrapes of the same
+    athlete are serialized by a transaction-level advisory lock on its id, otherwise
+    both could delete before either inserts and the history would be stored twice.
+
+    Args:
+        athlete_id (str): The ID of the athlete.
+        performances (List[Performance]): The performances scraped from the record page.
+
+    Raises:
+        HTTPException: 500 on database errors.
+    """
+    conn = None
+    cursor = None
+
+    try:
+        # Get connection from pool
+        conn = database.get_connection()
+        cursor = conn.cursor()
+
+        # Released at commit or rollback
+        database.execute(
+            cursor,
+            "SELECT pg_advisory_xact_lock(%s, %s::integer)",
+            (_ADVISORY_LOCK_NAMESPACE, athlete_id),
+        )
+        database.execute(
+            cursor, "DELETE FROM performances WHERE athlete_id = %s", (athlete_id,)
+        )
+        with database.timed(_INSERT_QUERY):
+            execute_values(
+                cursor,
+                _INSERT_QUERY,
+                [(athlete_id, *performance) for performance in performances],
+                page_size=_INSERT_PAGE_SIZE,
+            )
+        conn.commit()
+
+    except psycopg2.Error as exc:
+        if conn:
+            conn.rollback()
+        raise HTTPException(
+            status_code=500, detail=f"Database error: {str(exc)}"
+        ) from exc
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            # Return connection to pool instead of closing it
+            database.release_connection(conn)
+
+
+def get_progression(
+    ident, distance: Optional[float] = None, season_best: bool = False
+) -> List[Dict]:
+    """
+    Get the stored performance history of an athlete.
+
+    Args:
+        ident (str): The ID of the athlete.
+        distance (float): Only return performances over this distance, in meters.
+        season_best (bool): Only return the best performance of each event per year.
+
+    Returns:
+        List[Dict]: The performances (event, distance, seconds, date, competition),
+        sorted by distance then date. Empty if the athlete page was never scraped.
+
+    Raises:
+        HTTPException: 500 on database errors.
+    """
+    conn = None
+    cursor = None
+
+    conditions = ["athlete_id = %s"]
+    params = [ident]
+    if distance is not None:
+        # distance is a REAL column: compare in single precision (1609.34)
+        conditions.append("distance = %s::real")
+        params.append(distance)
+
+    query = f"""
+    SELECT event, distance, seconds, perf_date AS date, competition
+    FROM performances
+    WHERE {" AND ".join(conditions)}
+    """
+    if season_best:
+        query = f"""
+        SELECT * FROM (
+            SELECT DISTINCT ON (event, date_part('year', perf_date))
+                event, distance, seconds, perf_date AS date, competition
+            FROM performances
+            WHERE {" AND ".join(conditions)}
+            ORDER BY event, date_part('year', perf_date), seconds
+        ) AS season_bests
+        """
+    query += " ORDER BY distance NULLS LAST, date NULLS LAST, seconds"
+
+    try:
+        # Get connection from pool
+        conn = database.get_connection("lookup")
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        database.execute(cursor, query, params)
+        return [dict(row) for row in cursor.fetchall()]
+
+    except psycopg2.Error as exc:
+        raise HTTPException(
+            status_code=500, detail=f"Database error: {str(exc)}"
+        ) from exc
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            # Return connection to pool instead of closing it
+            database.release_connection(conn)
@@ -0,0 +1,34 @@
+"""
+This module contains the prediction service, which predicts race times from records.
+"""
+
+from fastapi import HTTPException
+
+from mypacer_api.core import predictor
+
+
+def get_predictions(records: list, distances: list, model: str = "riegel") -> list:
+    """
+    Predict race times for every distance from one or many record sets.
+
+    Args:
+    records (list): Record sets, each mapping a distance in meters to a time in seconds.
+    distances (list): A list of distances in meters.
+    model (str): The prediction model ("riegel" or "vdot").
+
+    Returns:
+    list: For each record set, predicted times in seconds keyed by distance.
+
+    Raises:
+    HTTPException: 422 if a record time is not positive, 400 on invalid distances
+    or model, or when the prediction overflows.
+    """
+    if any(distance <= 0 for distance in distances):
+        raise HTTPException(status_code=400, detail="Distances must be positive.")
+    if any(time <= 0 for record_set in records for time in record_set.values()):
+        raise HTTPException(status_code=422, detail="Record times must be positive.")
+    try:
+        return predictor.predict_times(records, distances, model)
+    except (ValueError, ArithmeticError) as exc:
+        # ArithmeticError: ZeroDivisionError or OverflowError on extreme inputs
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
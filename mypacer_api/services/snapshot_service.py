@@ -0,0 +1,88 @@
+"""
+This module contains the snapshot service, which persists the warm state of the caches
+across restarts (see core.snapshot).
+"""
+
+import logging
+import threading
+from typing import Optional
+
+from mypacer_api.core import snapshot
+from mypacer_api.services import athletes_service, pace_table_service
+
+logger = logging.getLogger(__name__)
+
+_stop = threading.Event()
+_thread: Optional[threading.Thread] = None
+
+
+def save(path: Optional[str] = None) -> dict:
+    """
+    Write the pace table and records caches to the snapshot file.
+
+    Args:
+        path (str): The snapshot file (default: SNAPSHOT_PATH).
+
+    Returns:
+        dict: The number of tables and records written and the file size in bytes.
+
+    Raises:
+        ValueError: If no path is given and SNAPSHOT_PATH is not set.
+    """
+    path = path or snapshot.SNAPSHOT_PATH
+    if not path:
+        raise ValueError("No snapshot path: SNAPSHOT_PATH is not set.")
+    # Each worker writes a temporary file of its own, then atomically replaces the
+    # snapshot: concurrent workers never interleave their writes
+    return snapshot.write(
+        path,
+        # Copies: the caches keep changing while the file is written
+        pace_table_service.cache_items(),
+        athletes_service.copy_records_cache(),
+    )
+
+
+def _run_periodic():
+    """
+    Write a snapshot every SNAPSHOT_INTERVAL seconds until stopped.
+    """
+    while not _stop.wait(snapshot.SNAPSHOT_INTERVAL):
+        try:
+            save()
+        except Exception:
+            # Disk full, read-only or unexpected error: keep serving, retry later
+            logger.exception("Writing the cache snapshot failed")
+
+
+def start():
+    """
+    Load the previous snapshot (index only) and start the periodic snapshots.
+    Does nothing when SNAPSHOT_PATH is not set.
+    """
+    global _thread
+
+    if not snapshot.SNAPSHOT_PATH or _thread is not None:
+        return
+    snapshot.load(snapshot.SNAPSHOT_PATH)
+    _stop.clear()
+    _thread = threading.Thread(target=_run_periodic, name="snapshot", daemon=True)
+    _thread.start()
+
+
+def stop():
+    """
+    Stop the periodic snapshots and write a last one.
+    Called on application shutdown.
+    """
+    global _thread
+
+    if _thread is None:
+        return
+    _stop.set()
+    _thread.join()
+    _thread = None
+    try:
+        save()
+    except Exception:
+        # Never fail the application shutdown
+        logger.exception("Writing the cache snapshot failed")
@@ -0,0 +1,150 @@
+import asyncio
+import time
+
+import pytest
+import requests
+from fastapi import HTTPException
+
+from mypacer_api import main
+from mypacer_api.core.admission import CircuitBreaker, ConcurrencyLimiter
+from mypacer_api.services import athletes_service
+
+
+def test_concurrency_limiter_sheds_load():
+    """Test that requests beyond the concurrency and queue limits get a 503."""
+
+    async def scenario():
+        limiter = ConcurrencyLimiter(
+            max_concurrency=1, max_queue=1, queue_timeout=1, retry_after=3
+        )
+        release = asyncio.Event()
+
+        async def hold_slot():
+            async with limiter:
+                await release.wait()
+
+        holder = asyncio.create_task(hold_slot())
+        await asyncio.sleep(0)
+        queued = asyncio.create_task(hold_slot())
+        await asyncio.sleep(0)
+        assert (limiter.active, limiter.waiting) == (1, 1)
+
+        with pytest.raises(HTTPException) as excinfo:
+            await limiter.acquire()
+        assert excinfo.value.status_code == 503
+        assert excinfo.value.headers["Retry-After"] == "3"
+
+        release.set()
+        await asyncio.gather(holder, queued)
+        assert (limiter.active, limiter.waiting) == (0, 0)
+
+    asyncio.run(scenario())
+
+
+def test_concurrency_limiter_queue_timeout():
+    """Test that a queued request gives up after the queue timeout."""
+
+    async def scenario():
+        limiter = ConcurrencyLimiter(max_concurrency=1, max_queue=5, queue_timeout=0.01)
+        await limiter.acquire()
+        with pytest.raises(HTTPException) as excinfo:
+            await limiter.acquire()
+        assert excinfo.value.status_code == 503
+        assert limiter.waiting == 0
+        limiter.release()
+        assert limiter.active == 0
+
+    asyncio.run(scenario())
+
+
+def test_circuit_breaker(mocker):
+    """Test the closed -> open -> half-open -> closed transitions."""
+    clock = mocker.patch("mypacer_api.core.admission.time.monotonic", return_value=0)
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+
+    breaker.record_failure()
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow_request()
+    assert breaker.retry_after() == 30
+
+    clock.return_value = 31
+    assert breaker.state == "half-open"
+    assert breaker.allow_request()
+    # Only one trial request at a time
+    assert not breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    clock.return_value = 62
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_get_athlete_records_serves_cache_when_upstream_fails(mocker):
+    """Test that failing upstream calls fall back to cached records, then open the circuit."""
+    mocker.patch.object(
+        athletes_service,
+        "records_breaker",
+        CircuitBreaker(failure_threshold=1, reset_timeout=30),
+    )
+    mocker.patch.object(athletes_service, "_records_cache", {"42": (0, {800: 120.5})})
+    mocker.patch.object(athletes_service, "_get_athlete_url", return_value="http://x")
+    scrap = mocker.patch(
+        "mypacer_api.core.scrapper.scrap_athlete_page",
+        side_effect=requests.Timeout(),
+    )
+
+    assert athletes_service.get_athlete_records("42") == {800: 120.5}
+    assert athletes_service.records_breaker.state == "open"
+
+    # Circuit open: stale records served without calling the website
+    assert athletes_service.get_athlete_records(42) == {800: 120.5}
+    assert scrap.call_count == 1
+
+    # Circuit open and nothing cached: 503 with Retry-After
+    with pytest.raises(HTTPException) as excinfo:
+        athletes_service.get_athlete_records("43")
+    assert excinfo.value.status_code == 503
+    assert "Retry-After" in excinfo.value.headers
+
+
+def test_unexpected_scrape_error_ends_half_open_trial(mocker):
+    """Test that an unexpected error during the trial call re-opens the circuit."""
+    clock = mocker.patch("mypacer_api.core.admission.time.monotonic", return_value=0)
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    mocker.patch.object(athletes_service, "records_breaker", breaker)
+    mocker.patch.object(athletes_service, "_records_cache", {})
+    mocker.patch("mypacer_api.core.snapshot.get_records", return_value=None)
+    mocker.patch.object(athletes_service, "_get_athlete_url", return_value="http://x")
+    scrap = mocker.patch(
+        "mypacer_api.core.scrapper.scrap_athlete_page",
+        side_effect=ValueError("unexpected page layout"),
+    )
+    breaker.record_failure()
+
+    clock.return_value = 31
+    with pytest.raises(ValueError):
+        athletes_service.get_athlete_records("42")
+    assert breaker.state == "open"
+
+    # The next trial is allowed once the reset timeout has elapsed again
+    clock.return_value = 62
+    scrap.side_effect = None
+    scrap.return_value = ({800: 120.5}, [])
+    mocker.patch.object(athletes_service.performances_service, "store_performances")
+    assert athletes_service.get_athlete_records("42") == {800: 120.5}
+    assert breaker.state == "closed"
+
+
+def test_cached_records_skip_the_limiter(mocker):
+    """Test that fresh cached records are served without taking a limiter slot."""
+    mocker.patch.object(
+        athletes_service, "_records_cache", {"42": (time.time(), {800: 120.5})}
+    )
+    acquire = mocker.patch.object(main.records_limiter, "acquire")
+
+    assert asyncio.run(main._fetch_athlete_records("42")) == {800: 120.5}
+    assert not acquire.called
@@ -0,0 +1,239 @@
+import threading
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from psycopg2.errors import QueryCanceled
+
+from mypacer_api.core import database, search_cache
+from mypacer_api.core.results import AthleteHit
+from mypacer_api.main import app
+from mypacer_api.services import athletes_service
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def cursor(mocker):
+    """Mock the pool connection and return its cursor."""
+    search_cache.invalidate()
+    conn = mocker.MagicMock()
+    mocker.patch("mypacer_api.core.database.get_connection", return_value=conn)
+    mocker.patch("mypacer_api.core.database.release_connection")
+    mocker.patch(
+        "mypacer_api.services.database_service.get_data_generation", return_value=1
+    )
+    yield conn.cursor.return_value
+    search_cache.invalidate()
+
+
+def test_parse_fields():
+    """Test that requested fields are validated, ordered, and always include id."""
+    assert athletes_service.parse_fields(None) is None
+    assert athletes_service.parse_fields("birth_date, name") == (
+        "id",
+        "name",
+        "birth_date",
+    )
+    with pytest.raises(HTTPException) as excinfo:
+        athletes_service.parse_fields("name,password")
+    assert excinfo.value.status_code == 400
+
+
+def test_projection_and_filters_narrow_the_query(cursor):
+    """Test that fields narrow the select list and filters are added to the search."""
+    cursor.fetchall.return_value = [(7, "DUPONT Jeanne", "07/01/1993", 0.8)]
+
+    hits = athletes_service.get_athletes_from_db(
+        "dupont",
+        fields=("id", "birth_date"),
+        sexe="F",
+        birth_year_min=1990,
+        birth_year_max=1995,
+    )
+
+    query, params = cursor.execute.call_args.args
+    assert "SELECT id, name, birth_date," in query
+    assert "url" not in query
+    assert "sexe = %s" in query
+    assert "right(birth_date, 4) BETWEEN %s AND %s" in query
+    assert params == ["dupont", "%dupont%", "F", "1990", "1995", 25, 0]
+    assert hits == [
+        AthleteHit(id=7, name="DUPONT Jeanne", birth_date="07/01/1993", score=0.8)
+    ]
+
+
+def test_knn_filter_params_order(cursor):
+    """Test that filter params are placed between the KNN search params."""
+    cursor.fetchall.return_value = []
+    athletes_service.get_athletes_from_db("dupont", mode="knn", birth_year_max=1960)
+
+    query, params = cursor.execute.call_args.args
+    assert "<% normalized_name AND birth_date IS NOT NULL" in query.replace("%%", "%")
+    assert params == ["dupont", "dupont", "0000", "1960", "dupont", 25, 0]
+
+
+def test_cache_key_includes_fields_and_filters(cursor):
+    """Test that searches with other fields or filters are not served from cache."""
+    cursor.fetchall.return_value = []
+    athletes_service.get_athletes_from_db("dupont")
+    athletes_service.get_athletes_from_db("dupont")
+    assert cursor.fetchall.call_count == 1
+
+    athletes_service.get_athletes_from_db("dupont", sexe="M")
+    athletes_service.get_athletes_from_db("dupont", fields=("id", "name"))
+    assert cursor.fetchall.call_count == 3
+
+
+def test_get_athletes_returns_requested_fields(mocker):
+    """Test that /get_athletes only returns the requested fields."""
+    search = mocker.patch(
+        "mypacer_api.services.athletes_service.get_athletes_from_db",
+        return_value=[AthleteHit(id=7, name="DUPONT Jeanne", birth_date="1993")],
+    )
+
+    response = client.get("/get_athletes?name=dupont&fields=name,birth_date&sexe=F")
+    assert response.status_code == 200
+    assert response.json() == [{"id": 7, "name": "DUPONT Jeanne", "birth_date": "1993"}]
+    assert search.call_args.kwargs["fields"] == ("id", "name", "birth_date")
+    assert search.call_args.kwargs["sexe"] == "F"
+
+    assert client.get("/get_athletes?name=dupont&fields=secret").status_code == 400
+    assert client.get("/get_athletes?name=dupont&sexe=X").status_code == 422
+
+
+def test_newer_session_query_cancels_previous(mocker):
+    """Test that a new search of a session cancels the query still running."""
+    mocker.patch.object(database, "_session_queries", {})
+    first_conn, second_conn = mocker.MagicMock(), mocker.MagicMock()
+
+    first = database.start_session_query("box-1")
+    assert database.attach_session_query(*first, first_conn)
+    other = database.start_session_query("box-2")
+    second = database.start_session_query("box-1")
+    # The connection goes back to the pool only once the cancel has been sent
+    database.detach_session_query(*first)
+    first_conn.cancel.assert_called_once()
+
+    # A superseded query that has not started yet is not run
+    assert not database.attach_session_query(*first, second_conn)
+    assert database.attach_session_query(*second, second_conn)
+    database.end_session_query(*first)
+    assert database._session_queries["box-1"] == [second[1], second_conn]
+
+    database.end_session_query(*second)
+    database.end_session_query(*other)
+    assert database._session_queries == {}
+    second_conn.cancel.assert_not_called()
+    assert database._session_cancels == {}
+
+
+def test_cancel_is_sent_off_the_caller(mocker):
+    """Test that a slow cancel blocks neither the new search nor the registry."""
+    mocker.patch.object(database, "_session_queries", {})
+    sent = threading.Event()
+    conn = mocker.MagicMock()
+    conn.cancel.side_effect = lambda: sent.wait(5)
+
+    first = database.start_session_query("box-1")
+    database.attach_session_query(*first, conn)
+    second = database.start_session_query("box-1")
+    assert database.is_latest_session_query(*second)
+
+    detach = threading.Thread(target=database.detach_session_query, args=first)
+    detach.start()
+    detach.join(0.1)
+    # Still waiting for the cancel before the connection can be released
+    assert detach.is_alive()
+    sent.set()
+    detach.join(5)
+    assert not detach.is_alive()
+    database.end_session_query(*second)
+
+
+def test_released_connection_is_not_cancelled(cursor, mocker):
+    """Test that a finished search detaches its connection before releasing it."""
+    mocker.patch.object(database, "_session_queries", {})
+    conn = database.get_connection.return_value
+    cursor.fetchall.return_value = []
+    session = database.start_session_query("box-1")
+
+    athletes_service.get_athletes_from_db("dupont", search_session=session)
+    # Not ended yet (the endpoint ends it), but the connection is back in the pool
+    assert database._session_queries["box-1"] == [session[1], None]
+
+    database.start_session_query("box-1")
+    conn.cancel.assert_not_called()
+
+
+def test_cancelled_search_is_superseded(cursor, mocker):
+    """Test that a search cancelled by a newer one answers 409 and is not cached."""
+    mocker.patch.object(database, "_session_queries", {})
+
+    def newer_search(*args):
+        database.start_session_query("box-1")
+        raise QueryCanceled()
+
+    cursor.execute.side_effect = newer_search
+    session = database.start_session_query("box-1")
+
+    with pytest.raises(HTTPException) as excinfo:
+        athletes_service.get_athletes_from_db("dupont", search_session=session)
+    assert excinfo.value.status_code == 409
+
+    # Superseded before reaching the database: not run
+    session = database.start_session_query("box-1")
+    database.start_session_query("box-1")
+    with pytest.raises(HTTPException) as excinfo:
+        athletes_service.get_athletes_from_db("dupont", search_session=session)
+    assert excinfo.value.status_code == 409
+    cursor.execute.assert_called_once()
+
+
+def test_search_statement_timeout(cursor):
+    """Test that a search cancelled by the statement timeout answers 503."""
+    cursor.execute.side_effect = QueryCanceled()
+    with pytest.raises(HTTPException) as excinfo:
+        athletes_service.get_athletes_from_db("dupont")
+    assert excinfo.value.status_code == 503
+
+
+def test_short_queries_use_prefix_plan(cursor):
+    """Test that queries of short words only search name prefixes."""
+    cursor.fetchall.return_value = []
+    athletes_service.get_athletes_from_db("D_", fields=("id", "name"))
+
+    query, params = cursor.execute.call_args.args
+    assert 'normalized_name COLLATE "C" LIKE %s' in query
+    assert "ILIKE" not in query
+    assert params == ["d_", "d\\_%", 25, 0]
+
+    # Mixed query: the short word is a filter, only "pont" is searched in the index
+    athletes_service.get_athletes_from_db("du pont", fields=("id", "name"))
+    query, params = cursor.execute.call_args.args
+    assert query.count("ILIKE") == 1
+    assert "strpos(normalized_name, %s) > 0" in query
+    assert params[1:3] == ["du", "%pont%"]
+
+
+def test_get_athletes_search_session_header(mocker):
+    """Test that X-Search-Session gives each search a ticket, released afterwards."""
+    mocker.patch.object(database, "_session_queries", {})
+    search = mocker.patch(
+        "mypacer_api.services.athletes_service.get_athletes_from_db",
+        return_value=[],
+    )
+
+    session_id = str(uuid.uuid4())
+    response = client.get(
+        "/get_athletes?name=dup", headers={"X-Search-Session": session_id}
+    )
+    assert response.status_code == 200
+    session, ticket = search.call_args.kwargs["search_session"]
+    assert session == session_id and ticket > 0
+    assert database._session_queries == {}
+
+    # Guessable ids are rejected: the UUID is the only scope of a session
+    response = client.get("/get_athletes?name=dup", headers={"X-Search-Session": "s1"})
+    assert response.status_code == 422
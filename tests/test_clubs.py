@@ -0,0 +1,114 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from mypacer_api.core import search_cache
+from mypacer_api.core.results import AthleteHit, ClubHit, encode_cursor
+from mypacer_api.main import app
+from mypacer_api.services import athletes_service, clubs_service
+
+client = TestClient(app)
+
+CLUBS = [
+    (1, "093007", "CA MONTREUIL 93", 2004, 2024, None, 0.5),
+    (2, "091013", "ATHLE 91", 2004, 2024, None, 0.25),
+    (3, "080004", "AMIENS UC", 2004, 2024, None, 0.25),
+]
+
+
+@pytest.fixture
+def cursor(mocker):
+    """Mock the pool connection and return its cursor."""
+    search_cache.invalidate()
+    conn = mocker.MagicMock()
+    mocker.patch("mypacer_api.core.database.get_connection", return_value=conn)
+    mocker.patch("mypacer_api.core.database.release_connection")
+    mocker.patch(
+        "mypacer_api.services.database_service.get_data_generation", return_value=1
+    )
+    yield conn.cursor.return_value
+    search_cache.invalidate()
+
+
+def test_search_clubs_keyset_pagination(cursor):
+    """Test that a full page returns a cursor and the next page starts after it."""
+    cursor.fetchall.return_value = CLUBS
+
+    clubs, next_cursor = clubs_service.search_clubs("Athlé", limit=2, season=2024)
+    assert clubs == [ClubHit(*row) for row in CLUBS[:2]]
+    assert next_cursor == encode_cursor((0.25, "ATHLE 91", 2))
+    query, params = cursor.execute.call_args.args
+    assert "normalized_name ILIKE %s" in query
+    assert "first_year <= %s AND last_year >= %s" in query
+    assert params == ["athle", "%athle%", 2024, 2024, 3]
+
+    cursor.fetchall.return_value = CLUBS[2:]
+    clubs, next_cursor = clubs_service.search_clubs(
+        "athle", limit=2, cursor=next_cursor
+    )
+    assert clubs == [ClubHit(*CLUBS[2])] and next_cursor is None
+    query, params = cursor.execute.call_args.args
+    assert "score < %s::real" in query
+    assert params == ["athle", "%athle%", 0.25, 0.25, "ATHLE 91", 2, 3]
+
+    # Same page again: served from the cache
+    clubs_service.search_clubs(
+        "athle", limit=2, cursor=encode_cursor((0.25, "ATHLE 91", 2))
+    )
+    assert cursor.execute.call_count == 2
+
+
+def test_club_roster_query(cursor):
+    """Test that a roster is read by club and season, ordered by name."""
+    cursor.fetchall.return_value = [(7, "DUPONT Jeanne", None)]
+
+    athletes, next_cursor = athletes_service.get_club_roster(
+        12,
+        fields=("id", "name"),
+        sexe="F",
+        cursor=encode_cursor(("DUBOIS Anne", 5)),
+    )
+    assert athletes == [AthleteHit(id=7, name="DUPONT Jeanne")]
+    assert next_cursor is None
+    query, params = cursor.execute.call_args.args
+    assert "SELECT id, name, NULL::real AS score" in query
+    assert "(SELECT MAX(season) FROM athlete_clubs WHERE club_id = %s)" in query
+    assert "AND sexe = %s AND (name, id) > (%s, %s)" in query
+    assert params == [12, None, 12, "F", "DUBOIS Anne", 5, 101]
+
+
+def test_club_endpoints(mocker):
+    """Test the /get_clubs and /get_club_roster responses and their validation."""
+    mocker.patch.object(
+        clubs_service,
+        "search_clubs",
+        return_value=([ClubHit(*CLUBS[0])], "next"),
+    )
+    roster = mocker.patch.object(
+        athletes_service,
+        "get_club_roster",
+        return_value=([AthleteHit(id=7, name="DUPONT Jeanne")], None),
+    )
+
+    response = client.get("/get_clubs?name=montreuil&fields=name")
+    assert response.status_code == 200
+    assert response.json() == {
+        "items": [{"id": 1, "name": "CA MONTREUIL 93"}],
+        "next_cursor": "next",
+    }
+
+    response = client.get("/get_club_roster?club_id=1&season=2024&fields=name")
+    assert response.json() == {
+        "items": [{"id": 7, "name": "DUPONT Jeanne"}],
+        "next_cursor": None,
+    }
+    assert roster.call_args.kwargs["season"] == 2024
+    assert roster.call_args.kwargs["fields"] == ("id", "name")
+
+    assert client.get("/get_clubs?name=a&fields=birth_date").status_code == 400
+
+
+def test_invalid_cursor(cursor):
+    """Test that a malformed cursor is rejected before querying the database."""
+    response = client.get("/get_club_roster?club_id=1&cursor=bogus")
+    assert response.status_code == 400
+    cursor.execute.assert_not_called()
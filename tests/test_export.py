@@ -0,0 +1,22 @@
+import json
+
+from mypacer_api.core import export
+
+
+def test_iter_ndjson_chunks(mocker):
+    """Test that NDJSON is produced in chunks of about CHUNK_SIZE bytes."""
+    mocker.patch.object(export, "CHUNK_SIZE", 100)
+    rows = ({"id": i, "name": f"Athlete {i}"} for i in range(50))
+
+    chunks = list(export.iter_ndjson(rows))
+    assert len(chunks) > 1
+    assert all(len(chunk) < 200 for chunk in chunks)
+    lines = b"".join(chunks).decode().splitlines()
+    assert [json.loads(line)["id"] for line in lines] == list(range(50))
+
+
+def test_iter_csv():
+    """Test that CSV has a header line and ignores extra keys."""
+    rows = [{"pace": 300, "speed": 12.0, "1000": 300.0, "extra": 1}]
+    content = b"".join(export.iter_csv(rows, ["pace", "speed", "1000"])).decode()
+    assert content.splitlines() == ["pace,speed,1000", "300,12.0,300.0"]
@@ -0,0 +1,115 @@
+from fastapi.testclient import TestClient
+
+from mypacer_api.core.http_cache import accepts_encoding
+from mypacer_api.core.results import AthleteHit
+from mypacer_api.main import app
+
+client = TestClient(app)
+
+
+def test_versioned_route_answers_304_without_running_endpoint(mocker):
+    """Test that a search revalidation is answered from the athletes table version."""
+    mocker.patch(
+        "mypacer_api.services.database_service.get_athletes_last_update",
+        return_value=1700000000.0,
+    )
+    mock_search = mocker.patch(
+        "mypacer_api.services.athletes_service.get_athletes_from_db",
+        return_value=[AthleteHit(id=1, name="DUPONT Jean")],
+    )
+
+    response = client.get("/get_athletes?name=dupont")
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "public, max-age=60"
+    assert response.headers["last-modified"] == "Tue, 14 Nov 2023 22:13:20 GMT"
+    etag = response.headers["etag"]
+    assert etag.startswith('W/"')
+
+    response = client.get("/get_athletes?name=dupont", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+
+    response = client.get(
+        "/get_athletes?name=dupont",
+        headers={"If-Modified-Since": "Tue, 14 Nov 2023 22:13:20 GMT"},
+    )
+    assert response.status_code == 304
+    assert mock_search.call_count == 1
+
+    # The athletes table was refreshed: new representation
+    mocker.patch(
+        "mypacer_api.services.database_service.get_athletes_last_update",
+        return_value=1700000100.0,
+    )
+    response = client.get("/get_athletes?name=dupont", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_unversioned_route_uses_body_etag(mocker):
+    """Test that routes without a known version get a strong ETag from the body."""
+    status = mocker.patch(
+        "mypacer_api.services.database_service.get_database_status",
+        return_value={"num_clubs": 10, "num_athletes": 100, "last_update": None},
+    )
+
+    response = client.get("/database_status")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert etag.startswith('"')
+    assert "last-modified" not in response.headers
+
+    response = client.get("/database_status", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    # New clubs without any athlete change: the status is not reported unchanged
+    status.return_value = {"num_clubs": 11, "num_athletes": 100, "last_update": None}
+    response = client.get("/database_status", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_records_etag_follows_fetch_time(mocker):
+    """Test that athlete records are validated by the time they were fetched."""
+    fetched_at = mocker.patch(
+        "mypacer_api.services.athletes_service.get_records_fetched_at",
+        side_effect=[None, 1700000000.0, 1700000000.0],
+    )
+    mocker.patch(
+        "mypacer_api.services.athletes_service.get_athlete_records",
+        return_value={"800": 120.5},
+    )
+
+    # Not cached before the call, cached once the records have been fetched
+    response = client.get("/get_athlete_records?ident=42")
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "public, max-age=3600"
+    etag = response.headers["etag"]
+    assert etag.startswith('W/"')
+
+    response = client.get(
+        "/get_athlete_records?ident=42", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    fetched_at.assert_called_with("42")
+
+
+def test_post_routes_are_not_cached():
+    """Test that POST routes get no caching headers."""
+    payload = {"min_pace": 300, "max_pace": 240, "increment": 10}
+    response = client.post("/generate_table", json=payload)
+    assert response.status_code == 200
+    assert "etag" not in response.headers
+
+
+def test_accepts_encoding():
+    """Test Accept-Encoding parsing, with q-values and wildcards."""
+    assert accepts_encoding("gzip, deflate, br", "gzip")
+    assert accepts_encoding("br;q=1.0, gzip;q=0.5", "gzip")
+    assert accepts_encoding("*", "gzip")
+    assert not accepts_encoding("gzip;q=0", "gzip")
+    assert not accepts_encoding("*, gzip;q=0", "gzip")
+    assert not accepts_encoding("x-gzip-like, br", "gzip")
+    assert not accepts_encoding("identity", "gzip")
+    assert not accepts_encoding(None, "gzip")
@@ -0,0 +1,74 @@
+import io
+
+import pytest
+
+from mypacer_api.core import ingestion
+
+ATHLETES_CSV = """ffa_id,license_id,name,url,birth_date,sexe,nationality
+47523,273457,ZIPPER Rene,,1934,M,FRA
+29281,347866,LAMRANI Hacene,,1943,M,FRA
+"""
+
+
+@pytest.fixture
+def mock_connection(mocker):
+    """Mock the connection pool and return the mocked connection."""
+    conn = mocker.Mock()
+    mocker.patch("mypacer_api.core.database.get_connection", return_value=conn)
+    mocker.patch("mypacer_api.core.database.release_connection")
+    return conn
+
+
+def test_ingest_athletes(mock_connection):
+    """Test that athletes are copied into staging, merged and the generation bumped."""
+    cursor = mock_connection.cursor.return_value
+    cursor.rowcount = 2
+    source = io.StringIO(ATHLETES_CSV)
+    report = ingestion.ingest("athletes", source)
+
+    copy_sql, copy_source = cursor.copy_expert.call_args.args
+    assert copy_sql.startswith("COPY athletes_staging (ffa_id, license_id, name,")
+    assert copy_source is source
+
+    executed = [call.args[0] for call in cursor.execute.call_args_list]
+    assert executed[0].startswith(
+        "CREATE UNLOGGED TABLE IF NOT EXISTS athletes_staging"
+    )
+    assert any("ON CONFLICT (ffa_id) DO UPDATE" in sql for sql in executed)
+    assert "UPDATE data_generation SET generation = generation + 1" in executed
+    assert executed[-1] == "ANALYZE athletes"
+
+    assert mock_connection.commit.called
+    assert report["table"] == "athletes"
+    assert report["rows_loaded"] == 2
+    assert report["rows_merged"] == 2
+    assert report["rows_per_second"] > 0
+
+
+def test_ingest_memberships(mock_connection):
+    """Test that memberships are resolved to athlete and club ids by FFA id."""
+    cursor = mock_connection.cursor.return_value
+    cursor.rowcount = 0
+
+    ingestion.ingest(
+        "athlete_clubs",
+        io.StringIO("athlete_ffa_id,club_ffa_id,season\n47523,093007,2024\n"),
+    )
+
+    copy_sql = cursor.copy_expert.call_args.args[0]
+    assert copy_sql.startswith(
+        "COPY athlete_clubs_staging (athlete_ffa_id, club_ffa_id, season)"
+    )
+    executed = [call.args[0] for call in cursor.execute.call_args_list]
+    merge = next(sql for sql in executed if "INSERT INTO athlete_clubs" in sql)
+    assert "JOIN clubs c ON c.ffa_id = s.club_ffa_id" in merge
+    assert "ON CONFLICT DO NOTHING" in merge
+    assert executed[-1] == "ANALYZE athlete_clubs"
+    # Nothing changed: cached results stay valid
+    assert not any("data_generation" in sql for sql in executed)
+
+
+def test_ingest_unknown_table():
+    """Test that ingest rejects tables without a staging definition."""
+    with pytest.raises(ValueError, match="Unknown table"):
+        ingestion.ingest("performances", io.StringIO(""))
@@ -1,5 +1,12 @@
+import asyncio
+
+import pytest
 from fastapi.testclient import TestClient
+from starlette.requests import ClientDisconnect
 
+from mypacer_api import main
+from mypacer_api.core.admission import ConcurrencyLimiter
+from mypacer_api.core.results import AthleteHit
 from mypacer_api.main import app
 
 client = TestClient(app)
@@ -32,9 +39,27 @@ def test_generate_table_invalid_pace_range():
     assert "Minimum pace must be more than maximum pace" in response.json()["detail"]
 
 
+def test_generate_table_rejects_non_positive_parameters(mocker):
+    """Test that /generate_table validates every parameter before any I/O."""
+    find_prerendered = mocker.patch(
+        "mypacer_api.services.pace_table_service.find_prerendered_table"
+    )
+    for invalid in (
+        {"increment": 0},
+        {"increment": -5},
+        {"min_pace": 0, "max_pace": 0},
+        {"distances": [1000, -400]},
+        {"distances": [1000] * 51},
+    ):
+        payload = {"min_pace": 300, "max_pace": 240, "increment": 10, **invalid}
+        response = client.post("/generate_table", json=payload)
+        assert response.status_code == 422, invalid
+    assert not find_prerendered.called
+
+
 def test_get_athletes_from_db(mocker):
     """Test the /get_athletes_from_db endpoint, mocking the service layer."""
-    mock_data = [{"id": "123", "name": "Test Athlete"}]
+    mock_data = [AthleteHit(id=123, name="Test Athlete", score=0.5)]
     mocker.patch(
         "mypacer_api.services.athletes_service.get_athletes_from_db",
         return_value=mock_data,
@@ -42,7 +67,8 @@ def test_get_athletes_from_db(mocker):
 
     response = client.get("/get_athletes_from_db?name=test")
     assert response.status_code == 200
-    assert response.json() == mock_data
+    assert response.json() == [mock_data[0]._asdict()]
+    assert response.json()[0]["name"] == "Test Athlete"
 
 
 def test_get_athlete_records(mocker):
@@ -68,3 +94,161 @@ def test_database_status(mocker):
     response = client.get("/database_status")
     assert response.status_code == 200
     assert response.json() == mock_data
+
+
+def test_get_athletes_knn_mode(mocker):
+    """Test that /get_athletes forwards the search mode to the service layer."""
+    mock_search = mocker.patch(
+        "mypacer_api.services.athletes_service.get_athletes_from_db",
+        return_value=[],
+    )
+
+    response = client.get("/get_athletes?name=marten&mode=knn")
+    assert response.status_code == 200
+    mock_search.assert_called_once_with(
+        "marten",
+        limit=25,
+        offset=0,
+        mode="knn",
+        fields=None,
+        sexe=None,
+        birth_year_min=None,
+        birth_year_max=None,
+        search_session=None,
+    )
+
+    response = client.get("/get_athletes?name=marten&mode=unknown")
+    assert response.status_code == 422
+
+
+def test_generate_table_with_athletes(mocker):
+    """Test that /generate_table overlays athlete records on the table rows."""
+    mock_records = mocker.patch(
+        "mypacer_api.services.athletes_service.get_athlete_records",
+        return_value={800: 143.17, 5000: 1138},
+    )
+    payload = {
+        "min_pace": 300,
+        "max_pace": 180,
+        "increment": 10,
+        "distances": [800, 5000],
+        "athlete_ids": [7, 7, 8],
+    }
+    response = client.post("/generate_table", json=payload)
+    assert response.status_code == 200
+    data = response.json()
+
+    assert len(data["table"]) == 13
+    assert set(data["athletes"]) == {"7", "8"}
+    assert mock_records.call_count == 2
+    assert data["athletes"]["7"] == [
+        {"distance": 800, "time": 143.17, "pace": 178.96, "row": 12},
+        {"distance": 5000, "time": 1138, "pace": 227.6, "row": 7},
+    ]
+
+
+def test_predict_times(mocker):
+    """Test the /predict_times endpoint with record sets and athlete ids."""
+    mocker.patch(
+        "mypacer_api.services.athletes_service.get_athlete_records",
+        return_value={5000: 1197},
+    )
+    payload = {
+        "records": [{"5000": 1200}],
+        "athlete_ids": [7],
+        "distances": [5000, 10000],
+        "model": "vdot",
+    }
+    response = client.post("/predict_times", json=payload)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["predictions"][0]["5000"] == 1200
+    assert data["athletes"]["7"]["5000"] == 1197
+    assert data["athletes"]["7"]["10000"] == pytest.approx(2481.65, abs=0.1)
+
+    for distances in ([0], ["a"], [None], [5000] * 51):
+        payload["distances"] = distances
+        assert client.post("/predict_times", json=payload).status_code == 422
+
+
+def test_predict_times_rejects_invalid_records():
+    """Test that non-positive record times get a 422 and overflows a 400."""
+    for time in (0, -1200):
+        payload = {"records": [{"5000": time}], "distances": [5000, 10000]}
+        assert client.post("/predict_times", json=payload).status_code == 422
+
+    payload = {"records": [{"5000": 1e-300}], "distances": [5000, 10000]}
+    payload["model"] = "vdot"
+    assert client.post("/predict_times", json=payload).status_code == 400
+
+
+def test_generate_table_streaming():
+    """Test that /generate_table streams NDJSON and CSV rows."""
+    payload = {"min_pace": 300, "max_pace": 240, "increment": 10, "distances": [1000]}
+
+    response = client.post("/generate_table?format=ndjson", json=payload)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = response.text.splitlines()
+    assert len(lines) == 7
+    assert lines[0] == '{"pace":300,"speed":12.0,"1000":300.0}'
+
+    response = client.post("/generate_table?format=csv", json=payload)
+    assert response.status_code == 200
+    assert response.text.splitlines()[:2] == ["pace,speed,1000", "300,12.0,300.0"]
+
+    payload["athlete_ids"] = [7]
+    response = client.post("/generate_table?format=csv", json=payload)
+    assert response.status_code == 400
+
+
+def test_export_athletes(mocker):
+    """Test the /get_athletes/export endpoint, mocking the service layer."""
+    mock_stream = mocker.patch(
+        "mypacer_api.services.athletes_service.stream_athletes",
+        return_value=(chunk for chunk in [b'{"id":1}\n', b'{"id":2}\n']),
+    )
+    response = client.get("/get_athletes/export?name=martin&format=ndjson&limit=10")
+    assert response.status_code == 200
+    assert response.text == '{"id":1}\n{"id":2}\n'
+    mock_stream.assert_called_once_with("martin", "ilike", "ndjson", 10)
+    # The export slot is given back once the response has been sent
+    assert main.export_limiter.active == 0
+
+    response = client.get("/get_athletes/export?name=martin&limit=0")
+    assert response.status_code == 422
+
+
+def test_abandoned_export_releases_its_slot(mocker):
+    """Test that an export is cleaned up when the client goes away before the body."""
+    chunks = mocker.MagicMock()
+    limiter = ConcurrencyLimiter(max_concurrency=1, max_queue=0, queue_timeout=1)
+
+    async def send(message):
+        raise OSError("client went away")
+
+    async def run():
+        await limiter.acquire()
+        response = main._ExportResponse(chunks, limiter, "application/x-ndjson")
+        scope = {"type": "http", "asgi": {"spec_version": "2.4"}}
+        with pytest.raises(ClientDisconnect):
+            await response(scope, mocker.AsyncMock(), send)
+
+    asyncio.run(run())
+    chunks.close.assert_called_once()
+    assert limiter.active == 0
+
+
+def test_export_athletes_is_limited(mocker):
+    """Test that exports beyond the limiter queue are rejected with a 503."""
+    mocker.patch.object(
+        main,
+        "export_limiter",
+        ConcurrencyLimiter(max_concurrency=0, max_queue=0, queue_timeout=1),
+    )
+    stream = mocker.patch("mypacer_api.services.athletes_service.stream_athletes")
+
+    response = client.get("/get_athletes/export?name=martin")
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+    assert not stream.called
@@ -1,7 +1,10 @@
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 
-from mypacer_api.core.calculator import calculate_pace_table
+from mypacer_api.core.calculator import calculate_pace_table, locate_paces
 from mypacer_api.models import OFFICIAL_DISTANCES
+from mypacer_api.services import pace_table_service
 
 
 def test_calculate_pace_table():
@@ -54,3 +57,38 @@ def test_calculate_pace_table_errors():
         calculate_pace_table(600, 180, 0, [])
     with pytest.raises(ValueError, match="Increment must be positive"):
         calculate_pace_table(600, 180, -2, [])
+
+
+def test_locate_paces():
+    """Test that records are matched to the closest row of the pace table."""
+    records = {800: 143.17, 1000: 188.02, 5000: 1138, 10000: 2403, 42195: 20000}
+    distances = [400, 800, 5000, 10000, 42195]
+    table = calculate_pace_table(240, 170, 5, distances)
+
+    matches = {m["distance"]: m for m in locate_paces(240, 170, 5, distances, records)}
+
+    # 1000m is not a table distance, 400m has no record
+    assert set(matches) == {800, 5000, 10000, 42195}
+    assert matches[800] == {"distance": 800, "time": 143.17, "pace": 178.96, "row": 12}
+    assert table[12]["pace"] == 180
+    assert matches[5000]["pace"] == 227.6
+    assert table[matches[5000]["row"]]["pace"] == 230
+    assert matches[10000]["row"] == 0
+    # 474 s/km is slower than the slowest row of the table
+    assert matches[42195]["row"] is None
+
+
+def test_pace_table_cache_is_thread_safe(mocker):
+    """Test that tables computed from concurrent threads keep the cache bounded."""
+    mocker.patch.object(pace_table_service, "_pace_table_cache", {})
+    mocker.patch.object(pace_table_service, "_MAX_CACHE_SIZE", 5)
+    mocker.patch("mypacer_api.core.snapshot.get_pace_table", return_value=None)
+
+    def get_table(increment):
+        return pace_table_service.get_pace_table(300, 240, increment % 20 + 1, [1000])
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        tables = list(executor.map(get_table, range(400)))
+
+    assert all(table is not None for table in tables)
+    assert len(pace_table_service._pace_table_cache) <= 5
@@ -0,0 +1,80 @@
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+
+from mypacer_api.core.results import Performance, RecordSet
+from mypacer_api.main import app
+from mypacer_api.services import athletes_service, performances_service
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def conn(mocker):
+    """Mock the pool connection."""
+    conn = mocker.MagicMock()
+    mocker.patch("mypacer_api.core.database.get_connection", return_value=conn)
+    mocker.patch("mypacer_api.core.database.release_connection")
+    return conn
+
+
+def test_store_performances_replaces_history(conn, mocker):
+    """Test that the history of the athlete is replaced in one transaction."""
+    execute_values = mocker.patch.object(performances_service, "execute_values")
+    performances = [
+        Performance("5 Km Route", 5000, 1138.0, date(2019, 3, 3), "Cannes"),
+        Performance("110m Haies", None, 15.2, None, None),
+    ]
+
+    performances_service.store_performances("42", performances)
+
+    cursor = conn.cursor.return_value
+    lock, delete = cursor.execute.call_args_list
+    # Concurrent scrapes of the athlete wait for this transaction
+    assert "pg_advisory_xact_lock" in lock.args[0]
+    assert lock.args[1][1] == "42"
+    assert delete.args == ("DELETE FROM performances WHERE athlete_id = %s", ("42",))
+    rows = execute_values.call_args.args[2]
+    assert rows == [
+        ("42", "5 Km Route", 5000, 1138.0, date(2019, 3, 3), "Cannes"),
+        ("42", "110m Haies", None, 15.2, None, None),
+    ]
+    conn.commit.assert_called_once()
+
+
+def test_get_progression_season_best(conn):
+    """Test that season bests keep the fastest performance per event and year."""
+    cursor = conn.cursor.return_value
+    cursor.fetchall.return_value = []
+
+    performances_service.get_progression("42", distance=1609.34, season_best=True)
+
+    query, params = cursor.execute.call_args.args
+    assert "DISTINCT ON (event, date_part('year', perf_date))" in query
+    assert "distance = %s::real" in query
+    assert params == ["42", 1609.34]
+
+
+def test_get_athlete_progression_scrapes_unknown_athletes(mocker):
+    """Test that the page of an athlete is scraped once when no history is stored."""
+    row = {
+        "event": "10 Km Route",
+        "distance": 10000.0,
+        "seconds": 2403.0,
+        "date": date(2019, 3, 17),
+        "competition": "Hyeres",
+    }
+    progression = mocker.patch.object(
+        performances_service, "get_progression", side_effect=[[], [row]]
+    )
+    mocker.patch.object(athletes_service, "_records_cache", {})
+    scrape = mocker.patch.object(
+        athletes_service, "get_athlete_records", return_value=RecordSet()
+    )
+
+    response = client.get("/get_athlete_progression?ident=42&distance=10000")
+    assert response.status_code == 200
+    assert response.json() == [{**row, "date": "2019-03-17"}]
+    scrape.assert_called_once_with("42")
+    assert progression.call_args.args == ("42", 10000.0, False)
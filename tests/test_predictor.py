@@ -0,0 +1,40 @@
+import pytest
+
+from mypacer_api.core.predictor import predict_times, vdot
+
+DISTANCES = [1500, 5000, 10000, 21097, 42195]
+
+
+def test_vdot():
+    """Test VDOT against Daniels' tables (VDOT 50: 5 km in 19'57'')."""
+    assert vdot(5000, 19 * 60 + 57) == pytest.approx(50, abs=0.1)
+
+
+def test_predict_times_riegel():
+    """Test Riegel predictions from the closest record."""
+    records = [{5000: 1200, 42195: 11000}, {}]
+    predictions = predict_times(records, DISTANCES, "riegel")
+
+    assert predictions[0]["5000"] == 1200
+    assert predictions[0]["42195"] == 11000
+    # 10 km predicted from the 5 km, half-marathon from the marathon
+    assert predictions[0]["10000"] == pytest.approx(1200 * 2**1.06, abs=0.01)
+    assert predictions[0]["21097"] == pytest.approx(
+        11000 * (21097 / 42195) ** 1.06, abs=0.01
+    )
+    assert predictions[1] == dict.fromkeys(map(str, DISTANCES))
+
+
+def test_predict_times_vdot():
+    """Test VDOT predictions against Daniels' tables (VDOT 50)."""
+    [prediction] = predict_times([{5000: 1197}], DISTANCES, "vdot")
+
+    assert prediction["10000"] == pytest.approx(41 * 60 + 21, abs=2)
+    assert prediction["21097"] == pytest.approx(3600 + 31 * 60 + 35, abs=5)
+    assert prediction["42195"] == pytest.approx(3 * 3600 + 10 * 60 + 49, abs=10)
+
+
+def test_predict_times_unknown_model():
+    """Test that unknown models are rejected."""
+    with pytest.raises(ValueError, match="Unknown prediction model"):
+        predict_times([{5000: 1200}], DISTANCES, "cameron")
@@ -0,0 +1,100 @@
+import gzip
+import json
+
+from fastapi.testclient import TestClient
+
+from mypacer_api.core import calculator, prerender
+from mypacer_api.main import app
+from mypacer_api.services import pace_table_service
+
+client = TestClient(app)
+
+PRESETS = [(300, 240, 10, [1000, 5000]), (360, 180, 30, [800, 1609.34])]
+
+
+def test_render_writes_gzip_tables_and_manifest(tmp_path):
+    """Test that pre-rendered tables match the calculator and are listed."""
+    manifest = prerender.render(str(tmp_path), PRESETS)
+
+    assert prerender.load_manifest(str(tmp_path)) == manifest
+    table = manifest["tables"][prerender.table_key(300, 240, 10, [5000, 1000])]
+    with gzip.open(tmp_path / f"{table['file']}.gz") as artifact:
+        rows = json.load(artifact)
+    assert rows == calculator.calculate_pace_table(300, 240, 10, [1000, 5000])
+    assert table["rows"] == len(rows)
+
+    # Reproducible output: same content, same file names
+    assert prerender.render(str(tmp_path), PRESETS)["tables"] == manifest["tables"]
+
+
+def test_generate_table_redirects_to_prerendered_table(tmp_path, mocker):
+    """Test that pre-rendered tables are redirected to and served as static files."""
+    manifest = prerender.render(str(tmp_path), PRESETS)
+    mocker.patch.object(pace_table_service, "PRERENDERED_TABLES_DIR", str(tmp_path))
+    name = manifest["tables"][prerender.table_key(300, 240, 10, [1000, 5000])]["file"]
+
+    payload = {
+        "min_pace": 300,
+        "max_pace": 240,
+        "increment": 10,
+        "distances": [5000, 1000],
+    }
+    response = client.post("/generate_table", json=payload, follow_redirects=False)
+    assert response.status_code == 303
+    assert response.headers["location"] == f"/pace_tables/{name}"
+
+    response = client.get(
+        f"/pace_tables/{name}", headers={"Accept-Encoding": "identity"}
+    )
+    assert response.status_code == 200
+    assert "immutable" in response.headers["cache-control"]
+    assert "content-encoding" not in response.headers
+    prerendered = response.json()
+    assert prerendered == calculator.calculate_pace_table(300, 240, 10, [1000, 5000])
+
+    # Same row keys as the table computed by the endpoint
+    mocker.patch.object(pace_table_service, "PRERENDERED_TABLES_DIR", None)
+    live = client.post("/generate_table", json=payload).json()
+    assert [sorted(row) for row in prerendered] == [sorted(row) for row in live]
+    assert sorted(live[0]) == ["1000", "5000", "pace", "speed"]
+    mocker.patch.object(pace_table_service, "PRERENDERED_TABLES_DIR", str(tmp_path))
+
+    response = client.get(f"/pace_tables/{name}", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    response = client.get(
+        f"/pace_tables/{name}", headers={"Accept-Encoding": "gzip;q=0, identity"}
+    )
+    assert "content-encoding" not in response.headers
+    assert response.json() == prerendered
+
+    # Float distances have "1000.0" keys: not the pre-rendered table
+    response = client.post(
+        "/generate_table",
+        json={**payload, "distances": [5000.0, 1000.0]},
+        follow_redirects=False,
+    )
+    assert response.status_code == 200
+    assert "1000.0" in response.json()[0]
+
+    # Tables that were not pre-rendered are still computed
+    payload["increment"] = 5
+    response = client.post("/generate_table", json=payload, follow_redirects=False)
+    assert response.status_code == 200
+
+
+def test_prerendered_table_rejects_unknown_names(tmp_path, mocker):
+    """Test that only files listed in the manifest are served."""
+    prerender.render(str(tmp_path), PRESETS)
+    mocker.patch.object(pace_table_service, "PRERENDERED_TABLES_DIR", str(tmp_path))
+
+    assert client.get("/pace_tables/manifest.json").status_code == 404
+    assert client.get("/pace_tables/..%2Fsecret.json").status_code == 404
+
+
+def test_manifest_of_another_version_is_ignored(tmp_path):
+    """Test that a manifest written with older table keys is not used."""
+    manifest = prerender.render(str(tmp_path), PRESETS)
+    manifest["version"] = 1
+    (tmp_path / prerender.MANIFEST_NAME).write_text(json.dumps(manifest))
+
+    assert prerender.load_manifest(str(tmp_path)) is None
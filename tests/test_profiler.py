@@ -0,0 +1,74 @@
+import threading
+
+from fastapi.testclient import TestClient
+
+from mypacer_api import dependencies
+from mypacer_api.core import profiler
+from mypacer_api.main import app
+
+client = TestClient(app)
+
+
+def _busy_loop(stop: threading.Event):
+    """Burn CPU until stopped, to be found in the samples."""
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_admin_profile_requires_token(mocker):
+    """Test that the profiler is hidden without a token and protected by it."""
+    mocker.patch.object(dependencies, "ADMIN_TOKEN", None)
+    assert client.get("/admin/profile?seconds=0.01").status_code == 404
+
+    mocker.patch.object(dependencies, "ADMIN_TOKEN", "secret")
+    assert client.get("/admin/profile?seconds=0.01").status_code == 403
+    response = client.get(
+        "/admin/profile?seconds=0.01", headers={"X-Admin-Token": "wrong"}
+    )
+    assert response.status_code == 403
+
+
+def test_admin_profile_timed_mode(mocker):
+    """Test that a timed session returns folded stacks of the busy threads."""
+    mocker.patch.object(dependencies, "ADMIN_TOKEN", "secret")
+    stop = threading.Event()
+    busy = threading.Thread(target=_busy_loop, args=(stop,), name="busy")
+    busy.start()
+    try:
+        response = client.get(
+            "/admin/profile?seconds=0.3&interval_ms=2",
+            headers={"X-Admin-Token": "secret"},
+        )
+    finally:
+        stop.set()
+        busy.join()
+
+    assert response.status_code == 200
+    assert int(response.headers["x-profile-samples"]) > 0
+    lines = response.text.splitlines()
+    busy_lines = [line for line in lines if line.startswith("busy;")]
+    assert busy_lines
+    stack, count = busy_lines[0].rsplit(" ", 1)
+    assert stack.split(";")[-1].endswith("test_profiler:_busy_loop")
+    assert int(count) > 0
+    assert profiler.get_session() is None
+
+
+def test_route_mode_only_profiles_selected_requests(mocker):
+    """Test that route mode counts the requests of its route and roots stacks there."""
+    session = profiler.SamplingProfiler(route="/generate_table", fraction=1.0)
+    mocker.patch.object(profiler, "_session", session)
+
+    payload = {"min_pace": 300, "max_pace": 240, "increment": 10}
+    assert client.post("/generate_table", json=payload).status_code == 200
+    assert client.get("/health").status_code == 200
+    assert session.requests == 1
+
+    # Samples taken while a profiled request runs are rooted at its route
+    session.enter_request()
+    session._sample(own_ident=0)
+    session.exit_request()
+    assert session.samples == 1
+    assert all(
+        line.startswith("/generate_table;") for line in session.folded().splitlines()
+    )
@@ -0,0 +1,67 @@
+import pickle
+
+import pytest
+
+from mypacer_api.core import calculator
+from mypacer_api.core.results import (
+    AthleteHit,
+    RecordSet,
+    decode_cursor,
+    encode_cursor,
+    encode_hits,
+)
+from mypacer_api.models import OFFICIAL_DISTANCES
+
+
+def test_record_set_behaves_like_the_records_dict():
+    """Test that a RecordSet reads and encodes like the scraped records dict."""
+    records = {5000: 1138.0, 800: 143.17, 1609.34: 250.5}
+    record_set = RecordSet(records)
+
+    assert record_set == records
+    assert record_set[800] == 143.17
+    assert record_set.get(800.0) == 143.17
+    assert record_set.get(1500) is None
+    assert list(record_set) == [800, 1609.34, 5000]
+    # Whole distances keep their int keys (same JSON as before)
+    assert list(record_set.to_dict()) == [800, 1609.34, 5000]
+    assert pickle.loads(pickle.dumps(record_set)) == records
+    assert not RecordSet()
+
+
+def test_pace_table_rows_match_calculate_pace_table():
+    """Test that the compact table encodes to the same rows as the dict table."""
+    table = calculator.build_pace_table(600, 120, 7, OFFICIAL_DISTANCES)
+    rows = calculator.calculate_pace_table(600, 120, 7, OFFICIAL_DISTANCES)
+
+    assert len(table) == len(rows)
+    assert table.to_rows() == rows
+    assert pickle.loads(pickle.dumps(table)).to_rows() == rows
+
+
+def test_encode_hits():
+    """Test that search results are encoded with every /get_athletes field."""
+    hit = AthleteHit(1, "123", "DUPONT Jean", score=0.5)
+    assert encode_hits([hit]) == [
+        {
+            "id": 1,
+            "ffa_id": "123",
+            "name": "DUPONT Jean",
+            "url": None,
+            "birth_date": None,
+            "license_id": None,
+            "sexe": None,
+            "nationality": None,
+            "score": 0.5,
+        }
+    ]
+
+
+def test_cursor_round_trip():
+    """Test that pagination cursors decode to the encoded sort key."""
+    cursor = encode_cursor((0.4375, "CA MONTREUIL 93", 12))
+    assert decode_cursor(cursor, 3) == [0.4375, "CA MONTREUIL 93", 12]
+
+    for invalid in ("not a cursor!", encode_cursor((1, 2))):
+        with pytest.raises(ValueError):
+            decode_cursor(invalid, 3)
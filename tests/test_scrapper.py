@@ -1,10 +1,17 @@
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date
+
 import pytest
 from bs4 import BeautifulSoup as bs
 from fastapi import HTTPException
 
+from mypacer_api.core import workers
 from mypacer_api.core.scrapper import (
     ba_convert_time_to_seconds,
+    parse_athlete_page_html,
     parse_bases_athle_record_page,
+    parse_french_date,
+    parse_records_html,
     scrap_athlete_records,
 )
 
@@ -125,6 +132,79 @@ def test_parse_bases_athle_record_page():
     assert records[10000] == 2403
 
 
+def test_parse_records_html_in_process_pool(mocker):
+    """
+    Test that record pages parsed from raw bytes in the process pool give the same result.
+    """
+    inline = parse_records_html(HTML_RECORDS.encode())
+    assert inline == parse_bases_athle_record_page(bs(HTML_RECORDS, "html.parser"))
+
+    mocker.patch.object(workers, "CPU_WORKERS", 1)
+    try:
+        assert workers.run(parse_records_html, HTML_RECORDS.encode()) == inline
+    finally:
+        workers.shutdown()
+
+
+def test_broken_process_pool_is_replaced(mocker):
+    """
+    Test that a pool broken by a dead worker is replaced and the task retried once.
+    """
+    broken = mocker.Mock()
+    broken.submit.side_effect = BrokenProcessPool()
+    healthy = mocker.Mock()
+    healthy.submit.return_value.result.return_value = {800: 120.5}
+    mocker.patch.object(workers, "CPU_WORKERS", 1)
+    mocker.patch.object(workers, "_executor", broken)
+    mocker.patch.object(workers, "ProcessPoolExecutor", return_value=healthy)
+
+    assert workers.run(parse_records_html, b"") == {800: 120.5}
+    broken.shutdown.assert_called_once_with(wait=False, cancel_futures=True)
+    assert workers._executor is healthy
+
+
+def test_parse_french_date():
+    """
+    Test the parse_french_date function with the date formats of bases.athle.fr.
+    """
+    assert parse_french_date("4 Mai 2019") == date(2019, 5, 4)
+    assert parse_french_date("20 Avr. 2019") == date(2019, 4, 20)
+    assert parse_french_date("1er Déc. 2020") == date(2020, 12, 1)
+    assert parse_french_date("07/01/1963") == date(1963, 1, 7)
+    assert parse_french_date("31 Févr. 2020") is None
+    assert parse_french_date("-") is None
+
+
+def test_parse_athlete_page_performances():
+    """
+    Test that the performance history is extracted along with the records.
+    """
+    records, performances = parse_athlete_page_html(HTML_RECORDS.encode())
+
+    assert records == parse_records_html(HTML_RECORDS.encode())
+    assert len(performances) == 7
+    assert performances[0].event == "200m"
+    assert performances[0].distance == 200
+    assert performances[0].date == date(2019, 5, 4)
+    assert performances[0].competition == "La seyne sur mer"
+    short_track = performances[3]
+    assert short_track.event == "800m Piste Courte"
+    assert pytest.approx(short_track.seconds, rel=1e-6) == 143.59
+    assert short_track.date == date(2019, 1, 6)
+
+
+def test_parse_performances_skips_malformed_times():
+    """
+    Test that a row whose time cannot be parsed is skipped, not the whole page.
+    """
+    html = HTML_RECORDS.replace("<td>61''61</td>", "<td>abc''61</td>")
+    records, performances = parse_athlete_page_html(html.encode())
+
+    assert len(performances) == 6
+    assert "400m" not in [performance.event for performance in performances]
+    assert 400 not in records and 200 in records
+
+
 @pytest.mark.skip(reason="This test makes a real network request and can be flaky.")
 def test_scrap_athlete_records():
     """
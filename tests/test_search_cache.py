@@ -0,0 +1,93 @@
+import pytest
+
+from mypacer_api.core import search_cache
+from mypacer_api.core.results import AthleteHit
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    """Start every test with an empty search cache."""
+    search_cache.invalidate()
+    yield
+    search_cache.invalidate()
+
+
+def test_trigram_similarity():
+    """Test the Python port of pg_trgm similarity()."""
+    assert search_cache.trigram_similarity("word", "word") == 1.0
+    assert search_cache.trigram_similarity("word", "two words") == 0.36363637
+    assert search_cache.trigram_similarity("abc", "xyz") == 0.0
+    assert search_cache.trigram_similarity("", "") == 0.0
+
+
+def test_get_put_exact_key():
+    """Test that results are only returned for the same query, limit, offset and mode."""
+    rows = [AthleteHit(id=i, name=f"DUPONT Jean {i}") for i in range(25)]
+    search_cache.put("dupont", 25, 0, "ilike", rows)
+
+    assert search_cache.get("dupont", 25, 0, "ilike") is rows
+    assert search_cache.get("dupont", 25, 25, "ilike") is None
+    assert search_cache.get("dupont", 25, 0, "knn") is None
+    # The result set is not complete, it cannot answer longer queries
+    assert search_cache.get("dupont j", 25, 0, "ilike") is None
+
+
+def test_prefix_reuse_from_complete_set():
+    """Test that a complete result set answers longer queries by filtering."""
+    rows = [
+        AthleteHit(id=1, name="DUPONT Jean", score=0.5),
+        AthleteHit(id=2, name="DUPOIS Marie", score=0.5),
+        AthleteHit(id=3, name="DUPONTEL Éric", score=0.4),
+    ]
+    search_cache.put("dupo", 25, 0, "ilike", rows)
+
+    results = search_cache.get("dupont", 25, 0, "ilike")
+    assert [row.id for row in results] == [1, 3]
+    assert results[0].score == search_cache.trigram_similarity("dupont jean", "dupont")
+
+    assert [row.id for row in search_cache.get("dupont eric", 10, 0, "ilike")] == [3]
+    assert search_cache.get("dupont", 1, 1, "ilike")[0].id == 3
+    # KNN results are not monotonic and never reused
+    search_cache.put("dupo", 25, 0, "knn", rows)
+    assert search_cache.get("dupon", 25, 0, "knn") is None
+
+
+def test_expiry_and_invalidate(mocker):
+    """Test that entries expire after the TTL and are dropped on invalidation."""
+    rows = [AthleteHit(id=1, name="DUPONT Jean")]
+    search_cache.put("dupont", 25, 0, "ilike", rows)
+    search_cache.invalidate()
+    assert search_cache.get("dupont", 25, 0, "ilike") is None
+
+    search_cache.put("dupont", 25, 0, "ilike", rows)
+    now = search_cache.time.monotonic()
+    mocker.patch(
+        "mypacer_api.core.search_cache.time.monotonic",
+        return_value=now + search_cache.SEARCH_CACHE_TTL + 1,
+    )
+    assert search_cache.get("dupont", 25, 0, "ilike") is None
+    assert search_cache.get("dupont j", 25, 0, "ilike") is None
+
+
+def test_check_generation_drops_cache_on_new_data(mocker):
+    """Test that a generation bumped by another process clears the cache."""
+    mocker.patch.object(search_cache, "_generation", None)
+    mocker.patch.object(search_cache, "_next_generation_check", 0.0)
+    clock = mocker.patch("mypacer_api.core.search_cache.time.monotonic")
+    read_generation = mocker.Mock(side_effect=[3, 4])
+    rows = [AthleteHit(id=1, name="DUPONT Jean")]
+
+    clock.return_value = 100.0
+    search_cache.check_generation(read_generation)
+    search_cache.put("dupont", 25, 0, "ilike", rows)
+
+    # Within the check interval: the generation is not read again
+    clock.return_value = 101.0
+    search_cache.check_generation(read_generation)
+    assert read_generation.call_count == 1
+    assert search_cache.get("dupont", 25, 0, "ilike") == rows
+
+    clock.return_value = 100.0 + search_cache.SEARCH_CACHE_GENERATION_CHECK
+    search_cache.check_generation(read_generation)
+    assert search_cache.get("dupont", 25, 0, "ilike") is None
+    search_cache.invalidate()
@@ -0,0 +1,128 @@
+from fastapi.testclient import TestClient
+
+from mypacer_api import dependencies
+from mypacer_api.core import database, slow_queries
+from mypacer_api.main import app
+from mypacer_api.services import athletes_service
+
+client = TestClient(app)
+
+
+def test_normalize_groups_query_shapes():
+    """Test that literals, placeholders and repeated conditions are normalized."""
+    two_words = """
+        SELECT id, name FROM athletes
+        WHERE normalized_name ILIKE %s AND normalized_name ILIKE %s
+        LIMIT %s OFFSET %s
+    """
+    three_words = two_words.replace("%s AND", "%s AND normalized_name ILIKE %s AND")
+    shape = slow_queries.normalize(two_words)
+
+    assert shape == (
+        "SELECT id, name FROM athletes "
+        "WHERE normalized_name ILIKE ? AND ... LIMIT ? OFFSET ?"
+    )
+    assert slow_queries.normalize(three_words) == shape
+    assert (
+        slow_queries.normalize("SELECT 1 FROM t WHERE name = 'O''Brien'")
+        == "SELECT ? FROM t WHERE name = ?"
+    )
+
+
+def test_execute_records_slow_queries(mocker):
+    """Test that only queries above the threshold are recorded, grouped by shape."""
+    slow_queries.reset()
+    mocker.patch.object(slow_queries, "SLOW_QUERY_MS", 100)
+    clock = mocker.patch.object(database.time, "perf_counter")
+    cursor = mocker.MagicMock()
+
+    clock.side_effect = [0.0, 0.05, 1.0, 1.3, 2.0, 2.5]
+    database.execute(cursor, "SELECT * FROM athletes WHERE id = %s", (1,))
+    database.execute(cursor, "SELECT * FROM athletes WHERE id = %s", (2,))
+    database.execute(cursor, "SELECT * FROM athletes WHERE id = 3")
+
+    report = slow_queries.report()
+    assert report["threshold_ms"] == 100
+    [shape] = report["shapes"]
+    assert shape["shape"] == "SELECT * FROM athletes WHERE id = ?"
+    assert shape["count"] == 2
+    assert shape["total_ms"] == 800.0 and shape["max_ms"] == 500.0
+    assert len(report["recent"]) == 2
+    cursor.execute.assert_any_call("SELECT * FROM athletes WHERE id = 3")
+    slow_queries.reset()
+
+
+def test_get_connection_sets_route_timeout(mocker):
+    """Test that the statement timeout of the route is set on checkout."""
+    conn = mocker.MagicMock()
+    mocker.patch.object(database, "get_connection_pool").return_value.getconn = (
+        lambda: conn
+    )
+    mocker.patch.dict(database.STATEMENT_TIMEOUTS, {"search": 1500})
+    cursor = conn.cursor.return_value.__enter__.return_value
+
+    assert database.get_connection("search") is conn
+    cursor.execute.assert_called_once_with(
+        "SELECT set_config('statement_timeout', %s, true)", ("1500ms",)
+    )
+
+    cursor.execute.reset_mock()
+    database.get_connection()
+    cursor.execute.assert_not_called()
+
+
+def test_admin_slow_queries(mocker):
+    """Test that the slow-query log is only readable with the admin token."""
+    mocker.patch.object(dependencies, "ADMIN_TOKEN", "secret")
+    slow_queries.reset()
+    mocker.patch.object(slow_queries, "SLOW_QUERY_MS", 0)
+    slow_queries.record("SELECT COUNT(*) FROM athletes;", 12.0)
+
+    assert client.get("/admin/slow_queries").status_code == 403
+    response = client.get("/admin/slow_queries", headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["shapes"][0]["shape"] == "SELECT COUNT(*) FROM athletes;"
+    assert "search" in body["statement_timeouts_ms"]
+    # Reading does not clear the log: only DELETE does
+    assert len(slow_queries.report()["shapes"]) == 1
+
+    assert client.delete("/admin/slow_queries").status_code == 403
+    response = client.delete("/admin/slow_queries", headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 200
+    assert len(response.json()["shapes"]) == 1
+    assert slow_queries.report()["shapes"] == []
+
+
+def test_export_fetches_are_recorded(mocker):
+    """Test that the fetches of a streamed export reach the slow-query log."""
+    slow_queries.reset()
+    mocker.patch.object(slow_queries, "SLOW_QUERY_MS", 0)
+    conn = mocker.MagicMock()
+    mocker.patch.object(database, "get_connection", return_value=conn)
+    release = mocker.patch.object(database, "release_connection")
+    cursor = conn.cursor.return_value
+    cursor.fetchmany.side_effect = [[{"id": 1, "name": "Dupont"}], []]
+
+    chunks = athletes_service.stream_athletes("dupont", fmt="ndjson")
+    assert b"".join(chunks).count(b"\n") == 1
+
+    [shape] = slow_queries.report()["shapes"]
+    assert "FROM athletes" in shape["shape"]
+    # Declared once through database.execute, then the fetches of the export
+    assert shape["count"] == 2
+    release.assert_called_once_with(conn)
+
+
+def test_unread_export_releases_its_connection(mocker):
+    """Test that closing an export that was never iterated releases its connection."""
+    conn = mocker.MagicMock()
+    mocker.patch.object(database, "get_connection", return_value=conn)
+    release = mocker.patch.object(database, "release_connection")
+
+    chunks = athletes_service.stream_athletes("dupont", fmt="ndjson")
+    chunks.close()
+    chunks.close()
+
+    conn.cursor.return_value.close.assert_called_once()
+    release.assert_called_once_with(conn)
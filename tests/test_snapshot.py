@@ -0,0 +1,118 @@
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from mypacer_api.core import calculator, snapshot
+from mypacer_api.core.results import RecordSet
+from mypacer_api.main import app
+from mypacer_api.models import OFFICIAL_DISTANCES
+from mypacer_api.services import (
+    athletes_service,
+    pace_table_service,
+    snapshot_service,
+)
+
+
+def test_write_and_load_round_trip(tmp_path, mocker):
+    """Test that snapshotted tables and records are rebuilt identically."""
+    mocker.patch.object(snapshot, "_loaded", None)
+    table = calculator.build_pace_table(420, 180, 5, [800.0, 42195.0])
+    records = RecordSet({800: 143.17, 1609.34: 301.5})
+    path = str(tmp_path / "cache.snapshot")
+
+    stats = snapshot.write(
+        path,
+        {(420, 180, 5, (800.0, 42195.0)): table},
+        {"42": (1700000000.0, records)},
+    )
+    assert stats["pace_tables"] == 1 and stats["records"] == 1
+
+    loaded = snapshot.load(path)
+    assert len(loaded) == 2
+    restored = snapshot.get_pace_table((420, 180, 5, (800.0, 42195.0)))
+    assert restored.to_rows() == table.to_rows()
+    assert snapshot.get_records("42") == (1700000000.0, records)
+    assert snapshot.get_records("43") is None
+    assert snapshot.get_pace_table((420, 180, 1, (800.0,))) is None
+
+
+def test_load_ignores_missing_or_invalid_files(tmp_path, mocker):
+    """Test that unusable snapshots leave the caches empty instead of failing."""
+    mocker.patch.object(snapshot, "_loaded", None)
+    assert snapshot.load(str(tmp_path / "missing")) is None
+
+    invalid = tmp_path / "invalid"
+    invalid.write_bytes(b"not a snapshot file")
+    assert snapshot.load(str(invalid)) is None
+
+    path = str(tmp_path / "old")
+    snapshot.write(path, {}, {})
+    mocker.patch.object(snapshot, "__version__", "0.0.1")
+    assert snapshot.load(path) is None
+    assert snapshot.get_records("42") is None
+
+
+def test_restarted_service_is_warm(tmp_path, mocker):
+    """Test that a restarted process serves cached data without recomputing it."""
+    path = str(tmp_path / "cache.snapshot")
+    mocker.patch.object(snapshot, "_loaded", None)
+    mocker.patch.object(pace_table_service, "_pace_table_cache", {})
+    fetched_at = time.time() - 60
+    mocker.patch.object(
+        athletes_service,
+        "_records_cache",
+        {"42": (fetched_at, RecordSet({5000: 1138.0}))},
+    )
+    rows = pace_table_service.get_pace_table(300, 240, 10, [1000, 5000]).to_rows()
+    snapshot_service.save(path)
+
+    # Restart: empty caches, only the snapshot index is read
+    mocker.patch.object(pace_table_service, "_pace_table_cache", {})
+    mocker.patch.object(athletes_service, "_records_cache", {})
+    snapshot.load(path)
+    build = mocker.patch.object(calculator, "build_pace_table")
+    url = mocker.patch.object(athletes_service, "_get_athlete_url")
+
+    assert (
+        pace_table_service.get_pace_table(300, 240, 10, [1000, 5000]).to_rows() == rows
+    )
+    assert athletes_service.get_athlete_records(42) == {5000: 1138.0}
+    assert athletes_service.get_records_fetched_at(42) == fetched_at
+    build.assert_not_called()
+    url.assert_not_called()
+
+
+def test_lifespan_saves_snapshot_on_shutdown(tmp_path, mocker):
+    """Test that the application loads and writes the snapshot around its lifetime."""
+    path = tmp_path / "cache.snapshot"
+    mocker.patch.object(snapshot, "_loaded", None)
+    mocker.patch.object(snapshot, "SNAPSHOT_PATH", str(path))
+
+    with TestClient(app) as client:
+        payload = {"min_pace": 300, "max_pace": 240, "increment": 5}
+        assert client.post("/generate_table", json=payload).status_code == 200
+
+    key = pace_table_service._get_cache_key(300, 240, 5, OFFICIAL_DISTANCES)
+    assert snapshot.load(str(path)).pace_table(key) is not None
+
+
+def test_periodic_snapshot_survives_errors(mocker):
+    """Test that an unexpected error is logged and the next snapshot still runs."""
+    mocker.patch.object(snapshot, "SNAPSHOT_INTERVAL", 0)
+    stop = mocker.patch.object(snapshot_service, "_stop", threading.Event())
+    errors = [RuntimeError("dictionary changed size")]
+
+    def failing_then_stopping_save():
+        if errors:
+            raise errors.pop()
+        stop.set()
+
+    save = mocker.patch.object(
+        snapshot_service, "save", side_effect=failing_then_stopping_save
+    )
+    log = mocker.patch.object(snapshot_service.logger, "exception")
+
+    snapshot_service._run_periodic()
+    assert save.call_count == 2
+    assert log.call_count == 1